@@ -7,33 +7,52 @@ Provides REST API endpoints for the InfoPulse frontend
 import os
 import logging
 import sys
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import traceback
-import threading
 import time
 import json
+from functools import partial
 from werkzeug.middleware.proxy_fix import ProxyFix
 
 # Add the newsagent directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'newsagent', 'src'))
 
+from newsagent.archive import get_archive, parse_cursor
+from newsagent.article_store import ARTICLE_SNAPSHOT_PATH, ArticleStore
+from newsagent.change_detection import HeadlineTracker
+from newsagent.crew_pool import get_crew_pool
+from newsagent.dedupe import get_story_deduper
+from newsagent.image_cache import get_image_cache, is_image_key
+from newsagent.jobs import SUCCEEDED, begin_stage, finish_stage, get_job_registry, sse_message, stage
+from newsagent.llm_cache import get_completion_cache
+from newsagent.news_source import get_news_source
+from newsagent.ratelimit import get_limiter, rate_limit_metrics
+from newsagent.ranking import ranking_stats
+from newsagent.rendering import RenderedBody
+from newsagent.scheduler import FreshnessScheduler, headlines_fingerprint
+from newsagent.search import get_search_index
+from newsagent.summarizer import get_text_service
+from newsagent.schemas import articles_by_category, parse_newsletter
+from newsagent.singleflight import SingleFlight
+from newsagent.work_queue import PRIORITY_BATCH, PRIORITY_ON_DEMAND, PRIORITY_SCHEDULED, QueueFull
+from newsagent.workers import GenerationPool
+
 try:
     from newsagent.main import run_newsletter_generation
-    from newsagent.tools.custom_tool import NewsScraper, CategoryFetcher, ImageGenerator
+    from newsagent.tools.custom_tool import NewsScraper, CategoryFetcher, ImageGenerator, TextSummarizer, TextExplainer
     CREW_AVAILABLE = True
 except ImportError as e:
     logging.warning(f"CrewAI modules not available: {e}")
     CREW_AVAILABLE = False
 
-# Import Scraper for NewsAPI
-try:
-    from Scraper import NewsAPI
-    NEWSAPI_AVAILABLE = True
-except ImportError:
-    logging.warning("NewsAPI Scraper not available")
-    NEWSAPI_AVAILABLE = False
+# NewsAPI headlines come from the in-process news source: rate limited, with
+# identical concurrent requests coalesced and results cached briefly
+NEWS_SOURCE = get_news_source()
+NEWSAPI_AVAILABLE = NEWS_SOURCE.available
+if not NEWSAPI_AVAILABLE:
+    logging.warning("NewsAPI key not configured (set NEWSAPI_KEY); headline fetches are disabled")
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -42,32 +61,231 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 app.wsgi_app = ProxyFix(app.wsgi_app)
-CORS(app, resources={r"/*": {"origins": ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"]}})  # Enable CORS for frontend
+CORS_ORIGINS = ["http://localhost:3000", "http://localhost:3001", "http://localhost:3002"]
+CORS(app, resources={r"/*": {"origins": CORS_ORIGINS}})  # Enable CORS for frontend
 
 # Available news categories
 CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
 
-# In-memory storage for pre-generated articles
-ARTICLE_CACHE = {
-    'articles': [],
-    'last_generated': None,
-    'generation_in_progress': False,
-    'next_generation': None
-}
-
-# Cache duration (in hours)
-CACHE_DURATION_HOURS = 2
+# In-memory storage for pre-generated articles (lock-free reads, atomic publishes),
+# persisted to disk so a restart serves the last good content immediately
+ARTICLE_STORE = ArticleStore(snapshot_path=ARTICLE_SNAPSHOT_PATH)
+
+# Full-text index over every published article, updated on each publish
+SEARCH_INDEX = get_search_index()
+ARTICLE_STORE.subscribe(SEARCH_INDEX.index_snapshot)
+ARTICLE_STORE.load()
+
+# Every published article (and every crew newsletter edition) is appended to the
+# day-partitioned archive; the snapshot restored above was archived when first published
+ARCHIVE = get_archive()
+if ARCHIVE is not None:
+    ARCHIVE.prime(ARTICLE_STORE.snapshot)
+    ARTICLE_STORE.subscribe(ARCHIVE.archive_snapshot)
+
+# Largest page /api/search and the archive endpoints return
+SEARCH_MAX_LIMIT = 100
+ARCHIVE_MAX_LIMIT = 100
+# Most articles a category newsletter request may ask for
+NEWSLETTER_MAX_LIMIT = 20
+
+# The category list never changes at runtime, so render it once
+CATEGORIES_RESPONSE = RenderedBody.from_payload({
+    'status': 'success',
+    'categories': CATEGORIES,
+    'total_count': len(CATEGORIES)
+})
+
+# Cache duration (in hours): categories older than this are regenerated
+CACHE_DURATION_HOURS = float(os.getenv('CACHE_DURATION_HOURS', 2))
+
+# Categories written by the Newsagent crew; the rest use NewsAPI headlines
+CREW_CATEGORIES = CATEGORIES[:3]
+
+# Number of top headlines hashed when checking a category for upstream changes
+HEADLINE_CHECK_SIZE = 10
+
+# Browser cache lifetime for generated images (content-addressed, so never stale)
+IMAGE_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+# 'batched': one crew run covers all crew categories; 'per_category': one run each
+GENERATION_MODE = os.getenv('GENERATION_MODE', 'batched')
+
+# Remembers which stories the crew already wrote, per category
+CHANGE_TRACKER = HeadlineTracker()
+
+# Drops the same story reported by several outlets or under several categories
+DEDUPER = get_story_deduper()
+
+# Built once per process and shared by every request
+IMAGE_GENERATOR = ImageGenerator() if CREW_AVAILABLE else None
+
+# /summarize and /explain: requests are micro-batched into shared LLM calls and
+# cached by content hash, so many readers summarizing one article cost one call
+SUMMARIZER = TextSummarizer() if CREW_AVAILABLE else None
+EXPLAINER = TextExplainer() if CREW_AVAILABLE else None
+
+# Longest text /summarize and /explain accept
+TEXT_MAX_CHARS = int(os.getenv('TEXT_MAX_CHARS', 100000))
+
+# Background generation jobs, run on the bounded priority work queue
+# (status at /api/jobs/<id>, progress over SSE)
+JOBS = get_job_registry()
+
+# Seconds between keep-alive comments on idle job event streams
+SSE_KEEPALIVE_SECONDS = 15
+
+# Coalesces identical on-demand newsletter requests and keeps the result briefly
+NEWSLETTER_FLIGHTS = SingleFlight(ttl_seconds=float(os.getenv('NEWSLETTER_CACHE_SECONDS', 300)))
+
+# Shared worker pool for per-category generation (size: GENERATION_WORKERS)
+GENERATION_POOL = GenerationPool()
+
+# Image generation pool, sized to the Stability API's in-flight limit
+IMAGE_POOL = GenerationPool(max_workers=get_limiter('stability').max_in_flight)
+
+def _rendered_response(rendered):
+    """Serve a pre-rendered JSON body, honouring If-None-Match and Accept-Encoding"""
+    encoding = next((e for e in rendered.encodings if e in request.accept_encodings), None)
+    etags = {rendered.variant_etag(e) for e in (None,) + rendered.encodings}
+    if any(request.if_none_match.contains(etag) for etag in etags):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(rendered.variant(encoding), mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    response.set_etag(rendered.variant_etag(encoding))
+    response.vary.add('Accept-Encoding')
+    # Clients may keep the body but must revalidate (cheap 304s for pollers)
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/news')
 def get_news():
     """Get news articles, optionally filtered by category"""
     category = request.args.get('category')
-    if ARTICLE_CACHE['articles']:
-        articles = ARTICLE_CACHE['articles']
-        if category:
-            articles = [a for a in articles if a.get('category', '').lower() == category.lower()]
-        return jsonify(articles)
-    return jsonify([])
+    limit = request.args.get('limit', type=int)
+    return _rendered_response(ARTICLE_STORE.snapshot.view(category, limit))
+
+@app.route('/api/search')
+def search_articles():
+    """Full-text search over published articles (BM25), with category filter and pagination"""
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'status': 'error', 'message': 'Missing search query (q)'}), 400
+    category = request.args.get('category')
+    if category and category.lower() not in CATEGORIES:
+        return jsonify({
+            'status': 'error',
+            'message': f'Invalid category. Available categories: {", ".join(CATEGORIES)}'
+        }), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), SEARCH_MAX_LIMIT))
+    offset = max(0, request.args.get('offset', 0, type=int))
+
+    started = time.perf_counter()
+    total, hits = SEARCH_INDEX.search(query, category=category, limit=limit, offset=offset)
+    return jsonify({
+        'status': 'success',
+        'query': query,
+        'category': category,
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'next_offset': offset + limit if offset + limit < total else None,
+        'took_ms': round((time.perf_counter() - started) * 1000, 2),
+        'results': [dict(article, score=score) for score, article in hits]
+    })
+
+def _archive_query():
+    """Archive filters and page from the query string; raises ValueError on bad input"""
+    category = request.args.get('category')
+    if category and category.lower() not in CATEGORIES:
+        raise ValueError(f'Invalid category. Available categories: {", ".join(CATEGORIES)}')
+    day = request.args.get('date')
+    since = request.args.get('since') or day
+    until = request.args.get('until') or day
+    for value in (since, until):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    cursor = request.args.get('cursor') or None
+    if cursor:
+        parse_cursor(cursor)
+    return {
+        'category': category,
+        'since': since,
+        'until': until,
+        'cursor': cursor,
+        'limit': max(1, min(request.args.get('limit', 20, type=int), ARCHIVE_MAX_LIMIT))
+    }
+
+def _archive_unavailable():
+    return jsonify({'status': 'error', 'message': 'Archive is disabled'}), 503
+
+@app.route('/api/archive/articles')
+def get_archived_articles():
+    """Archived articles, newest first, filtered by category and date range (cursor-paginated)"""
+    if ARCHIVE is None:
+        return _archive_unavailable()
+    try:
+        query = _archive_query()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    articles, next_cursor = ARCHIVE.articles(**query)
+    return jsonify({
+        'status': 'success',
+        'count': len(articles),
+        'articles': articles,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/archive/editions')
+def get_archived_editions():
+    """Past newsletter editions, newest first, filtered by category and date range (cursor-paginated)"""
+    if ARCHIVE is None:
+        return _archive_unavailable()
+    try:
+        query = _archive_query()
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    editions, next_cursor = ARCHIVE.editions(**query)
+    return jsonify({
+        'status': 'success',
+        'count': len(editions),
+        'editions': editions,
+        'next_cursor': next_cursor
+    })
+
+@app.route('/api/archive/editions/<edition_id>')
+def get_archived_edition(edition_id):
+    """One past newsletter edition with its articles"""
+    if ARCHIVE is None:
+        return _archive_unavailable()
+    try:
+        edition = ARCHIVE.edition(edition_id)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if edition is None:
+        return jsonify({'status': 'error', 'message': 'Edition not found'}), 404
+    return jsonify({'status': 'success', 'edition': edition})
+
+@app.route('/images/<image_id>')
+def get_image(image_id):
+    """Stream a generated image from the image store (ETag, Cache-Control and Range aware)"""
+    if not is_image_key(image_id):
+        return jsonify({"error": "Invalid image id"}), 400
+    path = get_image_cache().lookup(image_id)
+    if path is None:
+        return jsonify({"error": "Image not found"}), 404
+    response = send_file(
+        path,
+        mimetype='image/png',
+        etag=image_id,
+        conditional=True,
+        max_age=IMAGE_MAX_AGE_SECONDS
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 @app.route('/generate-image', methods=['POST'])
 def generate_image():
@@ -77,132 +295,372 @@ def generate_image():
         prompt = data.get('prompt')
         if not prompt:
             return jsonify({"error": "No prompt provided"}), 400
+        if IMAGE_GENERATOR is None:
+            return jsonify({"error": "CrewAI modules not available"}), 503
             
         # Use ImageGenerator from newsagent
-        image_generator = ImageGenerator()
-        image_url = image_generator.generate(prompt)
+        image_result = IMAGE_GENERATOR.generate_image(prompt=prompt, article_title=prompt[:80])
         
-        return jsonify({"url": image_url})
+        return jsonify({"url": image_result.image_url})
     except Exception as e:
         logger.error(f"Error generating image: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _text_request(tool):
+    """(text, stream flag) from the JSON body, or an error response"""
+    data = request.get_json(silent=True) or {}
+    text = data.get('text')
+    if not text or not isinstance(text, str):
+        return None, (jsonify({"error": "No text provided"}), 400)
+    if len(text) > TEXT_MAX_CHARS:
+        return None, (jsonify({"error": f"Text is longer than {TEXT_MAX_CHARS} characters"}), 413)
+    if tool is None:
+        return None, (jsonify({"error": "CrewAI modules not available"}), 503)
+    return (text, bool(data.get('stream'))), None
+
+def _stream_text(tool, text, field):
+    """Stream per-chunk results as Server-Sent Events ('chunk' events, then 'done')"""
+    def events():
+        outputs = []
+        try:
+            for index, total, output in tool.stream(text):
+                outputs.append(output)
+                yield sse_message('chunk', {'index': index, 'total': total, field: output})
+        except Exception as e:
+            logger.error(f"Error streaming {field}: {e}")
+            yield sse_message('error', {'error': str(e)})
+            return
+        yield sse_message('done', {field: '\n\n'.join(outputs)})
+
+    response = app.response_class(events(), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/summarize', methods=['POST'])
 def summarize_text():
-    """Summarize text using AI"""
+    """Summarize text using AI ("stream": true sends each section's summary as it is ready)"""
+    parsed, error = _text_request(SUMMARIZER)
+    if error:
+        return error
+    text, stream = parsed
+    if stream:
+        return _stream_text(SUMMARIZER, text, 'summary')
     try:
-        data = request.get_json()
-        text = data.get('text')
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-            
-        # Use text summarization from newsagent
-        from newsagent.tools.custom_tool import TextSummarizer
-        summarizer = TextSummarizer()
-        summary = summarizer.summarize(text)
-        
-        return jsonify({"summary": summary})
+        return jsonify({"summary": SUMMARIZER.summarize(text)})
     except Exception as e:
         logger.error(f"Error summarizing text: {e}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/explain', methods=['POST'])
 def explain_text():
-    """Explain text using AI"""
+    """Explain text using AI ("stream": true sends each section's explanation as it is ready)"""
+    parsed, error = _text_request(EXPLAINER)
+    if error:
+        return error
+    text, stream = parsed
+    if stream:
+        return _stream_text(EXPLAINER, text, 'explanation')
     try:
-        data = request.get_json()
-        text = data.get('text')
-        if not text:
-            return jsonify({"error": "No text provided"}), 400
-            
-        # Use text explanation from newsagent
-        from newsagent.tools.custom_tool import TextExplainer
-        explainer = TextExplainer()
-        explanation = explainer.explain(text)
-        
-        return jsonify({"explanation": explanation})
+        return jsonify({"explanation": EXPLAINER.explain(text)})
     except Exception as e:
         logger.error(f"Error explaining text: {e}")
         return jsonify({"error": str(e)}), 500
 
+def _fetch_headlines(category, page_size):
+    """Top NewsAPI headlines for a category, or None when NewsAPI is unavailable"""
+    if not NEWSAPI_AVAILABLE:
+        return None
+    try:
+        return NEWS_SOURCE.top_headlines(category, page_size)
+    except Exception as e:
+        logger.warning(f"Headline fetch failed for {category}: {e}")
+        return None
+
+def _category_headlines(category):
+    """Top headlines for a category, tagged with it so a batched run can split them back"""
+    headlines = _fetch_headlines(category, HEADLINE_CHECK_SIZE)
+    return [dict(h, category=category) for h in headlines] if headlines is not None else None
+
+def _fetch_all_headlines(categories):
+    """
+    Fetch every category's headlines in one concurrent sweep: {category: headlines or None}.
+    Near-duplicate stories are dropped within and across categories.
+    """
+    headlines_by_category = GENERATION_POOL.run((category, partial(_category_headlines, category)) for category in categories)
+    return DEDUPER.dedupe_by_category(headlines_by_category)
+
+def _crew_articles(categories, headlines_by_category=None):
+    """
+    Run the Newsagent crew once for all given categories and split the newsletter
+    back per category. Returns {category: latest article or None}.
+    """
+    from newsagent.crew import crew_inputs
+    if headlines_by_category is None:
+        headlines_by_category = _fetch_all_headlines(categories)
+
+    # Only new or changed stories go to the crew; the rest reuse earlier articles
+    new_by_category, reused_by_category = {}, {}
+    for category in categories:
+        headlines = headlines_by_category.get(category)
+        new_headlines, reused = CHANGE_TRACKER.diff(category, headlines) if headlines else ([], [])
+        if headlines and not new_headlines:
+            if not reused:
+                # Every story was seen but left out by the writer: keep the last article
+                latest = CHANGE_TRACKER.latest(category)
+                reused = [latest] if latest is not None else []
+            logger.info(f"Headlines unchanged for {category}; reusing {len(reused)} written articles.")
+        new_by_category[category] = new_headlines
+        reused_by_category[category] = reused
+
+    # Categories with new stories or nothing to reuse (e.g. a failed fetch) share one crew run
+    to_run = [c for c in categories if new_by_category[c] or not reused_by_category[c]]
+    written = {category: [] for category in categories}
+    if to_run:
+        new_headlines = [h for c in to_run for h in new_by_category[c]]
+        # Groq calls are rate limited inside the crew's LLM; the crew's
+        # task_callback moves the job from 'research' to 'write'
+        begin_stage('research')
+        result = get_crew_pool().kickoff(crew_inputs(', '.join(to_run), new_headlines or None))
+        finish_stage('write')
+        written.update(articles_by_category(parse_newsletter(result), to_run, new_headlines))
+        for category in to_run:
+            if new_by_category[category]:
+                CHANGE_TRACKER.record(category, new_by_category[category], written[category])
+        CHANGE_TRACKER.count_run(len(new_headlines), sum(len(reused_by_category[c]) for c in categories))
+    else:
+        CHANGE_TRACKER.count_avoided(sum(len(reused_by_category[c]) for c in categories))
+
+    # Only keep the latest article for each category
+    latest = {}
+    for category in categories:
+        articles = written[category] + reused_by_category[category]
+        if articles:
+            latest[category] = dict(articles[0], category=category)
+            logger.info(f"Generated 1 article for {category} using Newsagent agent.")
+        else:
+            latest[category] = None
+            logger.warning(f"No articles generated for {category} by Newsagent agent.")
+    return latest
+
+def _crew_category_article(category):
+    """Run the Newsagent crew for one category and return its latest article"""
+    # Fetched inline: this also runs on pool workers, which must not wait on the pool
+    with stage('fetch'):
+        headlines = _category_headlines(category)
+        if headlines:
+            headlines = DEDUPER.dedupe(headlines)
+    return _crew_articles([category], {category: headlines})[category]
+
+def _newsapi_category_article(category):
+    """Fetch the top NewsAPI headline for one category"""
+    articles = NEWS_SOURCE.top_headlines(category, 1)
+    if articles:
+        latest_article = articles[0]
+        latest_article['category'] = category
+        logger.info(f"Fetched 1 article for {category} using NewsAPI batch.")
+        return latest_article
+    logger.warning(f"No articles found for {category} in NewsAPI batch.")
+    return None
+
+def _start_refresh(kind, target, params=None, priority=PRIORITY_SCHEDULED):
+    """
+    Queue a generation function as a background job unless another refresh holds the store.
+    Returns None when busy; raises QueueFull when the work queue is full.
+    """
+    if not ARTICLE_STORE.try_begin_refresh():
+        return None
+
+    def run():
+        try:
+            return target()
+        finally:
+            ARTICLE_STORE.end_refresh()
+
+    try:
+        # A job cancelled while still queued must release the store as well
+        return JOBS.submit(kind, run, params=params, priority=priority, on_cancel=ARTICLE_STORE.end_refresh)
+    except QueueFull:
+        ARTICLE_STORE.end_refresh()
+        raise
+
+def _queue_full_response(error):
+    """429 with Retry-After when the work queue can't take more jobs"""
+    response = jsonify({
+        'status': 'busy',
+        'message': str(error),
+        'retry_after': error.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
+def _job_accepted(job, **extra):
+    """202 response pointing the client at the job's status and event stream"""
+    response = jsonify(dict(
+        extra,
+        status='accepted',
+        job_id=job.id,
+        status_url=f'/api/jobs/{job.id}',
+        events_url=f'/api/jobs/{job.id}/events'
+    ))
+    response.status_code = 202
+    response.headers['Location'] = f'/api/jobs/{job.id}'
+    return response
+
 def generate_articles_background():
     """Background function to generate articles"""
-    global ARTICLE_CACHE
-    
-    if ARTICLE_CACHE['generation_in_progress']:
-        logger.info("Generation already in progress, skipping...")
-        return
-    
     try:
-        ARTICLE_CACHE['generation_in_progress'] = True
         logger.info("Starting background article generation using Newsagent agent (CrewAI)...")
 
-        from newsagent.crew import Newsagent
-        from datetime import datetime
-        all_articles = []
-        per_category_articles = {}
-        # Reduce categories processed per minute (e.g., 3 per minute)
-        categories_to_process = CATEGORIES[:3]  # Limit to 3 categories for initial processing
-        
-        for category in categories_to_process:
-            # Prepare inputs for the agent
-            inputs = {
-                'categories': category,
-                'current_date': datetime.now().strftime('%Y-%m-%d'),
-                'current_time': datetime.now().strftime('%H:%M:%S')
-            }
-            try:
-                crew = Newsagent().crew()
-                result = crew.kickoff(inputs=inputs)
-                # result should contain articles, but may need formatting
-                articles = result.get('articles', []) if isinstance(result, dict) else []
-                if not articles:
-                    # fallback: try to parse result if it's a string
-                    import ast
-                    try:
-                        parsed = ast.literal_eval(result)
-                        articles = parsed.get('articles', [])
-                    except Exception:
-                        articles = []
-                # Only keep the latest article for this category
-                if articles:
-                    latest_article = articles[0]
-                    latest_article['category'] = category
-                    all_articles.append(latest_article)
-                    per_category_articles[category] = [latest_article]
-                    logger.info(f"Generated 1 article for {category} using Newsagent agent.")
-                else:
-                    logger.warning(f"No articles generated for {category} by Newsagent agent.")
-            except Exception as agent_error:
-                logger.error(f"Newsagent agent generation failed for {category}: {agent_error}")
-            # Increase delay to 5s to avoid LLM rate limits
-            time.sleep(5)
-
-        if NEWSAPI_AVAILABLE and len(CATEGORIES) > 3:
-            news_api = NewsAPI()
-            for category in CATEGORIES[3:]:
+        if GENERATION_MODE == 'batched':
+            # One headline sweep for every category, then a single crew run
+            # covering all crew categories (about 2 LLM calls instead of 2 per category)
+            with stage('fetch'):
+                headlines_by_category = _fetch_all_headlines(CATEGORIES)
+            results = {category: None for category in CREW_CATEGORIES}
+            if CREW_AVAILABLE:
                 try:
-                    articles = news_api.get_top_headlines(category=category, page_size=1)
-                    if articles:
-                        latest_article = articles[0]
-                        latest_article['category'] = category
-                        all_articles.append(latest_article)
-                        per_category_articles[category] = [latest_article]
-                        logger.info(f"Fetched 1 article for {category} using NewsAPI batch.")
-                    else:
-                        logger.warning(f"No articles found for {category} in NewsAPI batch.")
-                except Exception as newsapi_error:
-                    logger.error(f"NewsAPI batch fetch failed for {category}: {newsapi_error}")
-                # Add a delay to avoid NewsAPI rate limits (safe: 1s per call)
-                time.sleep(1)
-        
-        # Update the cache with the newly generated articles
-        ARTICLE_CACHE['articles'] = all_articles
-        ARTICLE_CACHE['last_generated'] = datetime.now()
+                    results = _crew_articles(CREW_CATEGORIES, headlines_by_category)
+                except Exception as e:
+                    logger.error(f"Batched crew run failed: {e}")
+            for category in CATEGORIES[3:]:
+                headlines = headlines_by_category.get(category)
+                results[category] = headlines[0] if headlines else None
+        else:
+            # Categories are independent, so fan them out over the worker pool;
+            # the per-provider rate limiters replace the old fixed sleeps.
+            tasks = [(category, partial(_crew_category_article, category)) for category in CREW_CATEGORIES]
+            if NEWSAPI_AVAILABLE:
+                tasks += [(category, partial(_newsapi_category_article, category)) for category in CATEGORIES[3:]]
+            results = GENERATION_POOL.run(tasks)
+        fresh = [article for article in results.values() if article]
+
+        # Categories that failed this run (e.g. the crew errored) keep their last
+        # published articles instead of vanishing from /news and the snapshot file
+        previous = ARTICLE_STORE.snapshot.by_category
+        failed = [category for category, article in results.items() if not article]
+        kept = [article for category in failed for article in previous.get(category.lower(), ())]
+        if kept:
+            logger.warning(f"Keeping {len(kept)} earlier articles for categories that failed to generate.")
+
+        # Publish the newly generated articles
+        snapshot = ARTICLE_STORE.publish(fresh + kept)
+        for category, article in results.items():
+            if article:
+                SCHEDULER.mark_fresh(category, snapshot.generated_at)
+        return {'published': len(fresh), 'categories': [c for c, a in results.items() if a]}
     except Exception as e:
         logger.error(f"Error in background article generation: {e}")
-    finally:
-        ARTICLE_CACHE['generation_in_progress'] = False
+        raise
+
+def _refresh_category(category):
+    """Regenerate a single category and publish it (used by the freshness scheduler)"""
+    if category in CREW_CATEGORIES and CREW_AVAILABLE:
+        generate = _crew_category_article
+    elif category not in CREW_CATEGORIES and NEWSAPI_AVAILABLE:
+        generate = _newsapi_category_article
+    else:
+        return False
+
+    def refresh():
+        article = generate(category)
+        if article is None:
+            raise LookupError(f'No article generated for {category}')
+        ARTICLE_STORE.publish_category(category, [article])
+        return {'published': 1, 'categories': [category]}
+
+    # Scheduled refreshes share the work queue (below on-demand requests)
+    try:
+        job = _start_refresh('scheduled', refresh, params={'category': category})
+    except QueueFull:
+        logger.warning(f"Work queue full; deferring scheduled refresh of {category}")
+        return False
+    if job is None:
+        return False
+    job.wait()
+    return job.status == SUCCEEDED
+
+def _refresh_crew_categories(categories):
+    """
+    Regenerate several crew categories with one crew run (GENERATION_MODE=batched)
+    and publish those that produced an article. Returns {category: success}.
+    """
+    def refresh():
+        with stage('fetch'):
+            headlines_by_category = _fetch_all_headlines(categories)
+        results = _crew_articles(categories, headlines_by_category)
+        written = {category: [article] for category, article in results.items() if article}
+        if not written:
+            raise LookupError(f'No articles generated for {", ".join(categories)}')
+        ARTICLE_STORE.publish_categories(written)
+        return {'published': len(written), 'categories': list(written)}
+
+    try:
+        job = _start_refresh('scheduled', refresh, params={'categories': categories})
+    except QueueFull:
+        logger.warning(f"Work queue full; deferring scheduled refresh of {', '.join(categories)}")
+        return {}
+    if job is None:
+        return {}
+    job.wait()
+    published = job.result['categories'] if job.status == SUCCEEDED else []
+    return {category: category in published for category in categories}
+
+def _category_fingerprint(category):
+    """Hash of the category's current top headlines, to detect upstream changes"""
+    headlines = _fetch_headlines(category, HEADLINE_CHECK_SIZE)
+    return headlines_fingerprint(headlines) if headlines is not None else None
+
+SCHEDULER = FreshnessScheduler(
+    CATEGORIES,
+    _refresh_category,
+    max_age=timedelta(hours=CACHE_DURATION_HOURS),
+    fingerprint=_category_fingerprint if NEWSAPI_AVAILABLE else None,
+    check_interval=timedelta(minutes=float(os.getenv('HEADLINE_CHECK_MINUTES', 15))),
+    tick_seconds=float(os.getenv('SCHEDULER_TICK_SECONDS', 30)),
+    max_per_tick=int(os.getenv('SCHEDULER_MAX_PER_TICK', 2)),
+    can_run=lambda: not ARTICLE_STORE.refreshing,
+    # Due crew categories share one crew run, like the standard run
+    refresh_batch=_refresh_crew_categories,
+    batch=CREW_CATEGORIES if GENERATION_MODE == 'batched' and CREW_AVAILABLE else ()
+)
+
+# Articles restored from disk are as fresh as the run that produced them
+for _category in ARTICLE_STORE.snapshot.by_category:
+    SCHEDULER.mark_fresh(_category, ARTICLE_STORE.last_generated)
+
+def _article_image(article, category):
+    """Premium AI image for an article as a dict ({'status': 'failed'} if generation fails)"""
+    try:
+        prompt = f"High-quality {category} news illustration for: {article['title'][:80]}"
+        image_result = IMAGE_GENERATOR.generate_image(
+            prompt=prompt,
+            article_title=article['title'],
+            style="premium"
+        )
+        return image_result.model_dump()
+    except Exception as img_error:
+        logger.warning(f"Image generation failed: {img_error}")
+        return {'status': 'failed'}
+
+def _build_category_newsletter(category, limit, include_images):
+    """Crew article (plus AI image) for one category; raises LookupError when nothing was written"""
+    logger.info(f"Generating {category} newsletter with {limit} articles using Newsagent agent (CrewAI)")
+    latest_article = _crew_category_article(category)
+    if latest_article is None:
+        raise LookupError(f'No articles generated for category: {category}')
+
+    if include_images:
+        with stage('image'):
+            latest_article['ai_image'] = _article_image(latest_article, category)
+
+    return {
+        'status': 'success',
+        'category': category,
+        'count': 1,
+        'articles': [latest_article]
+    }
 
 @app.route('/api/categories/<category>/newsletter', methods=['POST'])
 def generate_category_newsletter(category):
@@ -215,81 +673,36 @@ def generate_category_newsletter(category):
             }), 400
 
         data = request.get_json() or {}
-        limit = data.get('limit', 5)
-        include_images = data.get('include_images', True)
-
-        logger.info(f"Generating {category} newsletter with {limit} articles using Newsagent agent (CrewAI)")
-
-        if CREW_AVAILABLE:
-            # Use Newsagent agent (CrewAI) for category-specific newsletter generation
-            from newsagent.crew import Newsagent
-            from datetime import datetime
-            # Prepare inputs for the agent
-            inputs = {
-                'categories': category,
-                'current_date': datetime.now().strftime('%Y-%m-%d'),
-                'current_time': datetime.now().strftime('%H:%M:%S')
-            }
-            try:
-                crew = Newsagent().crew()
-                result = crew.kickoff(inputs=inputs)
-                # result should contain articles, but may need formatting
-                articles = result.get('articles', []) if isinstance(result, dict) else []
-                if not articles:
-                    # fallback: try to parse result if it's a string
-                    import ast
-                    try:
-                        parsed = ast.literal_eval(result)
-                        articles = parsed.get('articles', [])
-                    except Exception:
-                        articles = []
-                # Only keep the latest article for this category
-                if articles:
-                    latest_article = articles[0]
-                    latest_article['category'] = category
-                    logger.info(f"Generated 1 article for {category} using Newsagent agent.")
-                else:
-                    logger.warning(f"No articles generated for {category} by Newsagent agent.")
-            except Exception as agent_error:
-                logger.error(f"Newsagent agent generation failed for {category}: {agent_error}")
-                return jsonify({
-                    'status': 'error',
-                    'message': f"Newsagent agent error: {agent_error}"
-                }), 500
-        else:
+        try:
+            # Part of the job key, so only a small set of values is accepted
+            limit = max(1, min(int(data.get('limit', 5)), NEWSLETTER_MAX_LIMIT))
+        except (TypeError, ValueError):
+            return jsonify({
+                'status': 'error',
+                'message': 'limit must be an integer'
+            }), 400
+        include_images = bool(data.get('include_images', True))
+
+        if not CREW_AVAILABLE:
             return jsonify({
                 'status': 'error',
                 'message': 'CrewAI modules not available'
             }), 503
 
-        if include_images and CREW_AVAILABLE:
-            # Add AI images to the article using Newsagent's ImageGenerator
-            from newsagent.tools.custom_tool import ImageGenerator
-            image_generator = ImageGenerator()
-            
-            try:
-                prompt = f"High-quality {category} news illustration for: {latest_article['title'][:80]}"
-                image_result = image_generator._run(
-                    prompt=prompt,
-                    article_title=latest_article['title'],
-                    style="premium"
-                )
-                
-                if image_result:
-                    latest_article['ai_image'] = eval(image_result) if isinstance(image_result, str) else image_result
-                else:
-                    latest_article['ai_image'] = {'status': 'failed'}
-            except Exception as img_error:
-                logger.warning(f"Image generation failed: {img_error}")
-                latest_article['ai_image'] = {'status': 'failed'}
-
-        return jsonify({
-            'status': 'success',
-            'category': category,
-            'count': 1,
-            'articles': [latest_article]
-        })
+        # Runs as a job so the request returns at once. Identical requests join the
+        # same job, and the finished result is reused for a short window.
+        key = (category, limit, include_images)
+        job = JOBS.submit(
+            'newsletter',
+            partial(NEWSLETTER_FLIGHTS.do, key, partial(_build_category_newsletter, *key)),
+            params={'category': category, 'limit': limit, 'include_images': include_images},
+            key=('newsletter',) + key,
+            priority=PRIORITY_ON_DEMAND
+        )
+        return _job_accepted(job, category=category)
         
+    except QueueFull as e:
+        return _queue_full_response(e)
     except Exception as e:
         logger.error(f"Error generating {category} newsletter: {e}")
         return jsonify({
@@ -297,6 +710,20 @@ def generate_category_newsletter(category):
             'message': str(e)
         }), 500
 
+def category_articles_payload(category, articles):
+    """(body, status) for a category's live headlines (shared with the ASGI app)"""
+    if articles:
+        return {
+            'status': 'success',
+            'category': category,
+            'count': len(articles),
+            'articles': articles
+        }, 200
+    return {
+        'status': 'error',
+        'message': f'No articles found for category: {category}'
+    }, 404
+
 @app.route('/api/categories/<category>', methods=['GET'])
 def get_category_articles(category):
     """Get latest articles for a specific category"""
@@ -311,25 +738,14 @@ def get_category_articles(category):
         limit = request.args.get('limit', 10, type=int)
 
         if NEWSAPI_AVAILABLE:
-            news_api = NewsAPI()
-            articles = news_api.get_top_headlines(category=category, page_size=limit)
-            if articles:
-                return jsonify({
-                    'status': 'success',
-                    'category': category,
-                    'count': len(articles),
-                    'articles': articles
-                })
-            else:
-                return jsonify({
-                    'status': 'error',
-                    'message': f'No articles found for category: {category}'
-                }), 404
+            articles = NEWS_SOURCE.top_headlines(category, limit)
         else:
             return jsonify({
                 'status': 'error',
                 'message': 'NewsAPI not available'
             }), 503
+        payload, status = category_articles_payload(category, articles)
+        return jsonify(payload), status
     except Exception as e:
         logger.error(f"Error fetching {category} articles: {e}")
         return jsonify({
@@ -344,45 +760,29 @@ def quick_run():
         data = request.get_json() or {}
         categories = data.get('categories', ['technology', 'business'])
         
-        if ARTICLE_CACHE['generation_in_progress']:
-            return jsonify({
-                'status': 'busy',
-                'message': 'Another generation is in progress'
-            }), 409
-        
         def quick_generation():
-            global ARTICLE_CACHE
-            ARTICLE_CACHE['generation_in_progress'] = True
-            
-            try:
-                all_articles = []
-                if NEWSAPI_AVAILABLE:
-                    news_api = NewsAPI()
+            all_articles = []
+            if NEWSAPI_AVAILABLE:
+                with stage('fetch'):
                     for category in categories[:2]:  # Limit to 2 categories for quick run
-                        articles = news_api.get_top_headlines(category=category, page_size=2)
+                        articles = NEWS_SOURCE.top_headlines(category, 2)
                         if articles:
                             all_articles.extend(articles[:2])  # 2 articles per category
-                        # Add a delay to avoid NewsAPI rate limits (safe: 1s per call)
-                        time.sleep(1)
-                
-                ARTICLE_CACHE['articles'] = all_articles
-                ARTICLE_CACHE['last_generated'] = datetime.now()
-                ARTICLE_CACHE['generation_in_progress'] = False
-                
-            except Exception as e:
-                logger.error(f"Quick generation error: {e}")
-                ARTICLE_CACHE['generation_in_progress'] = False
+            
+            ARTICLE_STORE.publish(all_articles)
+            return {'published': len(all_articles)}
         
-        thread = threading.Thread(target=quick_generation, daemon=True)
-        thread.start()
+        job = _start_refresh('quick', quick_generation, params={'categories': categories[:2]})
+        if job is None:
+            return jsonify({
+                'status': 'busy',
+                'message': 'Another generation is in progress'
+            }), 409
         
-        return jsonify({
-            'status': 'success',
-            'run_type': 'quick',
-            'message': 'Quick generation started',
-            'estimated_duration': '30 seconds'
-        })
+        return _job_accepted(job, run_type='quick', message='Quick generation started')
         
+    except QueueFull as e:
+        return _queue_full_response(e)
     except Exception as e:
         logger.error(f"Quick run error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -394,23 +794,18 @@ def standard_schedule_run():
         data = request.get_json() or {}
         categories = data.get('categories', ['technology', 'business', 'general'])
         
-        if ARTICLE_CACHE['generation_in_progress']:
+        # Start standard generation in background (this is our current generate_articles_background)
+        job = _start_refresh('standard', generate_articles_background)
+        if job is None:
             return jsonify({
                 'status': 'busy',
                 'message': 'Another generation is in progress'
             }), 409
         
-        # Start standard generation in background (this is our current generate_articles_background)
-        thread = threading.Thread(target=generate_articles_background, daemon=True)
-        thread.start()
-        
-        return jsonify({
-            'status': 'success',
-            'run_type': 'standard',
-            'message': 'Standard generation started with AI images',
-            'estimated_duration': '2-3 minutes'
-        })
+        return _job_accepted(job, run_type='standard', message='Standard generation started with AI images')
         
+    except QueueFull as e:
+        return _queue_full_response(e)
     except Exception as e:
         logger.error(f"Standard run error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -422,75 +817,137 @@ def premium_schedule_run():
         data = request.get_json() or {}
         categories = data.get('categories', CATEGORIES[:4])  # Use more categories
         
-        if ARTICLE_CACHE['generation_in_progress']:
+        def premium_generation():
+            all_articles = []
+            if NEWSAPI_AVAILABLE:
+                # Images for one category are generated on the bounded image pool
+                # while the next category's headlines are being fetched; stories
+                # already seen (other outlets or categories) get neither. The
+                # image stage covers the wait for images still running after the fetch.
+                images = []
+                seen = DEDUPER.index()
+                with stage('fetch'):
+                    for category in categories:
+                        articles = NEWS_SOURCE.top_headlines(category, 4)
+                        for article in articles or []:
+                            if DEDUPER.is_duplicate(seen, article):
+                                continue
+                            article['category'] = category
+                            all_articles.append(article)
+                            images.append((article, IMAGE_POOL.submit(partial(_article_image, article, category))))
+                with stage('image'):
+                    for article, image in images:
+                        article['ai_image'] = image.result()
+            
+            ARTICLE_STORE.publish(all_articles)
+            return {'published': len(all_articles)}
+        
+        job = _start_refresh('premium', premium_generation, params={'categories': categories}, priority=PRIORITY_BATCH)
+        if job is None:
             return jsonify({
                 'status': 'busy',
                 'message': 'Another generation is in progress'
             }), 409
         
-        def premium_generation():
-            global ARTICLE_CACHE
-            ARTICLE_CACHE['generation_in_progress'] = True
-            
-            try:
-                all_articles = []
-                if NEWSAPI_AVAILABLE:
-                    news_api = NewsAPI()
-                    image_generator = ImageGenerator()
-                    
-                    for category in categories:
-                        articles = news_api.get_top_headlines(category=category, page_size=4)
-                        if articles:
-                            # Add AI images to all articles
-                            for article in articles:
-                                try:
-                                    prompt = f"High-quality {category} news illustration for: {article['title'][:80]}"
-                                    image_result = image_generator._run(
-                                        prompt=prompt,
-                                        article_title=article['title'],
-                                        style="premium"
-                                    )
-                                    
-                                    if image_result:
-                                        article['ai_image'] = eval(image_result) if isinstance(image_result, str) else image_result
-                                        
-                                except Exception as img_error:
-                                    logger.warning(f"Image generation failed: {img_error}")
-                                    article['ai_image'] = {'status': 'failed'}
-                            
-                            all_articles.extend(articles)
-                        # Add a delay to avoid NewsAPI rate limits (safe: 1s per call)
-                        time.sleep(1)
-                
-                ARTICLE_CACHE['articles'] = all_articles
-                ARTICLE_CACHE['last_generated'] = datetime.now()
-                ARTICLE_CACHE['generation_in_progress'] = False
-                
-            except Exception as e:
-                logger.error(f"Premium generation error: {e}")
-                ARTICLE_CACHE['generation_in_progress'] = False
-        
-        thread = threading.Thread(target=premium_generation, daemon=True)
-        thread.start()
-        
-        return jsonify({
-            'status': 'success',
-            'run_type': 'premium',
-            'message': 'Premium generation started with enhanced AI processing',
-            'estimated_duration': '5-7 minutes'
-        })
+        return _job_accepted(job, run_type='premium', message='Premium generation started with enhanced AI processing')
         
+    except QueueFull as e:
+        return _queue_full_response(e)
     except Exception as e:
         logger.error(f"Premium run error: {e}")
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Get the most recent generation jobs"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'status': 'success', 'queue': JOBS.queue.stats(), 'jobs': JOBS.recent(limit)})
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Get a generation job's status, per-stage progress and result"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    return jsonify({'status': 'success', 'job': job.to_dict()})
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a job that is still waiting in the work queue"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    if not JOBS.cancel(job_id):
+        return jsonify({
+            'status': 'error',
+            'message': f'Job is {job.status}; only queued jobs can be cancelled'
+        }), 409
+    return jsonify({'status': 'success', 'job': job.to_dict()})
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """Stream a job's progress as Server-Sent Events until it finishes"""
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Job not found'}), 404
+    # Reconnecting EventSource clients resume after the last event they saw
+    last_seen = request.headers.get('Last-Event-ID', 0, type=int)
+
+    def events():
+        seq = last_seen
+        while True:
+            batch = job.events_since(seq, SSE_KEEPALIVE_SECONDS)
+            if not batch:
+                if job.finished:
+                    break
+                yield ': keep-alive\n\n'
+                continue
+            for event in batch:
+                seq = event['seq']
+                yield sse_message(event['type'], event, seq)
+        yield sse_message('done', job.to_dict())
+
+    response = app.response_class(events(), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/categories', methods=['GET'])
 def get_available_categories():
     """Get list of available news categories"""
+    return _rendered_response(CATEGORIES_RESPONSE)
+
+@app.route('/api/scheduler/status', methods=['GET'])
+def get_scheduler_status():
+    """Get per-category freshness with last-run and next-run times"""
+    return jsonify({
+        'status': 'success',
+        'scheduler': SCHEDULER.status(),
+        'change_detection': CHANGE_TRACKER.stats(),
+        'dedupe': DEDUPER.stats(),
+        'ranking': ranking_stats(),
+        'archive': ARCHIVE.stats() if ARCHIVE is not None else None,
+        'newsletter_requests': NEWSLETTER_FLIGHTS.stats()
+    })
+
+@app.route('/api/llm-cache', methods=['GET'])
+def get_llm_cache_stats():
+    """Get LLM completion cache hit statistics"""
+    cache = get_completion_cache()
     return jsonify({
         'status': 'success',
-        'categories': CATEGORIES,
-        'total_count': len(CATEGORIES)
+        'enabled': cache is not None,
+        'cache': cache.stats() if cache is not None else {},
+        'text_service': get_text_service().stats()
+    })
+
+@app.route('/api/rate-limits', methods=['GET'])
+def get_rate_limits():
+    """Get per-provider rate limiter metrics (waiting vs. working time)"""
+    return jsonify({
+        'status': 'success',
+        'providers': rate_limit_metrics(),
+        'news_source': get_news_source().stats()
     })
 
 @app.route('/api/scheduler/run-types', methods=['GET'])
@@ -520,6 +977,15 @@ def get_run_types():
         }
     })
 
+def start_services():
+    """Background services shared by the threaded (app.run) and ASGI servers"""
+    # Build the crew(s) up front so the first refresh doesn't pay for it
+    if CREW_AVAILABLE:
+        get_crew_pool().prewarm(1)
+
+    # Refresh stale categories in the background (all of them on a cold start)
+    SCHEDULER.start()
+
 if __name__ == '__main__':
     # Check environment variables
     newsapi_key = os.getenv('NEWSAPI_KEY')
@@ -538,9 +1004,7 @@ if __name__ == '__main__':
     logger.info(f"NewsAPI Available: {NEWSAPI_AVAILABLE}")
     logger.info(f"CrewAI Available: {CREW_AVAILABLE}")
     
-    # Trigger initial generation
-    initial_generation_thread = threading.Thread(target=generate_articles_background, daemon=True)
-    initial_generation_thread.start()
+    start_services()
 
     app.run(
         host='0.0.0.0',
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+InfoPulse Newsletter API Server (ASGI)
+Run with: uvicorn asgi:app --host 0.0.0.0 --port 5000
+
+Read paths, job event streams and the endpoints that wait on NewsAPI or
+Stability are served natively async, so thousands of pollers and in-flight
+upstream calls don't each hold a thread. Every other endpoint is the Flask
+app from app.py, run on a bounded thread pool through a2wsgi.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from werkzeug.http import parse_accept_header, parse_etags, quote_etag
+
+import app as api
+from newsagent import async_transport
+from newsagent.image_cache import get_image_cache, is_image_key
+from newsagent.jobs import sse_message
+from newsagent.news_source import get_news_source
+
+logger = logging.getLogger(__name__)
+
+# Threads running the Flask app for the endpoints that aren't async
+WSGI_WORKERS = int(os.getenv('ASGI_WSGI_WORKERS', 16))
+
+FLASK_APP = WSGIMiddleware(api.app, workers=WSGI_WORKERS)
+
+CORS = [Middleware(CORSMiddleware, allow_origins=api.CORS_ORIGINS, allow_methods=['*'], allow_headers=['*'])]
+
+
+def rendered_response(request: Request, rendered) -> Response:
+    """Async twin of app._rendered_response (ETag/304, Accept-Encoding, no-cache)"""
+    accepted = parse_accept_header(request.headers.get('accept-encoding'))
+    encoding = next((e for e in rendered.encodings if e in accepted), None)
+    if_none_match = parse_etags(request.headers.get('if-none-match'))
+    etags = {rendered.variant_etag(e) for e in (None,) + rendered.encodings}
+    headers = {
+        'ETag': quote_etag(rendered.variant_etag(encoding)),
+        'Vary': 'Accept-Encoding',
+        'Cache-Control': 'no-cache',
+    }
+    if any(if_none_match.contains(etag) for etag in etags):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return Response(rendered.variant(encoding), media_type='application/json', headers=headers)
+
+
+def _int_param(request: Request, name: str, default=None):
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def get_news(request: Request) -> Response:
+    """Get news articles, optionally filtered by category"""
+    category = request.query_params.get('category')
+    return rendered_response(request, api.ARTICLE_STORE.snapshot.view(category, _int_param(request, 'limit')))
+
+
+async def get_available_categories(request: Request) -> Response:
+    """Get list of available news categories"""
+    return rendered_response(request, api.CATEGORIES_RESPONSE)
+
+
+async def get_image(request: Request) -> Response:
+    """Stream a generated image from the image store (ETag, Cache-Control and Range aware)"""
+    image_id = request.path_params['image_id']
+    if not is_image_key(image_id):
+        return JSONResponse({"error": "Invalid image id"}, status_code=400)
+    path = get_image_cache().lookup(image_id)
+    if path is None:
+        return JSONResponse({"error": "Image not found"}, status_code=404)
+    headers = {
+        'ETag': quote_etag(image_id),
+        'Cache-Control': f'public, max-age={api.IMAGE_MAX_AGE_SECONDS}, immutable',
+    }
+    if parse_etags(request.headers.get('if-none-match')).contains(image_id):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type='image/png', headers=headers)
+
+
+class CategoryArticles:
+    """
+    Live headlines for a category from the async news source. Falls back to the
+    Flask endpoint (and its 503) when no NewsAPI key is set.
+    """
+
+    async def __call__(self, scope, receive, send):
+        source = get_news_source()
+        if not source.available:
+            await FLASK_APP(scope, receive, send)
+            return
+        request = Request(scope, receive)
+        category = request.path_params['category']
+        if category not in api.CATEGORIES:
+            response = JSONResponse({
+                'status': 'error',
+                'message': f'Invalid category. Available categories: {", ".join(api.CATEGORIES)}'
+            }, status_code=400)
+        else:
+            try:
+                articles = await source.atop_headlines(category, _int_param(request, 'limit', 10))
+                payload, status = api.category_articles_payload(category, articles)
+                response = JSONResponse(payload, status_code=status)
+            except Exception as e:
+                logger.error(f"Error fetching {category} articles: {e}")
+                response = JSONResponse({'status': 'error', 'message': str(e)}, status_code=500)
+        await response(scope, receive, send)
+
+
+async def generate_image(request: Request) -> Response:
+    """Generate an AI image based on prompt (the Stability call is awaited, not threaded)"""
+    try:
+        data = await request.json()
+        prompt = data.get('prompt')
+        if not prompt:
+            return JSONResponse({"error": "No prompt provided"}, status_code=400)
+        if api.IMAGE_GENERATOR is None:
+            return JSONResponse({"error": "CrewAI modules not available"}, status_code=503)
+
+        image_result = await api.IMAGE_GENERATOR.agenerate_image(prompt=prompt, article_title=prompt[:80])
+
+        return JSONResponse({"url": image_result.image_url})
+    except Exception as e:
+        logger.error(f"Error generating image: {e}")
+        return JSONResponse({"error": str(e)}, status_code=500)
+
+
+async def get_job(request: Request) -> Response:
+    """Get a generation job's status, per-stage progress and result"""
+    job = api.JOBS.get(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'status': 'error', 'message': 'Job not found'}, status_code=404)
+    return JSONResponse({'status': 'success', 'job': job.to_dict()})
+
+
+async def stream_job_events(request: Request) -> Response:
+    """Stream a job's progress as Server-Sent Events until it finishes"""
+    job = api.JOBS.get(request.path_params['job_id'])
+    if job is None:
+        return JSONResponse({'status': 'error', 'message': 'Job not found'}, status_code=404)
+    try:
+        last_seen = int(request.headers.get('last-event-id', 0))
+    except ValueError:
+        last_seen = 0
+
+    async def events():
+        seq = last_seen
+        while True:
+            batch = await job.aevents_since(seq, api.SSE_KEEPALIVE_SECONDS)
+            if not batch:
+                if job.finished:
+                    break
+                yield ': keep-alive\n\n'
+                continue
+            for event in batch:
+                seq = event['seq']
+                yield sse_message(event['type'], event, seq)
+        yield sse_message('done', job.to_dict())
+
+    return StreamingResponse(events(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    await asyncio.to_thread(api.start_services)
+    yield
+    api.SCHEDULER.stop()
+    await async_transport.aclose()
+    await asyncio.to_thread(api.JOBS.queue.drain)
+
+
+app = Starlette(
+    routes=[
+        Route('/news', get_news, methods=['GET'], middleware=CORS),
+        Route('/images/{image_id}', get_image, methods=['GET'], middleware=CORS),
+        Route('/generate-image', generate_image, methods=['POST', 'OPTIONS'], middleware=CORS),
+        Route('/api/categories', get_available_categories, methods=['GET'], middleware=CORS),
+        Route('/api/categories/{category}', CategoryArticles(), methods=['GET'], middleware=CORS),
+        Route('/api/jobs/{job_id}', get_job, methods=['GET'], middleware=CORS),
+        Route('/api/jobs/{job_id}/events', stream_job_events, methods=['GET'], middleware=CORS),
+        # Everything else (generation, status and job management endpoints) is served by Flask
+        Mount('/', app=FLASK_APP),
+    ],
+    lifespan=lifespan,
+)
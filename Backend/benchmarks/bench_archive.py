@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: archive page reads as the history grows.
+
+Fills day-partitioned archives with a fixed number of articles per day (one
+snapshot publish per refresh) for a short and a long history, then times
+cursor-paginated reads: the newest page, a page deep in the history (resumed
+from a cursor), a category-filtered page and a single-day page. Read times
+should stay flat as the archive grows.
+Usage: python benchmarks/bench_archive.py [articles_per_day] [long_history_days]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.archive import ArticleArchive
+from newsagent.article_store import Snapshot
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+REFRESHES_PER_DAY = 12
+
+
+def fill(directory, days, per_day, rng):
+    archive = ArticleArchive(directory, retention_days=0)
+    start = datetime(2026, 1, 1, 6)
+    batch = per_day // REFRESHES_PER_DAY
+    started = time.perf_counter()
+    for day in range(days):
+        for refresh in range(REFRESHES_PER_DAY):
+            at = start + timedelta(days=day, hours=refresh)
+            articles = tuple({
+                'title': f'Story {day}-{refresh}-{i}',
+                'description': 'word ' * rng.randint(20, 40),
+                'content': 'word ' * rng.randint(150, 300),
+                'category': rng.choice(CATEGORIES),
+                'url': f'https://news.example/{day}/{refresh}/{i}',
+            } for i in range(batch))
+            archive.archive_snapshot(Snapshot(articles, at, day * REFRESHES_PER_DAY + refresh))
+    elapsed = time.perf_counter() - started
+    return archive, elapsed, start
+
+
+def timed(samples, fn):
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def bench(days, per_day, rng):
+    directory = tempfile.mkdtemp(prefix='archive-bench-')
+    try:
+        archive, elapsed, start = fill(directory, days, per_day, rng)
+        total = archive.stats()['articles_archived']
+        # Cursor halfway through the history
+        middle = (start + timedelta(days=days // 2)).date().isoformat()
+        _, cursor = archive.articles(until=middle, limit=1)
+        one_day = (start + timedelta(days=days // 3)).date().isoformat()
+        results = {
+            'newest page': timed(50, lambda: archive.articles(limit=20)),
+            'deep page (cursor)': timed(50, lambda: archive.articles(cursor=cursor, limit=20)),
+            'category page': timed(50, lambda: archive.articles(category='health', limit=20)),
+            'single day page': timed(50, lambda: archive.articles(since=one_day, until=one_day, limit=20)),
+        }
+        print(f"{days:4d} days, {total:7d} articles (archived in {elapsed:5.1f} s): "
+              + '  '.join(f"{label} {ms:5.2f} ms" for label, ms in results.items()))
+        archive.close()
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 240
+    long_days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    rng = random.Random(5)
+    for days in (7, long_days):
+        bench(days, per_day, rng)
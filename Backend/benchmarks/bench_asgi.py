@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Load test: the threaded Flask dev server (app.run) vs. the ASGI app (asgi.py
+under uvicorn) with many concurrent clients.
+
+Each server runs in a subprocess against a local stub NewsAPI that takes
+--latency ms per response. Clients alternate between /news (served from
+memory) and /api/categories/technology?limit=N (waits on the stub; N varies so
+requests aren't coalesced). Reports requests/s, p50/p99 latency (overall and
+for the category requests alone) and the server's peak thread count.
+
+By default clients send back to back, so each server runs flat out and the
+faster one handles several times more /news requests in the same CPU; on a
+small machine that CPU is shared with the clients and the stub, and the
+category requests' tail reflects the saturated CPU rather than the server.
+--rate=N paces the clients to N requests/s in total (latency is measured
+from each request's scheduled start) to compare the servers at the same load.
+
+Requires aiohttp for the load-generating clients (pip install aiohttp); the
+servers themselves don't use it.
+
+Usage: python benchmarks/bench_asgi.py [concurrent_clients] [--latency=ms] [--duration=s] [--rate=req/s]
+"""
+
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import httpx
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+PAYLOAD = json.dumps({
+    'status': 'ok',
+    'articles': [{'title': f'stub {i}', 'url': f'https://example.com/{i}', 'source': {'name': 'stub'}} for i in range(10)]
+}).encode()
+LATENCY = 0.2
+
+THREADED_SERVER = (
+    "import app; app.app.run(host='127.0.0.1', port={port}, threaded=True, use_reloader=False)"
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops bursts of concurrent connects (1 s SYN retries)
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def thread_count(pid: int) -> int:
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('Threads:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def start_server(kind: str, port: int, env: dict) -> subprocess.Popen:
+    if kind == 'threaded':
+        command = [sys.executable, '-c', THREADED_SERVER.format(port=port)]
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--host', '127.0.0.1',
+                   '--port', str(port), '--lifespan', 'off', '--log-level', 'warning']
+    process = subprocess.Popen(command, cwd=BACKEND, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f'http://127.0.0.1:{port}/api/categories', timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start")
+
+
+async def load(base_url: str, clients: int, duration: float, pid: int, rate: float = 0):
+    latencies = []
+    category_latencies = []
+    errors = 0
+    peak_threads = thread_count(pid)
+    deadline = time.monotonic() + duration
+
+    async def client(index: int, http: aiohttp.ClientSession):
+        nonlocal errors
+        n = index
+        interval = clients / rate if rate else 0.0
+        start = time.perf_counter() + index / rate if rate else 0.0
+        while time.monotonic() < deadline:
+            n += clients
+            path = '/news' if n % 2 else f'/api/categories/technology?limit={n % 100 + 1}'
+            if rate:
+                # Open loop: a slow response doesn't delay the next request's schedule
+                delay = start - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                start = time.perf_counter()
+            try:
+                async with http.get(base_url + path) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+                start += interval
+                continue
+            latencies.append(time.perf_counter() - start)
+            if n % 2 == 0:
+                category_latencies.append(latencies[-1])
+            start += interval
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while time.monotonic() < deadline:
+            peak_threads = max(peak_threads, thread_count(pid))
+            await asyncio.sleep(0.05)
+
+    # aiohttp rather than httpx: httpx's pool adds seconds of queueing at this concurrency
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30)) as http:
+        started = time.perf_counter()
+        await asyncio.gather(sample_threads(), *(client(i, http) for i in range(clients)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    category_latencies.sort()
+    return len(latencies), errors, elapsed, latencies, category_latencies, peak_threads
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000 if values else 0.0
+
+
+def bench(kind: str, clients: int, duration: float, env: dict, rate: float = 0):
+    port = free_port()
+    process = start_server(kind, port, env)
+    try:
+        done, errors, elapsed, latencies, category_latencies, peak_threads = asyncio.run(
+            load(f'http://127.0.0.1:{port}', clients, duration, process.pid, rate)
+        )
+    finally:
+        process.terminate()
+        process.wait(10)
+    print(f"{kind:<9} {done / elapsed:8.1f} req/s  p50 {percentile(latencies, 0.5):7.1f} ms  "
+          f"p99 {percentile(latencies, 0.99):8.1f} ms  categories p50 {percentile(category_latencies, 0.5):7.1f} ms  "
+          f"p99 {percentile(category_latencies, 0.99):8.1f} ms  errors {errors:4d}  peak threads {peak_threads:4d}")
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    clients = int(args[0]) if args else 200
+    duration = 10.0
+    rate = 0.0
+    for arg in sys.argv[1:]:
+        if arg.startswith('--latency='):
+            LATENCY = float(arg.split('=', 1)[1]) / 1000
+        elif arg.startswith('--duration='):
+            duration = float(arg.split('=', 1)[1])
+        elif arg.startswith('--rate='):
+            rate = float(arg.split('=', 1)[1])
+
+    stub = StubServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+
+    env = dict(os.environ)
+    env.update({
+        'NEWSAPI_URL': f"http://127.0.0.1:{stub.server_address[1]}/v2/top-headlines",
+        'NEWSAPI_KEY': env.get('NEWSAPI_KEY', 'stub'),
+        # Measure the serving path, not the NewsAPI rate limiter or result cache
+        'NEWSAPI_RATE_PER_SEC': '100000',
+        'NEWSAPI_BURST': '100000',
+        'NEWSAPI_MAX_IN_FLIGHT': '100000',
+        'NEWS_CACHE_TTL_SECONDS': '0',
+        'PYTHONPATH': os.pathsep.join(filter(None, [os.path.join(BACKEND, 'newsagent', 'src'), env.get('PYTHONPATH')])),
+    })
+
+    pacing = f", {rate:.0f} req/s offered" if rate else ", back to back"
+    print(f"{clients} concurrent clients{pacing}, {duration:.0f} s each, {LATENCY * 1000:.0f} ms upstream latency")
+    bench('threaded', clients, duration, env, rate)
+    bench('asgi', clients, duration, env, rate)
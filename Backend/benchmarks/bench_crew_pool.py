@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark: startup and per-request cost of building Newsagent().crew() on
+every request vs. leasing a pre-built crew from the CrewPool.
+
+Only construction is measured (no kickoff, no network). Requires crewai;
+GROQ_API_KEY may be a dummy value.
+Usage: python benchmarks/bench_crew_pool.py [requests]
+"""
+
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+os.environ.setdefault('GROQ_API_KEY', 'dummy')
+os.environ.setdefault('LLM_CACHE_ENABLED', 'false')
+
+try:
+    from newsagent.crew import Newsagent
+    from newsagent.crew_pool import CrewPool
+except ImportError as e:
+    sys.exit(f"crewai is required for this benchmark: {e}")
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    startup = timed(lambda: Newsagent().crew())
+    print(f"startup (first build)       {startup:9.2f} ms")
+
+    rebuild = [timed(lambda: Newsagent().crew()) for _ in range(requests)]
+    print(f"per request, rebuild        {sum(rebuild) / requests:9.2f} ms")
+
+    pool = CrewPool(max_size=2)
+    prewarm = timed(pool.prewarm)
+    print(f"pool prewarm ({pool.max_size} crews)      {prewarm:9.2f} ms  {pool.stats()}")
+
+    def lease():
+        with pool.lease():
+            pass
+
+    leased = [timed(lease) for _ in range(requests)]
+    per_lease = sum(leased) / requests
+    print(f"per request, pooled lease   {per_lease:9.3f} ms")
+    print(f"saved per request           {sum(rebuild) / requests - per_lease:9.2f} ms  {pool.stats()}")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: near-duplicate story clustering on a synthetic refresh.
+
+Builds N distinct stories plus reworded copies "from other outlets" (a word
+dropped or swapped, a ' - Outlet' suffix, a different category) and runs them
+through StoryDeduper.dedupe_by_category. Reports time per story (numpy and
+pure-Python signatures), how many duplicates were caught (recall), how many
+distinct stories were wrongly merged away, and the crew/image calls the
+dropped stories would have cost.
+Usage: python benchmarks/bench_dedupe.py [distinct_stories]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent import dedupe
+from newsagent.dedupe import StoryDeduper
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+OUTLETS = ['Reuters', 'AP News', 'CNBC', 'The Verge', 'BBC News', 'Bloomberg', 'The Guardian']
+VOCABULARY = [
+    'apple', 'fed', 'rates', 'election', 'storm', 'vaccine', 'launch', 'merger', 'court', 'ruling',
+    'shares', 'record', 'quarter', 'profit', 'warning', 'study', 'climate', 'league', 'final', 'coach',
+    'senate', 'bill', 'chip', 'factory', 'strike', 'union', 'oil', 'prices', 'market', 'crash',
+    'startup', 'funding', 'drug', 'trial', 'space', 'rocket', 'film', 'premiere', 'album', 'tour',
+    'ceo', 'resigns', 'deal', 'talks', 'tariffs', 'exports', 'wildfire', 'evacuations', 'quake', 'rescue',
+]
+
+
+def make_refresh(distinct: int, seed: int = 7):
+    """Stories by category in fetch order, each tagged with the story_id it was written from"""
+    rng = random.Random(seed)
+    stories = []
+    for story_id in range(distinct):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(8, 12))] + [f'n{story_id}']
+        category = rng.choice(CATEGORIES)
+        stories.append((story_id, category, ' '.join(words), rng.choice(OUTLETS)))
+        # About half the stories are also carried by 1-3 other outlets, often in another category
+        for _ in range(rng.choice([0, 0, 1, 2, 3])):
+            variant = list(words)
+            position = rng.randrange(len(variant) - 1)
+            if rng.random() < 0.5:
+                del variant[position]
+            else:
+                variant[position] = rng.choice(VOCABULARY)
+            other = category if rng.random() < 0.5 else rng.choice(CATEGORIES)
+            stories.append((story_id, other, ' '.join(variant), rng.choice(OUTLETS)))
+    rng.shuffle(stories)
+
+    by_category = {category: [] for category in CATEGORIES}
+    for index, (story_id, category, title, outlet) in enumerate(stories):
+        by_category[category].append({
+            'story_id': story_id,
+            'title': f"{title.capitalize()} - {outlet}",
+            'description': f"{outlet} report on {title}.",
+            'url': f"https://{outlet.lower().replace(' ', '')}.example/{index}",
+            'source': {'name': outlet},
+        })
+    return by_category
+
+
+def evaluate(label, by_category):
+    total = sum(len(stories) for stories in by_category.values())
+    deduper = StoryDeduper(threshold=dedupe.DEDUP_THRESHOLD, enabled=True)
+    start = time.perf_counter()
+    kept = deduper.dedupe_by_category(by_category)
+    elapsed = time.perf_counter() - start
+
+    # Ground truth in the order the deduper saw stories
+    first_seen, true_duplicates = set(), 0
+    for stories in by_category.values():
+        for story in stories:
+            if story['story_id'] in first_seen:
+                true_duplicates += 1
+            first_seen.add(story['story_id'])
+    kept_stories = [story for stories in kept.values() for story in stories]
+    dropped = total - len(kept_stories)
+    kept_per_story = {}
+    for story in kept_stories:
+        kept_per_story[story['story_id']] = kept_per_story.get(story['story_id'], 0) + 1
+    missed = sum(count - 1 for count in kept_per_story.values())
+    lost = len(first_seen) - len(kept_per_story)
+
+    print(f"{label:<12} {total:6d} stories  {elapsed / total * 1e6:7.1f} us/story  "
+          f"dropped {dropped:5d}  recall {(true_duplicates - missed) / max(1, true_duplicates):6.1%}  "
+          f"distinct stories lost {lost:3d}")
+    return dropped
+
+
+if __name__ == '__main__':
+    distinct = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    refresh = make_refresh(distinct)
+    print(f"{distinct} distinct stories, threshold {dedupe.DEDUP_THRESHOLD}")
+    dropped = evaluate('numpy' if dedupe.np is not None else 'pure python', refresh)
+    if dedupe.np is not None:
+        numpy, dedupe.np = dedupe.np, None
+        evaluate('pure python', refresh)
+        dedupe.np = numpy
+    print(f"Crew stories and ImageGenerator calls avoided: {dropped}")
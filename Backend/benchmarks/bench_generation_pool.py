@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sequential category refresh vs. the bounded generation pool.
+
+Providers are stubbed with sleeps so the numbers reflect scheduling only.
+Usage: python benchmarks/bench_generation_pool.py
+"""
+
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.ratelimit import TokenBucket
+from newsagent.workers import GenerationPool
+
+CREW_CATEGORIES = ['general', 'business', 'entertainment']
+NEWSAPI_CATEGORIES = ['health', 'science', 'sports', 'technology']
+CREW_LATENCY = 1.0      # seconds per stubbed crew kickoff
+NEWSAPI_LATENCY = 0.1   # seconds per stubbed NewsAPI call
+
+
+def stub_crew(category):
+    time.sleep(CREW_LATENCY)
+    return {'title': f'{category} story', 'category': category}
+
+
+def stub_newsapi(category):
+    time.sleep(NEWSAPI_LATENCY)
+    return {'title': f'{category} headline', 'category': category}
+
+
+def sequential_refresh():
+    """Mirrors the original loop: one call at a time with fixed sleeps"""
+    articles = []
+    for category in CREW_CATEGORIES:
+        articles.append(stub_crew(category))
+        time.sleep(5)
+    for category in NEWSAPI_CATEGORIES:
+        articles.append(stub_newsapi(category))
+        time.sleep(1)
+    return articles
+
+
+def pooled_refresh(pool, limiters):
+    def limited(provider, func, category):
+        limiters[provider].acquire()
+        return func(category)
+
+    tasks = [(c, partial(limited, 'groq', stub_crew, c)) for c in CREW_CATEGORIES]
+    tasks += [(c, partial(limited, 'newsapi', stub_newsapi, c)) for c in NEWSAPI_CATEGORIES]
+    return [a for a in pool.run(tasks).values() if a]
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    articles = func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {elapsed:7.2f}s  ({len(articles)} articles)")
+    return elapsed
+
+
+if __name__ == '__main__':
+    limiters = {'groq': TokenBucket(rate=0.5, burst=3), 'newsapi': TokenBucket(rate=2.0, burst=5)}
+    pool = GenerationPool(max_workers=8)
+    sequential = timed('sequential', sequential_refresh)
+    pooled = timed('pooled', lambda: pooled_refresh(pool, limiters))
+    pool.shutdown()
+    print(f"speedup      {sequential / pooled:7.1f}x  (slowest single category: {CREW_LATENCY:.2f}s)")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: upstream NewsAPI calls and wall time for a burst of identical
+concurrent tool requests, uncoalesced vs. through the in-process NewsSource
+(single-flight + short TTL cache).
+
+Runs against a local stub NewsAPI that takes --latency ms per response.
+Usage: python benchmarks/bench_news_source.py [concurrent_requests] [--latency=ms]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent import news_source
+from newsagent.news_source import NewsSource
+
+PAYLOAD = json.dumps({
+    'status': 'ok',
+    'articles': [{'title': f'stub {i}', 'url': f'https://example.com/{i}', 'source': {'name': 'stub'}} for i in range(10)]
+}).encode()
+LATENCY = 0.2
+UPSTREAM_CALLS = 0
+_calls_lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        global UPSTREAM_CALLS
+        with _calls_lock:
+            UPSTREAM_CALLS += 1
+        time.sleep(LATENCY)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def bench(label, fetch, requests_count):
+    global UPSTREAM_CALLS
+    UPSTREAM_CALLS = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=requests_count) as executor:
+        list(executor.map(lambda _: fetch('technology', 10), range(requests_count)))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{label:<14} {UPSTREAM_CALLS:4d} upstream calls {elapsed:9.1f} ms")
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    requests_count = int(args[0]) if args else 16
+    for arg in sys.argv[1:]:
+        if arg.startswith('--latency='):
+            LATENCY = float(arg.split('=', 1)[1]) / 1000
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    news_source.NEWSAPI_URL = f"http://127.0.0.1:{server.server_address[1]}/v2/top-headlines"
+    # Keep the NewsAPI rate limiter out of the measurement
+    os.environ.setdefault('NEWSAPI_RATE_PER_SEC', '1000')
+    os.environ.setdefault('NEWSAPI_BURST', '1000')
+    os.environ.setdefault('NEWSAPI_MAX_IN_FLIGHT', '1000')
+
+    source = NewsSource(api_key='stub')
+    print(f"{requests_count} concurrent identical requests, {LATENCY * 1000:.0f} ms upstream latency")
+    bench('uncoalesced', source._load, requests_count)
+    bench('single-flight', source.top_headlines, requests_count)
+    bench('ttl cache', source.top_headlines, requests_count)
+    print(source.stats())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: premium run with serial image generation vs. the bounded image pool
+overlapping the next category's headline fetch.
+
+NewsAPI and Stability are stubbed with sleeps (scaled down from the real
+5-15 s per SDXL image) and the pool is sized to the Stability in-flight limit.
+One image in every eight fails to show that failures don't hold up the rest.
+Usage: python benchmarks/bench_premium_images.py [max_in_flight]
+"""
+
+import os
+import sys
+import time
+from functools import partial
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.workers import GenerationPool
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health']
+ARTICLES_PER_CATEGORY = 4
+NEWSAPI_LATENCY = 0.2   # seconds per stubbed headline fetch
+IMAGE_LATENCY = 1.0     # seconds per stubbed SDXL image
+
+
+def stub_headlines(category):
+    time.sleep(NEWSAPI_LATENCY)
+    return [{'title': f'{category} story {i}', 'category': category} for i in range(ARTICLES_PER_CATEGORY)]
+
+
+def stub_image(article):
+    time.sleep(IMAGE_LATENCY)
+    if article['title'].endswith('3') and article['category'] in ('business', 'health'):
+        raise RuntimeError('stub Stability error')
+    return {'status': 'generated', 'image_url': f"/images/{article['title']}"}
+
+
+def safe_image(article):
+    try:
+        return stub_image(article)
+    except Exception:
+        return {'status': 'failed'}
+
+
+def serial_run():
+    """Mirrors the original loop: fetch a category, then its images one by one"""
+    articles = []
+    for category in CATEGORIES:
+        for article in stub_headlines(category):
+            article['ai_image'] = safe_image(article)
+            articles.append(article)
+    return articles
+
+
+def pooled_run(pool):
+    articles, images = [], []
+    for category in CATEGORIES:
+        for article in stub_headlines(category):
+            articles.append(article)
+            images.append((article, pool.submit(partial(safe_image, article))))
+    for article, image in images:
+        article['ai_image'] = image.result()
+    return articles
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    articles = func()
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for a in articles if a['ai_image']['status'] == 'failed')
+    print(f"{label:<10} {elapsed:7.2f}s  ({len(articles)} articles, {failed} failed images)")
+    return elapsed
+
+
+if __name__ == '__main__':
+    max_in_flight = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    pool = GenerationPool(max_workers=max_in_flight)
+    serial = timed('serial', serial_run)
+    pooled = timed('pooled', lambda: pooled_run(pool))
+    pool.shutdown()
+    print(f"speedup    {serial / pooled:7.1f}x  (image pool size {max_in_flight})")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark: prompt tokens sent to the LLM per crew run with and without the
+pre-ranking stage.
+
+Two cases on synthetic NewsAPI-shaped stories: the News Scraper tool returning
+its maximum of 50 articles (previously the whole result went into the
+context), and a batched run's pre-fetched headlines for three categories.
+Tokens are estimated at 4 characters per token.
+Usage: python benchmarks/bench_ranking.py [runs]
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.ranking import estimate_tokens, rank_stories
+from newsagent.schemas import NewsArticle, NewsScraperResult
+
+OUTLETS = ['Reuters', 'AP News', 'CNBC', 'The Verge', 'BBC News', 'Bloomberg', 'Local Gazette', 'Some Blog']
+WORDS = ('market rates policy court election launch study results shares record growth storm season '
+         'league coach film release company deal talks report officials analysts said on tuesday').split()
+
+
+def make_stories(count, categories, seed=3):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    stories = []
+    for i in range(count):
+        outlet = rng.choice(OUTLETS)
+        stories.append({
+            'title': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize() + f' {i} - {outlet}',
+            'url': f'https://news.example/{i}',
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(40, 90))) + '.',
+            'published_at': (now - timedelta(minutes=rng.randint(0, 48 * 60))).isoformat(),
+            'source': outlet,
+            'author': f'Reporter {rng.randint(1, 40)}',
+            'image_url': f'https://cdn.news.example/{i}.jpg',
+            'category': categories[i % len(categories)],
+        })
+    return stories
+
+
+def bench(label, stories, before, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        ranked = rank_stories(stories)
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    saved = before - ranked.tokens_after
+    print(f"{label:<26} {len(stories):3d} -> {len(ranked.stories):2d} stories  "
+          f"~{before:6d} -> ~{ranked.tokens_after:5d} tokens ({saved / before:5.1%} saved)  {elapsed:6.2f} ms")
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    tool_stories = make_stories(50, ['technology'])
+    tool_output = NewsScraperResult(
+        category='technology',
+        count=len(tool_stories),
+        articles=[NewsArticle(**{k: v for k, v in story.items() if k != 'category'}) for story in tool_stories]
+    ).model_dump_json()
+    bench('News Scraper (50 fetched)', tool_stories, estimate_tokens(tool_output), runs)
+
+    batched = make_stories(30, ['general', 'business', 'entertainment'], seed=5)
+    bench('batched crew headlines', batched, rank_stories(batched).tokens_before, runs)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parse cost of str(dict) + eval/ast.literal_eval round-tripping vs.
+JSON validated against the pydantic result schemas.
+
+Payloads are realistic newsletters (6 articles of ~250 words). "inline" embeds
+a ~1.5 MB base64 PNG per article as the old ImageGenerator did; "url" carries
+only the /images/<id> URL.
+Usage: python benchmarks/bench_result_parsing.py [iterations]
+"""
+
+import ast
+import base64
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.schemas import ImageResult, Newsletter, NewsletterArticle
+
+BODY = ' '.join(['Regulators weighed the proposal as markets rallied on the news.'] * 25)
+INLINE_PNG = 'data:image/png;base64,' + base64.b64encode(os.urandom(1_100_000)).decode('ascii')
+
+
+def build_newsletter(image_url):
+    articles = []
+    for i in range(6):
+        image = ImageResult(
+            status='generated', image_url=image_url(i), alt_text='alt', caption='caption',
+            prompt_used='Professional premium news illustration ' * 4, style='premium',
+            dimensions='1344x768', article_title=f'Headline {i}', generation_note='SDXL',
+            image_id=f'{i:064x}', filename=f'ai_image_{i}.png'
+        )
+        articles.append(NewsletterArticle(
+            title=f'Headline {i}', summary='A short summary.', content=BODY, category='business',
+            source='Reuters', url=f'https://example.com/{i}', published_at='2026-10-16T09:00:00Z',
+            image_prompt='stock exchange trading floor', ai_image=image
+        ))
+    return Newsletter(edition_date='2026-10-16', articles=articles, summary='Key takeaways.')
+
+
+def bench(label, func, payload, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(payload)
+    per_call = (time.perf_counter() - start) / iterations * 1000
+    print(f"  {label:<32} {per_call:9.3f} ms/parse")
+    return per_call
+
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    payloads = {
+        'inline': build_newsletter(lambda i: INLINE_PNG),
+        'url': build_newsletter(lambda i: f'http://localhost:5000/images/{i:064x}'),
+    }
+    for name, newsletter in payloads.items():
+        as_repr = str(newsletter.model_dump())
+        as_json = newsletter.model_dump_json()
+        print(f"{name} images ({len(as_json) / 1024:.0f} KiB JSON)")
+        bench('eval(str(dict))', eval, as_repr, iterations)
+        bench('ast.literal_eval(str(dict))', ast.literal_eval, as_repr, iterations)
+        bench('Newsletter.model_validate_json', Newsletter.model_validate_json, as_json, iterations)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /api/search's inverted index on a large synthetic archive.
+
+Indexes N generated articles (title, description and a 150-300 word body with
+a Zipf-like word distribution), times an incremental publish of 20 new
+articles, then runs 1-3 term queries with and without a category filter.
+A linear scan over the same articles (what a filter like get_news would
+need) is timed for comparison.
+Usage: python benchmarks/bench_search.py [articles] [queries]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.article_store import Snapshot
+from newsagent.search import SearchIndex, tokenize
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+
+
+def make_vocabulary(rng, size=20000):
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_articles(count, vocabulary, rng, start=0):
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def words(n):
+        return ' '.join(rng.choices(vocabulary, weights, k=n))
+
+    return [{
+        'title': words(rng.randint(6, 12)),
+        'description': words(rng.randint(20, 40)),
+        'content': words(rng.randint(150, 300)),
+        'category': rng.choice(CATEGORIES),
+        'url': f'https://news.example/{start + i}',
+    } for i in range(count)]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    rng = random.Random(11)
+    vocabulary = make_vocabulary(rng)
+    articles = make_articles(count, vocabulary, rng)
+
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.index_snapshot(Snapshot(tuple(articles), None, 1))
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {count} articles in {elapsed:.1f} s ({elapsed / count * 1e6:.0f} us/article); {index.stats()}")
+
+    fresh = make_articles(20, vocabulary, rng, start=count)
+    start = time.perf_counter()
+    index.index_snapshot(Snapshot(tuple(fresh + articles[:200]), None, 2))
+    print(f"Incremental publish (20 new, 200 unchanged): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Queries mix common and mid-frequency words, like real searches
+    queries = [' '.join(rng.choice(vocabulary[:2000]) for _ in range(rng.randint(1, 3))) for _ in range(query_count)]
+    for label, category in (('all categories', None), ('category filter', 'technology')):
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, category=category, limit=20)
+            timings.append(time.perf_counter() - start)
+        p50, p99 = percentiles(timings)
+        print(f"search, {label:<16} p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
+
+    timings = []
+    for query in queries[:20]:
+        terms = set(tokenize(query))
+        start = time.perf_counter()
+        [a for a in articles if terms & set(tokenize(f"{a['title']} {a['description']} {a['content']}"))]
+        timings.append(time.perf_counter() - start)
+    p50, p99 = percentiles(timings)
+    print(f"linear scan, all categories  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
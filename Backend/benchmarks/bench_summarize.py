@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /summarize traffic with and without the batched, cached text service.
+
+Simulates readers clicking "summarize" on the day's articles (a popular few get
+most clicks) at a steady arrival rate, against a fake LLM that takes a fixed
+latency plus time per input character and allows 2 calls in flight (the Groq
+limiter default). Compared:
+- direct: every request makes its own LLM call (no batching, no cache);
+- service: TextService with micro-batching, coalescing and the result cache.
+Reports LLM calls and request latency percentiles.
+Usage: python benchmarks/bench_summarize.py [requests] [requests_per_second]
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent.llm_cache import MemoryCompletionCache, TieredCompletionCache
+from newsagent.summarizer import TextService
+
+ARTICLES = 40
+LLM_LATENCY = 0.4
+LLM_SECONDS_PER_CHAR = 20e-6
+LLM_MAX_IN_FLIGHT = 2
+
+
+class FakeLLM:
+    def __init__(self):
+        self.slots = threading.Semaphore(LLM_MAX_IN_FLIGHT)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.calls += 1
+        with self.slots:
+            time.sleep(LLM_LATENCY + len(prompt) * LLM_SECONDS_PER_CHAR)
+        ids = re.findall(r'^\[(\d+)\]$', prompt, re.M)
+        if ids:
+            return json.dumps({'results': [{'id': int(i), 'output': f'summary {i}'} for i in ids]})
+        return 'summary'
+
+
+def make_articles(rng):
+    words = 'market policy court storm launch study shares record growth league film deal talks report'.split()
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(250, 700))) + f' {i}.' for i in range(ARTICLES)]
+
+
+def replay(label, handle, clicks, rate):
+    latencies = []
+    lock = threading.Lock()
+
+    def one(text):
+        start = time.perf_counter()
+        handle(text)
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=256) as pool:
+        for i, text in enumerate(clicks):
+            delay = started + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, text)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return elapsed, p50, p99
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 40
+    rng = random.Random(9)
+    articles = make_articles(rng)
+    # Popular articles get most clicks
+    weights = [1 / (rank + 1) for rank in range(ARTICLES)]
+    clicks = rng.choices(articles, weights, k=count)
+    print(f"{count} summarize requests at {rate:.0f}/s over {ARTICLES} articles "
+          f"(LLM {LLM_LATENCY * 1000:.0f} ms + {LLM_SECONDS_PER_CHAR * 1e6:.0f} us/char, {LLM_MAX_IN_FLIGHT} in flight)")
+
+    direct = FakeLLM()
+    elapsed, p50, p99 = replay('direct', direct, clicks, rate)
+    print(f"direct   LLM calls {direct.calls:4d}  p50 {p50:8.0f} ms  p99 {p99:8.0f} ms  wall {elapsed:5.1f} s")
+
+    batched = FakeLLM()
+    service = TextService(complete=batched, cache=TieredCompletionCache(memory=MemoryCompletionCache()),
+                          workers=LLM_MAX_IN_FLIGHT)
+    elapsed, p50, p99 = replay('service', lambda text: service.run('summarize', text), clicks, rate)
+    print(f"service  LLM calls {batched.calls:4d}  p50 {p50:8.0f} ms  p99 {p99:8.0f} ms  wall {elapsed:5.1f} s")
+    print(f"service stats: {service.stats()}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: per-call latency of module-level requests.get (new connection
+per call) vs. the pooled keep-alive session in newsagent.transport.
+
+Runs against a local stub HTTP/1.1 server. With --tls the stub serves a
+throwaway self-signed certificate (needs the openssl CLI) so the TLS handshake
+saved per call shows up as well, as it would against api.stability.ai.
+Usage: python benchmarks/bench_transport.py [calls] [--tls]
+"""
+
+import json
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'newsagent', 'src'))
+
+from newsagent import transport
+
+PAYLOAD = json.dumps({'status': 'success', 'data': [{'title': 'stub'}] * 10}).encode()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def wrap_tls(server, workdir):
+    cert, key = os.path.join(workdir, 'cert.pem'), os.path.join(workdir, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=127.0.0.1', '-keyout', key, '-out', cert],
+        check=True, capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+
+
+def bench(label, get, url, calls):
+    get(url, verify=False)  # warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        get(url, verify=False).json()
+    per_call = (time.perf_counter() - start) / calls * 1000
+    print(f"{label:<18} {per_call:7.3f} ms/call")
+    return per_call
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    calls = int(args[0]) if args else 500
+    use_tls = '--tls' in sys.argv
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    workdir = tempfile.mkdtemp()
+    if use_tls:
+        wrap_tls(server, workdir)
+        requests.packages.urllib3.disable_warnings()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scheme = 'https' if use_tls else 'http'
+    url = f"{scheme}://127.0.0.1:{server.server_address[1]}/api/newsapi"
+
+    unpooled = bench('requests.get', lambda u, **kw: requests.get(u, timeout=10, **kw), url, calls)
+    pooled = bench('transport.get', transport.get, url, calls)
+    print(f"saved              {unpooled - pooled:7.3f} ms/call ({unpooled / pooled:.1f}x)")
+    server.shutdown()
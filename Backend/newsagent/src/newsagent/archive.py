@@ -0,0 +1,346 @@
+"""
+Append-only history of published articles and newsletter editions.
+
+Refreshes replace the live ArticleStore snapshot, and the writer's
+newsletter.md only ever holds the latest run. The archive keeps both: it
+subscribes to the ArticleStore and appends every new or changed article of each
+published snapshot, and the crew's writing task appends every Newsletter it
+produces as an edition.
+
+Storage is partitioned by day: one small SQLite file per day under ARCHIVE_DIR
+(articles indexed by category), so writes only touch today's partition and
+old days can be dropped whole (ARCHIVE_RETENTION_DAYS). Reads are newest first
+with an opaque cursor ('<day>:<row id>'): a page seeks straight to the cursor
+in its partition and only moves on to earlier days until the page is full, so
+its cost depends on the page size, not on how much history is kept. Only a few
+partitions are open at a time. Generated images referenced by archived
+articles are pinned in the image cache, so archived pages don't lose their
+images to cache eviction; they are unpinned with the partitions.
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .article_store import Article, Snapshot, article_key
+from .image_cache import ImageCache, get_image_cache, is_image_key
+from .jobs import current_job
+from .rendering import encode_json
+from .schemas import Newsletter, parse_newsletter
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', os.path.join('.cache', 'archive'))
+# Days of history kept (0 keeps everything)
+ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', 0))
+# Day partitions kept open at once (least recently used are closed)
+ARCHIVE_OPEN_PARTITIONS = int(os.getenv('ARCHIVE_OPEN_PARTITIONS', 8))
+
+PARTITION_SUFFIX = '.sqlite3'
+_DAY = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Fields that make an article "changed" (a new image alone doesn't)
+_CONTENT_FIELDS = ('title', 'description', 'summary', 'content')
+
+
+def format_cursor(day: str, row_id: int) -> str:
+    return f'{day}:{row_id}'
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    """(day, row id) from a cursor or edition id; raises ValueError if malformed."""
+    day, _, row_id = (cursor or '').partition(':')
+    if not _DAY.match(day) or not row_id.isdigit():
+        raise ValueError(f'Invalid archive cursor: {cursor!r}')
+    date.fromisoformat(day)
+    return day, int(row_id)
+
+
+def _fingerprint(article: Article) -> str:
+    return hashlib.sha1(encode_json({field: article.get(field) for field in _CONTENT_FIELDS})).hexdigest()
+
+
+def _image_key(image: Any) -> Optional[str]:
+    image_id = image.get('image_id') if isinstance(image, dict) else getattr(image, 'image_id', None)
+    return image_id if isinstance(image_id, str) and is_image_key(image_id) else None
+
+
+class ArticleArchive:
+    """Day-partitioned SQLite archive with cursor pagination; safe to use from any thread."""
+
+    def __init__(self, directory: str = ARCHIVE_DIR, retention_days: int = ARCHIVE_RETENTION_DAYS,
+                 max_open: int = ARCHIVE_OPEN_PARTITIONS, images: Optional[ImageCache] = None):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.max_open = max(1, max_open)
+        self.images = images
+        os.makedirs(directory, exist_ok=True)
+        self._days: List[str] = sorted(
+            name[:-len(PARTITION_SUFFIX)] for name in os.listdir(directory)
+            if name.endswith(PARTITION_SUFFIX) and _DAY.match(name[:-len(PARTITION_SUFFIX)])
+        )
+        self._connections: 'OrderedDict[str, sqlite3.Connection]' = OrderedDict()
+        # Article key -> content fingerprint for the last published snapshot
+        self._live: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.articles_archived = 0
+        self.editions_archived = 0
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.directory, day + PARTITION_SUFFIX)
+
+    def _connection(self, day: str, create: bool = False) -> Optional[sqlite3.Connection]:
+        # Callers hold self._lock
+        conn = self._connections.get(day)
+        if conn is not None:
+            self._connections.move_to_end(day)
+            return conn
+        position = bisect.bisect_left(self._days, day)
+        exists = position < len(self._days) and self._days[position] == day
+        if not exists and not create:
+            return None
+        conn = sqlite3.connect(self._path(day), check_same_thread=False, timeout=10)
+        with conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS articles ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT, archived_at TEXT NOT NULL,'
+                ' category TEXT NOT NULL, key TEXT NOT NULL, body TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS articles_category ON articles (category, id)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS editions ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT, archived_at TEXT NOT NULL,'
+                ' edition_date TEXT, categories TEXT NOT NULL, article_count INTEGER NOT NULL,'
+                ' summary TEXT, job_id TEXT, body TEXT NOT NULL)'
+            )
+        if not exists:
+            self._days.insert(position, day)
+        self._connections[day] = conn
+        while len(self._connections) > self.max_open:
+            self._connections.popitem(last=False)[1].close()
+        return conn
+
+    def _prune(self, today: str):
+        # Callers hold self._lock
+        if self.retention_days <= 0:
+            return
+        cutoff = (date.fromisoformat(today) - timedelta(days=self.retention_days - 1)).isoformat()
+        if not self._days or self._days[0] >= cutoff:
+            return
+        while self._days and self._days[0] < cutoff:
+            day = self._days.pop(0)
+            conn = self._connections.pop(day, None)
+            if conn is not None:
+                conn.close()
+            for suffix in ('', '-wal', '-shm'):
+                try:
+                    os.remove(self._path(day) + suffix)
+                except FileNotFoundError:
+                    pass
+            logger.info(f"Archive: dropped partition {day} (retention {self.retention_days} days)")
+        if self.images is not None:
+            self.images.unpin_older_than(datetime.fromisoformat(cutoff).timestamp())
+
+    def _pin_images(self, images: Iterable[Any]):
+        if self.images is None:
+            return
+        for key in {_image_key(image) for image in images} - {None}:
+            try:
+                if not self.images.pin(key):
+                    logger.debug(f"Archive: image {key} not in the image cache, not pinned")
+            except OSError as e:
+                logger.warning(f"Archive: failed to pin image {key}: {e}")
+
+    # Writes
+
+    def prime(self, snapshot: Snapshot):
+        """Treat snapshot's articles as already archived (the snapshot restored at startup)."""
+        with self._lock:
+            self._live = {article_key(article): _fingerprint(article) for article in snapshot.articles}
+
+    def archive_snapshot(self, snapshot: Snapshot):
+        """ArticleStore listener: append the new or changed articles of a published snapshot."""
+        live = {article_key(article): (_fingerprint(article), article) for article in snapshot.articles}
+        archived_at = snapshot.generated_at or datetime.now()
+        day = archived_at.date().isoformat()
+        with self._lock:
+            new = [
+                (archived_at.isoformat(), (article.get('category') or '').lower(), key, encode_json(article).decode())
+                for key, (fingerprint, article) in live.items() if self._live.get(key) != fingerprint
+            ]
+            self._live = {key: fingerprint for key, (fingerprint, _) in live.items()}
+            if not new:
+                return
+            try:
+                conn = self._connection(day, create=True)
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO articles (archived_at, category, key, body) VALUES (?, ?, ?, ?)', new
+                    )
+                self.articles_archived += len(new)
+                self._prune(day)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to archive {len(new)} article(s): {e}")
+                return
+        self._pin_images(article.get('ai_image') for _, article in live.values())
+        logger.info(f"Archived {len(new)} article(s) in partition {day}")
+
+    def archive_newsletter(self, newsletter: Newsletter, job_id: Optional[str] = None) -> Optional[str]:
+        """Append a newsletter edition; returns its edition id."""
+        archived_at = datetime.now()
+        day = archived_at.date().isoformat()
+        categories = sorted({a.category.strip().lower() for a in newsletter.articles if a.category.strip()})
+        with self._lock:
+            try:
+                conn = self._connection(day, create=True)
+                with conn:
+                    row_id = conn.execute(
+                        'INSERT INTO editions (archived_at, edition_date, categories, article_count, summary, job_id, body)'
+                        ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (archived_at.isoformat(), newsletter.edition_date, ',' + ','.join(categories) + ',',
+                         len(newsletter.articles), newsletter.summary, job_id, newsletter.model_dump_json())
+                    ).lastrowid
+                self.editions_archived += 1
+                self._prune(day)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to archive newsletter edition: {e}")
+                return None
+        self._pin_images(article.ai_image for article in newsletter.articles)
+        return format_cursor(day, row_id)
+
+    # Reads (newest first)
+
+    def _page(self, table: str, columns: str, category_clause: str, category: Optional[str],
+              since: Optional[str], until: Optional[str], cursor: Optional[str],
+              limit: int) -> Tuple[List[Tuple], Optional[str]]:
+        cursor_day, before_id = parse_cursor(cursor) if cursor else (None, None)
+        last_day = min(day for day in (until, cursor_day) if day) if until or cursor_day else None
+        rows: List[Tuple] = []
+        with self._lock:
+            end = bisect.bisect_right(self._days, last_day) if last_day else len(self._days)
+            start = bisect.bisect_left(self._days, since) if since else 0
+            for day in reversed(self._days[start:end]):
+                clauses, params = [], []
+                if day == cursor_day:
+                    clauses.append('id < ?')
+                    params.append(before_id)
+                if category:
+                    clauses.append(category_clause)
+                    params.append(category)
+                where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+                # One row past the page tells whether there is a next page
+                params.append(limit + 1 - len(rows))
+                rows.extend(
+                    (day,) + row for row in self._connection(day).execute(
+                        f'SELECT id, {columns} FROM {table}{where} ORDER BY id DESC LIMIT ?', params
+                    )
+                )
+                if len(rows) > limit:
+                    break
+        next_cursor = format_cursor(*rows[limit - 1][:2]) if len(rows) > limit else None
+        return rows[:limit], next_cursor
+
+    def articles(self, category: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                 cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Article], Optional[str]]:
+        """Archived articles, newest first: (page, next cursor or None). Days are 'YYYY-MM-DD', inclusive."""
+        rows, next_cursor = self._page(
+            'articles', 'archived_at, body', 'category = ?', category.lower() if category else None,
+            since, until, cursor, limit
+        )
+        return [
+            dict(json.loads(body), archive_id=format_cursor(day, row_id), archived_at=archived_at)
+            for day, row_id, archived_at, body in rows
+        ], next_cursor
+
+    def editions(self, category: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                 cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Newsletter editions (without their articles), newest first: (page, next cursor or None)."""
+        rows, next_cursor = self._page(
+            'editions', 'archived_at, edition_date, categories, article_count, summary',
+            'categories LIKE ?', f'%,{category.lower()},%' if category else None,
+            since, until, cursor, limit
+        )
+        return [{
+            'id': format_cursor(day, row_id),
+            'archived_at': archived_at,
+            'edition_date': edition_date,
+            'categories': [c for c in categories.split(',') if c],
+            'article_count': article_count,
+            'summary': summary,
+        } for day, row_id, archived_at, edition_date, categories, article_count, summary in rows], next_cursor
+
+    def edition(self, edition_id: str) -> Optional[Dict[str, Any]]:
+        """A full newsletter edition by id, or None."""
+        day, row_id = parse_cursor(edition_id)
+        with self._lock:
+            conn = self._connection(day)
+            row = conn.execute(
+                'SELECT archived_at, job_id, body FROM editions WHERE id = ?', (row_id,)
+            ).fetchone() if conn is not None else None
+        if row is None:
+            return None
+        archived_at, job_id, body = row
+        return dict(json.loads(body), id=edition_id, archived_at=archived_at, job_id=job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'partitions': len(self._days),
+                'oldest_day': self._days[0] if self._days else None,
+                'newest_day': self._days[-1] if self._days else None,
+                'open_partitions': len(self._connections),
+                'retention_days': self.retention_days,
+                'articles_archived': self.articles_archived,
+                'editions_archived': self.editions_archived,
+                'path': self.directory,
+            }
+
+    def close(self):
+        with self._lock:
+            while self._connections:
+                self._connections.popitem()[1].close()
+
+
+_archive: Optional[ArticleArchive] = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> Optional[ArticleArchive]:
+    """Process-wide archive, or None when ARCHIVE_ENABLED is off or the directory is unusable."""
+    global _archive
+    if not ARCHIVE_ENABLED:
+        return None
+    with _archive_lock:
+        if _archive is None:
+            try:
+                _archive = ArticleArchive(images=get_image_cache())
+            except OSError as e:
+                logger.warning(f"Article archive unavailable: {e}")
+                return None
+        return _archive
+
+
+def archive_task_output(output: Any):
+    """Writing task callback: archive the crew's newsletter as a new edition."""
+    archive = get_archive()
+    if archive is None:
+        return
+    try:
+        newsletter = parse_newsletter(output)
+    except Exception as e:
+        logger.warning(f"Newsletter not archived, output did not parse: {e}")
+        return
+    job = current_job()
+    edition_id = archive.archive_newsletter(newsletter, job.id if job is not None else None)
+    if edition_id:
+        logger.info(f"Archived newsletter edition {edition_id} ({len(newsletter.articles)} articles)")
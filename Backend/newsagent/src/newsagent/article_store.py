@@ -0,0 +1,230 @@
+"""
+Thread-safe, indexed store for the articles served by the API.
+
+Each refresh publishes a new immutable Snapshot (copy-on-write) that is swapped
+in with a single reference assignment, so readers never take a lock and never
+see a half-written refresh. Snapshots carry a per-category index for O(results)
+filtered reads and a dedupe index keyed by article URL or content hash, plus
+pre-rendered JSON bodies (with ETags and compressed variants) per view.
+
+Listeners registered with subscribe() are called with every new snapshot
+(e.g. to update the search index incrementally).
+
+With a snapshot_path, every publish is also written to a JSONL file (a header
+line, then one article per line) via temp file + atomic rename, and load()
+restores the last good snapshot at startup.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .rendering import RenderedBody, encode_json
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_SNAPSHOT_PATH = os.getenv('ARTICLE_SNAPSHOT_PATH', os.path.join('.cache', 'articles.jsonl'))
+
+Article = Dict[str, Any]
+
+
+def article_key(article: Article) -> str:
+    """Dedupe key: the article URL, or a hash of its title and description."""
+    url = (article.get('url') or '').strip().lower()
+    if url:
+        return url
+    content = f"{article.get('title') or ''}\0{article.get('description') or ''}"
+    return 'sha1:' + hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+# Shared body for views with no articles (unknown categories, limit=0)
+_EMPTY_VIEW = RenderedBody.from_payload([])
+_EMPTY_VIEW.precompress()
+
+
+class Snapshot:
+    """Immutable view of the published articles and their indexes."""
+
+    __slots__ = ('articles', 'by_category', 'by_key', 'generated_at', 'version', '_views')
+
+    def __init__(self, articles: Tuple[Article, ...], generated_at: Optional[datetime], version: int):
+        by_category: Dict[str, List[Article]] = {}
+        for article in articles:
+            by_category.setdefault((article.get('category') or '').lower(), []).append(article)
+        self.articles = articles
+        self.by_category = {category: tuple(items) for category, items in by_category.items()}
+        self.by_key = {article_key(article): article for article in articles}
+        self.generated_at = generated_at
+        self.version = version
+        self._views: Dict[Tuple[Optional[str], Optional[int]], RenderedBody] = {}
+
+    def _view_key(self, category: Optional[str], limit: Optional[int]):
+        category = category.lower() if category else None
+        size = len(self.by_category.get(category, ())) if category else len(self.articles)
+        # Limits past the end render the same body as no limit
+        if limit is not None and (limit < 0 or limit >= size):
+            limit = None
+        return category, limit
+
+    def select(self, category: Optional[str] = None, limit: Optional[int] = None) -> Tuple[Article, ...]:
+        articles = self.by_category.get(category.lower(), ()) if category else self.articles
+        return articles[:limit] if limit is not None else articles
+
+    def view(self, category: Optional[str] = None, limit: Optional[int] = None) -> RenderedBody:
+        """Pre-rendered JSON list for a (category, limit) view, built once per snapshot."""
+        key = self._view_key(category, limit)
+        # Only categories in the snapshot get cached views, so clients can't grow the cache
+        if key[0] is not None and key[0] not in self.by_category or key[1] == 0:
+            return _EMPTY_VIEW
+        rendered = self._views.get(key)
+        if rendered is None:
+            rendered = RenderedBody.from_payload(list(self.select(*key)))
+            rendered.precompress()
+            self._views[key] = rendered
+        return rendered
+
+    def prerender(self):
+        """Render the unfiltered and per-category views up front."""
+        self.view()
+        for category in self.by_category:
+            self.view(category)
+
+
+class ArticleStore:
+    """Publishes article snapshots atomically; reads are lock-free."""
+
+    def __init__(self, snapshot_path: Optional[str] = None):
+        self.snapshot_path = snapshot_path
+        self._snapshot = Snapshot((), None, 0)
+        self._write_lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._listeners: List[Callable[[Snapshot], None]] = []
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    @property
+    def last_generated(self) -> Optional[datetime]:
+        return self._snapshot.generated_at
+
+    def articles(self, category: Optional[str] = None, limit: Optional[int] = None) -> List[Article]:
+        return list(self._snapshot.select(category, limit))
+
+    def get(self, key: str) -> Optional[Article]:
+        return self._snapshot.by_key.get(key)
+
+    def subscribe(self, listener: Callable[[Snapshot], None]):
+        """Call listener(snapshot) after every publish or load (in publish order)."""
+        with self._write_lock:
+            self._listeners.append(listener)
+
+    def _notify(self, snapshot: Snapshot):
+        # Callers hold self._write_lock, so listeners see snapshots in order
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Article store listener failed: {e}")
+
+    def publish(self, articles: Iterable[Article], generated_at: Optional[datetime] = None,
+                persist: bool = True) -> Snapshot:
+        """Replace the published articles, dropping duplicates (first one wins)."""
+        unique: Dict[str, Article] = {}
+        for article in articles:
+            unique.setdefault(article_key(article), dict(article))
+        with self._write_lock:
+            snapshot = Snapshot(tuple(unique.values()), generated_at or datetime.now(), self._snapshot.version + 1)
+            snapshot.prerender()
+            self._snapshot = snapshot
+            if persist and self.snapshot_path:
+                try:
+                    self._save(snapshot)
+                except OSError as e:
+                    logger.error(f"Failed to persist article snapshot: {e}")
+            self._notify(snapshot)
+        return snapshot
+
+    def publish_category(self, category: str, articles: Iterable[Article],
+                         generated_at: Optional[datetime] = None) -> Snapshot:
+        """Replace one category's articles and keep every other category as is."""
+        return self.publish_categories({category: articles}, generated_at)
+
+    def publish_categories(self, articles_by_category: Dict[str, Iterable[Article]],
+                           generated_at: Optional[datetime] = None) -> Snapshot:
+        """Replace several categories' articles in one snapshot and keep the rest as is."""
+        replaced = {category.lower() for category in articles_by_category}
+        with self._write_lock:
+            kept = [a for a in self._snapshot.articles if (a.get('category') or '').lower() not in replaced]
+            fresh = [article for articles in articles_by_category.values() for article in articles]
+            return self.publish(fresh + kept, generated_at)
+
+    def _save(self, snapshot: Snapshot):
+        directory = os.path.dirname(os.path.abspath(self.snapshot_path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                header = {
+                    'version': snapshot.version,
+                    'generated_at': snapshot.generated_at.isoformat() if snapshot.generated_at else None,
+                    'count': len(snapshot.articles)
+                }
+                f.write(encode_json(header) + b'\n')
+                for article in snapshot.articles:
+                    f.write(encode_json(article) + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def load(self) -> bool:
+        """Restore the last persisted snapshot. Returns False if there is none."""
+        if not self.snapshot_path:
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                header = json.loads(f.readline())
+                articles = [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable article snapshot {self.snapshot_path}: {e}")
+            return False
+        if len(articles) != header.get('count', len(articles)):
+            logger.error(f"Ignoring truncated article snapshot {self.snapshot_path}")
+            return False
+        generated_at = header.get('generated_at')
+        with self._write_lock:
+            snapshot = Snapshot(
+                tuple(articles),
+                datetime.fromisoformat(generated_at) if generated_at else None,
+                header.get('version', 0)
+            )
+            snapshot.prerender()
+            self._snapshot = snapshot
+            self._notify(snapshot)
+        logger.info(f"Loaded {len(articles)} articles from {self.snapshot_path}")
+        return True
+
+    # Refresh guard: at most one generation run writes to the store at a time
+
+    def try_begin_refresh(self) -> bool:
+        return self._refresh_lock.acquire(blocking=False)
+
+    def end_refresh(self):
+        self._refresh_lock.release()
+
+    @property
+    def refreshing(self) -> bool:
+        return self._refresh_lock.locked()
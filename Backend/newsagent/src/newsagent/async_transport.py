@@ -0,0 +1,116 @@
+"""
+Async counterpart of newsagent.transport for the ASGI serving path.
+
+Uses one pooled httpx.AsyncClient per event loop with the same pool sizes,
+timeouts, retry/backoff policy and provider limiters as the threaded
+transport, so requests awaiting NewsAPI or Stability don't hold a thread.
+Like the requests pool, HTTP_POOL_MAXSIZE only bounds the idle connections
+kept; how many requests a provider gets at once is up to its limiter.
+httpx is optional: without it, requests run on the threaded transport in a
+worker thread.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Optional
+
+from . import transport
+from .ratelimit import ProviderLimiter, parse_retry_after
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]' = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """The pooled AsyncClient for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            # A hard cap here would queue requests the threaded transport sends at once
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=transport.POOL_MAXSIZE),
+            timeout=httpx.Timeout(transport.READ_TIMEOUT, connect=transport.CONNECT_TIMEOUT)
+        )
+        _clients[loop] = client
+    return client
+
+
+async def aclose():
+    """Close the running loop's client (call on application shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _timeout(timeout: Optional[transport.Timeout]):
+    if timeout is None:
+        return httpx.Timeout(transport.READ_TIMEOUT, connect=transport.CONNECT_TIMEOUT)
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+async def arequest(method: str, url: str, timeout: Optional[transport.Timeout] = None,
+                   retries: Optional[int] = None, limiter: Optional[ProviderLimiter] = None,
+                   **kwargs):
+    """
+    Async transport.request(): same retry policy, backoff and limiter handling.
+    Returns an httpx.Response (or a requests.Response when httpx is missing).
+    """
+    if not HTTPX_AVAILABLE:
+        return await asyncio.to_thread(
+            transport.request, method, url, timeout=timeout, retries=retries, limiter=limiter, **kwargs
+        )
+
+    client = get_async_client()
+    retries = transport.MAX_RETRIES if retries is None else retries
+
+    for attempt in range(retries + 1):
+        try:
+            if limiter is not None:
+                async with limiter.aslot():
+                    response = await client.request(method, url, timeout=_timeout(timeout), **kwargs)
+            else:
+                response = await client.request(method, url, timeout=_timeout(timeout), **kwargs)
+        except httpx.TransportError as e:
+            not_sent = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+            if attempt >= retries or (method.upper() not in transport.IDEMPOTENT_METHODS and not not_sent):
+                raise
+            delay = transport.backoff_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e}); retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            continue
+
+        if response.status_code == 429 and limiter is not None:
+            limiter.report_throttle(response.headers.get('Retry-After'))
+        if transport.retryable_status(method, response.status_code) and attempt < retries:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            # With a limiter the throttle above already pauses the next slot
+            delay = 0.0 if limiter is not None and response.status_code == 429 else (
+                retry_after if retry_after is not None else transport.backoff_delay(attempt)
+            )
+            logger.warning(f"{method} {url} returned {response.status_code}; retrying in {delay:.2f}s")
+            await response.aclose()
+            await asyncio.sleep(delay)
+            continue
+        if limiter is not None and response.is_success:
+            limiter.report_success()
+        return response
+
+
+async def aget(url: str, **kwargs):
+    return await arequest('GET', url, **kwargs)
+
+
+async def apost(url: str, **kwargs):
+    return await arequest('POST', url, **kwargs)
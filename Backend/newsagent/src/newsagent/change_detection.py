@@ -0,0 +1,106 @@
+"""
+Change detection in front of the Newsagent crew.
+
+Each fetched headline is fingerprinted (URL + publication time). The tracker
+remembers every story sent to the crew: the article written for it, or a
+"seen, not written" marker when the writer left it out (the writer turns ~10
+headlines into a handful of articles). A refresh only sends stories the crew
+has not seen to the crew and reuses the earlier articles for the rest.
+Counters record how many crew runs (and their LLM calls) were avoided.
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+Article = Dict[str, Any]
+
+# LLM round-trips per crew kickoff (research task + writing task)
+LLM_CALLS_PER_CREW_RUN = 2
+
+
+def story_fingerprint(headline: Dict[str, Any]) -> str:
+    """Fingerprint of one upstream story (URL + publication time)."""
+    published_at = headline.get('published_at') or headline.get('publishedAt') or ''
+    key = f"{headline.get('url') or headline.get('title') or ''}|{published_at}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    return (url or '').strip().rstrip('/').lower()
+
+
+class HeadlineTracker:
+    """Per-category memory of which stories have already been written."""
+
+    def __init__(self, max_stories_per_category: int = 200):
+        self.max_stories_per_category = max_stories_per_category
+        # category -> {story fingerprint: written article, or None if seen but not written}
+        self._written: Dict[str, Dict[str, Optional[Article]]] = {}
+        self._latest: Dict[str, Article] = {}
+        self._lock = threading.Lock()
+        self.crew_runs = 0
+        self.crew_runs_avoided = 0
+        self.stories_reused = 0
+        self.stories_sent = 0
+
+    def diff(self, category: str, headlines: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Article]]:
+        """Split headlines into (stories still to write, articles already written for the rest)."""
+        with self._lock:
+            written = self._written.get(category, {})
+            new, reused = [], []
+            for headline in headlines:
+                fingerprint = story_fingerprint(headline)
+                if fingerprint not in written:
+                    new.append(headline)
+                elif written[fingerprint] is not None:
+                    reused.append(dict(written[fingerprint]))
+            return new, reused
+
+    def latest(self, category: str) -> Optional[Article]:
+        """The most recent article written for the category, if any."""
+        with self._lock:
+            article = self._latest.get(category)
+            return dict(article) if article is not None else None
+
+    def record(self, category: str, headlines: List[Dict[str, Any]], articles: List[Article]):
+        """Remember every headline sent to the crew, with the article written for it (if any)."""
+        by_url = {_normalize_url(a.get('url')): a for a in articles if a.get('url')}
+        with self._lock:
+            written = self._written.setdefault(category, {})
+            for index, headline in enumerate(headlines):
+                article = by_url.get(_normalize_url(headline.get('url')))
+                if article is None and len(headlines) == len(articles):
+                    # Without URLs, fall back to matching by position
+                    article = articles[index]
+                fingerprint = story_fingerprint(headline)
+                # Seen again: keep an earlier article, and move the story to the newest end
+                previous = written.pop(fingerprint, None)
+                written[fingerprint] = dict(article) if article is not None else previous
+            if articles:
+                self._latest[category] = dict(articles[0])
+            # Drop the oldest stories once the category's memory is full
+            while len(written) > self.max_stories_per_category:
+                written.pop(next(iter(written)))
+
+    def count_run(self, stories_sent: int, stories_reused: int):
+        with self._lock:
+            self.crew_runs += 1
+            self.stories_sent += stories_sent
+            self.stories_reused += stories_reused
+
+    def count_avoided(self, stories_reused: int = 0):
+        """Count one skipped crew kickoff (call once per kickoff, not per category)."""
+        with self._lock:
+            self.crew_runs_avoided += 1
+            self.stories_reused += stories_reused
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'crew_runs': self.crew_runs,
+                'crew_runs_avoided': self.crew_runs_avoided,
+                'llm_calls_avoided': self.crew_runs_avoided * LLM_CALLS_PER_CREW_RUN,
+                'stories_sent_to_crew': self.stories_sent,
+                'stories_reused': self.stories_reused,
+            }
@@ -1,21 +1,88 @@
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
-from typing import List
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from functools import lru_cache
 import os
+from .archive import archive_task_output
+from .jobs import crew_task_finished
+from .llm_cache import CompletionCache, completion_key, get_completion_cache
+from .ranking import rank_stories
+from .ratelimit import get_limiter
+from .schemas import Newsletter
 from .tools.custom_tool import NewsScraper, CategoryFetcher
 
 # Configure Google Gemini LLM
 
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an LLM error is a 429 from the provider"""
+    return getattr(error, 'status_code', None) == 429 or type(error).__name__ == 'RateLimitError'
+
+def _retry_after(error: Exception):
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    return headers.get('retry-after') or headers.get('Retry-After')
+
+class NewsagentLLM(LLM):
+    """
+    LLM whose completions are served from the completion cache when possible,
+    and otherwise go through the process-wide provider rate limiter
+    """
+
+    def __init__(self, *args, provider: str = 'groq', cache: Optional[CompletionCache] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = get_limiter(provider)
+        self.cache = cache if cache is not None else get_completion_cache()
+
+    def call(self, messages, *args, **kwargs):
+        key = None
+        if self.cache is not None:
+            tools = kwargs.get('tools', args[0] if args else None)
+            key = completion_key(self.model, messages, getattr(self, 'temperature', None), tools)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        with self.limiter.slot():
+            try:
+                response = super().call(messages, *args, **kwargs)
+            except Exception as e:
+                if _is_rate_limit_error(e):
+                    self.limiter.report_throttle(_retry_after(e))
+                raise
+        self.limiter.report_success()
+        if key is not None and isinstance(response, str) and response:
+            self.cache.put(key, response)
+        return response
+
 # Configure Groq LLM
+@lru_cache(maxsize=None)
 def get_groq_llm():
-    """Get configured Groq LLM instance"""
-    return LLM(
+    """Get the process-wide Groq LLM instance (shared by all agents and crews)"""
+    return NewsagentLLM(
         model="llama3-70b-8192",
         api_key=os.getenv("GROQ_API_KEY"),
         base_url="https://api.groq.com/openai/v1"
     )
 
+def crew_inputs(categories: str, headlines: Optional[List[Dict[str, Any]]] = None) -> Dict[str, str]:
+    """
+    Build kickoff inputs; headlines (if given) are the only stories the crew should
+    cover, pre-ranked and trimmed to the top K within the prompt token budget
+    """
+    now = datetime.now()
+    return {
+        'categories': categories,
+        'current_date': now.strftime('%Y-%m-%d'),
+        'current_time': now.strftime('%H:%M:%S'),
+        'headlines': rank_stories(headlines).json if headlines else 'none provided'
+    }
+
+@lru_cache(maxsize=None)
+def get_research_tools():
+    """Researcher tools are stateless, so every crew shares one set"""
+    return (NewsScraper(), CategoryFetcher())
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -38,8 +105,9 @@ class Newsagent():
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'], # type: ignore[index]
-            tools=[NewsScraper(), CategoryFetcher()],
+            tools=list(get_research_tools()),
             llm=get_groq_llm(),
+            cache=False, # see crew(): pooled crews must not replay earlier tool results
             verbose=True
         )
 
@@ -49,6 +117,7 @@ class Newsagent():
         return Agent(
             config=self.agents_config['writer'], # type: ignore[index]
             llm=get_groq_llm(),
+            cache=False,
             verbose=True
         )
 
@@ -65,7 +134,9 @@ class Newsagent():
     def writing_task(self) -> Task:
         return Task(
             config=self.tasks_config['writing_task'], # type: ignore[index]
-            output_file='newsletter.md'
+            output_pydantic=Newsletter,
+            output_file='newsletter.md', # Latest edition only; every edition is kept in the archive
+            callback=archive_task_output
         )
 
     @crew
@@ -79,5 +150,10 @@ class Newsagent():
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
+            task_callback=crew_task_finished, # Reports research -> write progress to the running job
+            # Crews are pooled and reused; crewai's tool caches (per crew and per agent)
+            # would replay the first run's News Scraper results on every later kickoff
+            # and never shrink
+            cache=False,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
\ No newline at end of file
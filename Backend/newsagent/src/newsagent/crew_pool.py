@@ -0,0 +1,91 @@
+"""
+Pool of ready-built Newsagent crews.
+
+Building a crew re-parses agents.yaml / tasks.yaml and constructs the agents,
+tools and LLM clients. The pool builds each crew once and hands it out to one
+caller at a time, so concurrent kickoffs never share a Crew while sequential
+ones reuse it (kickoff re-interpolates the task templates on every run).
+"""
+
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CREW_POOL_SIZE = int(os.getenv('CREW_POOL_SIZE', os.getenv('GENERATION_WORKERS', 4)))
+
+
+def _build_crew():
+    from .crew import Newsagent
+    return Newsagent().crew()
+
+
+class CrewPool:
+    """Leases pre-built crews; builds new ones on demand up to max_size idle crews."""
+
+    def __init__(self, factory: Callable[[], Any] = _build_crew, max_size: int = CREW_POOL_SIZE):
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self._idle: 'queue.LifoQueue[Any]' = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.built = 0
+        self.leases = 0
+
+    def _build(self):
+        crew = self.factory()
+        with self._lock:
+            self.built += 1
+        return crew
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._build()
+
+    def _release(self, crew):
+        # Keep at most max_size idle crews; extras built under load are dropped
+        if self._idle.qsize() < self.max_size:
+            self._idle.put(crew)
+
+    @contextmanager
+    def lease(self):
+        """Exclusive use of one crew for the duration of the block."""
+        crew = self._acquire()
+        with self._lock:
+            self.leases += 1
+        try:
+            yield crew
+        finally:
+            self._release(crew)
+
+    def kickoff(self, inputs: Dict[str, Any]):
+        with self.lease() as crew:
+            return crew.kickoff(inputs=inputs)
+
+    def prewarm(self, count: Optional[int] = None):
+        """Build crews ahead of the first request."""
+        target = min(count or self.max_size, self.max_size)
+        while self._idle.qsize() < target:
+            self._idle.put(self._build())
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'built': self.built, 'leases': self.leases, 'idle': self._idle.qsize(), 'max_size': self.max_size}
+
+
+_pool: Optional[CrewPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_crew_pool() -> CrewPool:
+    """Process-wide crew pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CrewPool()
+        return _pool
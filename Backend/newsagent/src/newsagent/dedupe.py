@@ -0,0 +1,273 @@
+"""
+Near-duplicate story clustering in front of the crew and image generation.
+
+NewsAPI returns the same story from several outlets and under several
+categories. Each story's headline (plus its description when the headline is
+too short to go on) is reduced to a MinHash signature of character shingles;
+LSH banding finds candidate matches in constant time per story, and a
+candidate counts as a duplicate when the signatures' estimated Jaccard
+similarity reaches the threshold (or the URLs match). Only the first story of
+each cluster is kept, so duplicates never reach the crew or ImageGenerator.
+Stories are never modified: cluster sizes (used for ranking) are kept by the
+index and, per kept story URL, by the deduper. numpy is used for the
+signatures when installed.
+"""
+
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Story = Dict[str, Any]
+
+DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+# Estimated Jaccard similarity of shingle sets at which two stories are the same
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.5))
+
+# 20 bands x 3 rows: pairs at 0.5 similarity become candidates ~93% of the time,
+# unrelated pairs (~0.05) ~0.25% of the time
+NUM_PERM = 60
+BANDS = 20
+# Character n-grams tolerate reworded headlines ("Fed" / "Federal Reserve") better than word n-grams
+SHINGLE_SIZE = 4
+# Outlets rewrite descriptions far more than headlines, so they are only used for short headlines
+MIN_TITLE_WORDS = 5
+DESCRIPTION_WORDS = 30
+# Kept story URLs whose latest cluster size is remembered for ranking
+CLUSTER_SIZES_MAX = 4096
+
+# Largest prime below 2**32: with a, b, x < p, a * x + b stays below 2**64 (exact in uint64)
+_PRIME = 4294967291
+_WORD = re.compile(r'[a-z0-9]+')
+
+# Fixed seed so signatures are comparable across indexes and processes
+_rng = random.Random(0x5EED)
+_PERM_A = [_rng.randrange(1, _PRIME) for _ in range(NUM_PERM)]
+_PERM_B = [_rng.randrange(0, _PRIME) for _ in range(NUM_PERM)]
+if np is not None:
+    _NP_A = np.array(_PERM_A, dtype=np.uint64)[:, None]
+    _NP_B = np.array(_PERM_B, dtype=np.uint64)[:, None]
+
+
+def _source_name(story: Story) -> str:
+    source = story.get('source') or ''
+    return (source.get('name') or '') if isinstance(source, dict) else str(source)
+
+
+def story_text(story: Story) -> str:
+    """Headline without a trailing ' - Outlet' suffix (plus the description if it is short)."""
+    title = story.get('title') or ''
+    head, sep, tail = title.rpartition(' - ')
+    if sep and (tail.strip().lower() == _source_name(story).strip().lower() or len(tail.split()) <= 4):
+        title = head
+    words = _WORD.findall(title.lower())
+    if len(words) < MIN_TITLE_WORDS:
+        words += _WORD.findall((story.get('description') or '').lower())[:DESCRIPTION_WORDS]
+    return ' '.join(words)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[int]:
+    """crc32 hashes of the normalized text's character n-grams."""
+    if len(text) <= size:
+        grams = [text] if text else []
+    else:
+        grams = [text[i:i + size] for i in range(len(text) - size + 1)]
+    return list({zlib.crc32(gram.encode('utf-8')) % _PRIME for gram in grams})
+
+
+def minhash(hashes: List[int]):
+    """MinHash signature (NUM_PERM values) of a shingle hash set."""
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)[None, :]
+        return ((_NP_A * values + _NP_B) % _PRIME).min(axis=1)
+    return tuple(min((a * x + b) % _PRIME for x in hashes) for a, b in zip(_PERM_A, _PERM_B))
+
+
+def similarity(signature_a, signature_b) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    if np is not None:
+        return float(np.count_nonzero(signature_a == signature_b)) / NUM_PERM
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / NUM_PERM
+
+
+def _normalize_url(url: Optional[str]) -> str:
+    return (url or '').strip().split('?', 1)[0].rstrip('/').lower()
+
+
+class NearDuplicateIndex:
+    """Incremental LSH index over the stories of one refresh."""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, bands: int = BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self._buckets: Dict[Hashable, List[int]] = {}
+        self._urls: Dict[str, int] = {}
+        self._signatures: List[Any] = []
+        self._stories: List[Story] = []
+        self._sizes: List[int] = []
+        self._positions: Dict[int, int] = {}
+
+    def _band_keys(self, signature) -> List[Hashable]:
+        values = signature.tolist() if np is not None else signature
+        return [(band, tuple(values[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def add(self, story: Story) -> Optional[Story]:
+        """Index story and return None, or return the earlier story it duplicates (not indexed)."""
+        url = _normalize_url(story.get('url'))
+        if url and url in self._urls:
+            return self._join(self._urls[url])
+
+        hashes = shingles(story_text(story))
+        signature = minhash(hashes) if hashes else None
+        keys = self._band_keys(signature) if signature is not None else []
+        seen = set()
+        for key in keys:
+            for candidate in self._buckets.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if similarity(signature, self._signatures[candidate]) >= self.threshold:
+                    return self._join(candidate)
+
+        position = len(self._stories)
+        self._stories.append(story)
+        self._signatures.append(signature)
+        self._sizes.append(1)
+        self._positions[id(story)] = position
+        if url:
+            self._urls[url] = position
+        for key in keys:
+            self._buckets.setdefault(key, []).append(position)
+        return None
+
+    def _join(self, position: int) -> Story:
+        self._sizes[position] += 1
+        return self._stories[position]
+
+    def cluster_size(self, story: Story) -> int:
+        """How many stories added so far were story or its duplicates (1 if not indexed)."""
+        position = self._positions.get(id(story))
+        return self._sizes[position] if position is not None else 1
+
+    def __len__(self) -> int:
+        return len(self._stories)
+
+
+class StoryDeduper:
+    """Drops near-duplicate stories and counts the crew and image work it saved."""
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, enabled: bool = DEDUP_ENABLED):
+        self.threshold = threshold
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stories_seen = 0
+        self.duplicates_dropped = 0
+        self.seconds = 0.0
+        self._cluster_sizes: 'OrderedDict[str, int]' = OrderedDict()
+
+    def index(self) -> NearDuplicateIndex:
+        """A fresh index for one refresh (e.g. to filter stories as they arrive)."""
+        return NearDuplicateIndex(self.threshold)
+
+    def is_duplicate(self, index: NearDuplicateIndex, story: Story) -> bool:
+        """Add story to index; True if an earlier story there already covers it."""
+        if not self.enabled:
+            return False
+        started = time.perf_counter()
+        original = index.add(story)
+        self._count(1, original is not None, time.perf_counter() - started)
+        if original is not None:
+            # How many outlets/categories carried the kept story (used for ranking)
+            self._remember_cluster(original, index.cluster_size(original))
+            logger.debug(f"Dropping duplicate story {story.get('title')!r} (same as {original.get('title')!r})")
+        else:
+            self._remember_cluster(story, 1)
+        return original is not None
+
+    def _remember_cluster(self, story: Story, size: int):
+        url = _normalize_url(story.get('url'))
+        if not url:
+            return
+        with self._lock:
+            if size <= 1:
+                self._cluster_sizes.pop(url, None)
+                return
+            self._cluster_sizes[url] = size
+            self._cluster_sizes.move_to_end(url)
+            while len(self._cluster_sizes) > CLUSTER_SIZES_MAX:
+                self._cluster_sizes.popitem(last=False)
+
+    def cluster_size(self, story: Story) -> int:
+        """Stories in the cluster story was kept for in its latest refresh (1 if none)."""
+        url = _normalize_url(story.get('url'))
+        with self._lock:
+            return self._cluster_sizes.get(url, 1) if url else 1
+
+    def _count(self, seen: int, dropped: int, seconds: float):
+        with self._lock:
+            self.stories_seen += seen
+            self.duplicates_dropped += dropped
+            self.seconds += seconds
+
+    def dedupe(self, stories: List[Story], index: Optional[NearDuplicateIndex] = None) -> List[Story]:
+        """Stories in order with near-duplicates of earlier ones removed."""
+        if index is None:
+            index = self.index()
+        return [story for story in stories if not self.is_duplicate(index, story)]
+
+    def dedupe_by_category(self, stories_by_category: Dict[str, Optional[List[Story]]]) -> Dict[str, Optional[List[Story]]]:
+        """
+        Dedupe within and across categories (first category wins). A category keeps
+        its top story even if another category has it, so none is left empty.
+        None (a failed fetch) is passed through.
+        """
+        if not self.enabled:
+            return stories_by_category
+        index = self.index()
+        deduped = {}
+        for category, stories in stories_by_category.items():
+            if stories is None:
+                deduped[category] = None
+                continue
+            kept = self.dedupe(stories, index)
+            if stories and not kept:
+                kept = stories[:1]
+                self._count(0, -1, 0.0)
+            deduped[category] = kept
+        return deduped
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'threshold': self.threshold,
+                'stories_seen': self.stories_seen,
+                'duplicates_dropped': self.duplicates_dropped,
+                'avg_us_per_story': round(self.seconds / self.stories_seen * 1e6, 1) if self.stories_seen else None,
+            }
+
+
+_deduper: Optional[StoryDeduper] = None
+_deduper_lock = threading.Lock()
+
+
+def get_story_deduper() -> StoryDeduper:
+    """Process-wide story deduper."""
+    global _deduper
+    with _deduper_lock:
+        if _deduper is None:
+            _deduper = StoryDeduper()
+        return _deduper
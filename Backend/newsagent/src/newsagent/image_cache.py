@@ -0,0 +1,210 @@
+"""
+Persistent content-addressed cache and store for generated images.
+
+PNG bytes are stored once under the SHA-256 of (prompt, style, dimensions, model).
+Writes go to a temp file and are atomically renamed into place, so concurrent
+readers and writers in other threads or processes never see partial files.
+Entries are evicted least-recently-used first (file mtime is bumped on every
+hit) once the cache exceeds its size budget, and on read once they are too old.
+Images that must outlive the cache (those in archived articles) are pinned: a
+hard link (or copy) under IMAGE_PINNED_DIR that eviction never touches and
+lookups fall back to; the archive unpins them with its own retention.
+The API serves entries at /images/<key>, so payloads only carry the URL.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join('.cache', 'images'))
+IMAGE_CACHE_MAX_MB = float(os.getenv('IMAGE_CACHE_MAX_MB', 512))
+IMAGE_CACHE_MAX_AGE_HOURS = float(os.getenv('IMAGE_CACHE_MAX_AGE_HOURS', 24 * 7))
+# Pinned images (outside the cache directory, so never evicted)
+IMAGE_PINNED_DIR = os.getenv('IMAGE_PINNED_DIR', os.path.join('.cache', 'images-pinned'))
+# Prefix for image URLs in article payloads (e.g. http://localhost:5000)
+IMAGE_BASE_URL = os.getenv('IMAGE_BASE_URL', '').rstrip('/')
+
+_KEY_CHARS = set('0123456789abcdef')
+
+
+def image_key(prompt: str, style: str, dimensions: str, model: str) -> str:
+    """Content address for an image generation request."""
+    digest = hashlib.sha256()
+    for part in (prompt, style, dimensions, model):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def is_image_key(value: str) -> bool:
+    """Check that a value is a well-formed image key (safe to use in a path)."""
+    return len(value) == 64 and set(value) <= _KEY_CHARS
+
+
+def image_url(key: str) -> str:
+    """Public URL the API serves a cached image from."""
+    return f"{IMAGE_BASE_URL}/images/{key}"
+
+
+class ImageCache:
+    """Disk-backed PNG cache with size- and age-based LRU eviction."""
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None, pinned_directory: str = IMAGE_PINNED_DIR):
+        self.directory = os.path.abspath(directory)
+        self.pinned_directory = os.path.abspath(pinned_directory)
+        self.max_bytes = max_bytes if max_bytes is not None else int(IMAGE_CACHE_MAX_MB * 1024 * 1024)
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else IMAGE_CACHE_MAX_AGE_HOURS * 3600
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._approx_bytes = self._scan_size()
+
+    def path(self, key: str) -> str:
+        # Shard by key prefix to keep directories small
+        return os.path.join(self.directory, key[:2], f"{key}.png")
+
+    def pinned_path(self, key: str) -> str:
+        return os.path.join(self.pinned_directory, key[:2], f"{key}.png")
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self, directory: Optional[str] = None):
+        for root, _, files in os.walk(directory or self.directory):
+            for name in files:
+                if not name.endswith('.png'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def lookup(self, key: str) -> Optional[str]:
+        """Return the file path for a live or pinned entry (marking it used), or None."""
+        path = self.path(key)
+        try:
+            if time.time() - os.path.getmtime(path) <= self.max_age_seconds:
+                os.utime(path)  # mark as recently used
+                return path
+            self._remove(path)
+        except FileNotFoundError:
+            pass
+        pinned = self.pinned_path(key)
+        return pinned if os.path.exists(pinned) else None
+
+    def contains(self, key: str) -> bool:
+        return self.lookup(key) is not None
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached PNG bytes, or None on a miss or expired entry."""
+        path = self.lookup(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> str:
+        """Store PNG bytes under `key` and return the file path."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        with self._lock:
+            self._approx_bytes += len(data)
+            over_budget = self._approx_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return path
+
+    def pin(self, key: str) -> bool:
+        """Keep an entry past eviction until unpinned; False if it isn't stored."""
+        target = self.pinned_path(key)
+        try:
+            os.utime(target)  # already pinned: restart its retention
+            return True
+        except FileNotFoundError:
+            pass
+        source = self.lookup(key)
+        if source is None:
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            try:
+                os.link(source, tmp_path)
+            except OSError:
+                # Other filesystem (or no hard links): copy instead
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, target)
+            os.utime(target)
+        except FileNotFoundError:
+            # Evicted in the meantime
+            self._remove(tmp_path)
+            return False
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        return True
+
+    def unpin_older_than(self, cutoff: float) -> int:
+        """Drop pinned entries last pinned (or served) before the cutoff timestamp."""
+        if not os.path.isdir(self.pinned_directory):
+            return 0
+        removed = sum(1 for path, mtime, _ in self._entries(self.pinned_directory)
+                      if mtime < cutoff and self._remove(path))
+        if removed:
+            logger.info(f"Image cache unpinned {removed} image(s)")
+        return removed
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under budget."""
+        with self._lock:
+            now = time.time()
+            entries = sorted(self._entries(), key=lambda entry: entry[1])
+            total = sum(size for _, _, size in entries)
+            for path, mtime, size in entries:
+                if total <= self.max_bytes and now - mtime <= self.max_age_seconds:
+                    break
+                if self._remove(path):
+                    total -= size
+            self._approx_bytes = total
+        logger.info(f"Image cache evicted down to {total / (1024 * 1024):.1f} MB")
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+
+_cache: Optional[ImageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """Get the process-wide image cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
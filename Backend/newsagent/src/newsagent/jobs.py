@@ -0,0 +1,338 @@
+"""
+Background generation jobs with per-stage progress.
+
+Each long-running generation (refresh runs, on-demand newsletters) runs on the
+bounded work queue as a Job with an id, an overall status and progress for the pipeline stages
+(fetch, research, write, image). Code running inside a job reports progress
+through the module-level stage helpers, which find the job through a context
+variable and do nothing outside a job. Every change is appended to the job's
+event log so clients can poll GET /api/jobs/<id> or follow a Server-Sent
+Events stream.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .work_queue import PRIORITY_SCHEDULED, QueueFull, WorkItem, WorkQueue, get_work_queue
+
+logger = logging.getLogger(__name__)
+
+STAGES = ('fetch', 'research', 'write', 'image')
+# Name of the crew task whose completion ends a crew's research stage
+RESEARCH_TASK = 'research_task'
+JOB_HISTORY = int(os.getenv('JOB_HISTORY', 200))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = 'queued', 'running', 'succeeded', 'failed', 'cancelled'
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+_current_job: contextvars.ContextVar[Optional['Job']] = contextvars.ContextVar('current_job', default=None)
+
+
+def _now() -> float:
+    return time.time()
+
+
+class Job:
+    """One background generation run and its event log."""
+
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None, key: Optional[Hashable] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.key = key
+        self.status = QUEUED
+        self.created_at = _now()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.priority = PRIORITY_SCHEDULED
+        self.item: Optional[WorkItem] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.stages: Dict[str, Dict[str, Any]] = {
+            name: {'status': 'pending', 'started_at': None, 'finished_at': None} for name in STAGES
+        }
+        self._active: Dict[str, int] = {name: 0 for name in STAGES}
+        self._events: List[Dict[str, Any]] = []
+        self._changed = threading.Condition()
+        # Event-loop waiters (ASGI event streams), woken from whichever thread emits
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+        with self._changed:
+            self._emit('status', status=QUEUED)
+
+    def _emit(self, event_type: str, **data):
+        # Callers hold self._changed
+        self._events.append(dict(data, seq=len(self._events) + 1, type=event_type, at=_now()))
+        self._changed.notify_all()
+        for loop, waiter in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                pass  # The waiter's event loop has already closed
+
+    def _set_status(self, status: str, **data):
+        with self._changed:
+            self.status = status
+            if status == RUNNING:
+                self.started_at = _now()
+            elif status in FINISHED:
+                self.finished_at = _now()
+            self._emit('status', status=status, **data)
+
+    def begin_stage(self, name: str):
+        with self._changed:
+            stage = self.stages[name]
+            self._active[name] += 1
+            if stage['status'] != 'running':
+                stage.update(status='running', started_at=stage['started_at'] or _now())
+                self._emit('stage', stage=name, status='running')
+
+    def note(self, event_type: str, **data):
+        """Append an informational event (e.g. per-run metrics) to the log."""
+        with self._changed:
+            self._emit(event_type, **data)
+
+    def finish_stage(self, name: str, status: str = 'done'):
+        """End one use of a stage; it is done once every concurrent user has finished."""
+        with self._changed:
+            stage = self.stages[name]
+            self._active[name] = max(0, self._active[name] - 1)
+            if self._active[name] == 0 and stage['status'] in ('pending', 'running'):
+                stage.update(status=status, finished_at=_now())
+                self._emit('stage', stage=name, status=status)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; returns False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.finished, timeout)
+
+    def mark_cancelled(self):
+        with self._changed:
+            for name, stage in self.stages.items():
+                if stage['status'] == 'pending':
+                    stage['status'] = 'skipped'
+        self._set_status(CANCELLED)
+
+    def run(self, func: Callable[[], Any]):
+        """Run func as this job's body, recording its result or error."""
+        token = _current_job.set(self)
+        self._set_status(RUNNING)
+        try:
+            result = func()
+        except Exception as e:
+            logger.error(f"Job {self.id} ({self.kind}) failed: {e}")
+            with self._changed:
+                self.error = str(e)
+                for name, stage in self.stages.items():
+                    if stage['status'] == 'running':
+                        self._active[name] = 0
+                        stage.update(status='failed', finished_at=_now())
+                        self._emit('stage', stage=name, status='failed')
+            self._set_status(FAILED, error=self.error)
+        else:
+            with self._changed:
+                self.result = result
+                for name, stage in self.stages.items():
+                    if stage['status'] in ('pending', 'running'):
+                        stage.update(status='skipped' if stage['status'] == 'pending' else 'done',
+                                     finished_at=_now())
+                        self._emit('stage', stage=name, status=stage['status'])
+            self._set_status(SUCCEEDED)
+        finally:
+            _current_job.reset(token)
+
+    def events_since(self, seq: int, timeout: float) -> List[Dict[str, Any]]:
+        """Events after seq, waiting up to timeout for new ones (returns [] on timeout)."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(self._events) > seq or self.finished, timeout)
+            return [dict(event) for event in self._events[seq:]]
+
+    async def aevents_since(self, seq: int, timeout: float) -> List[Dict[str, Any]]:
+        """events_since() for asyncio callers: waits on the event loop, not in a thread."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._changed:
+            if len(self._events) > seq or self.finished:
+                return [dict(event) for event in self._events[seq:]]
+            self._async_waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._changed:
+                self._async_waiters.remove(waiter)
+        with self._changed:
+            return [dict(event) for event in self._events[seq:]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                'job_id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'priority': self.priority,
+                'params': self.params,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+                'stages': {name: dict(stage) for name, stage in self.stages.items()},
+                'result': self.result,
+                'error': self.error,
+            }
+
+
+class JobRegistry:
+    """Creates jobs, runs them on the work queue and keeps the last `history` finished ones."""
+
+    def __init__(self, history: int = JOB_HISTORY, queue: Optional[WorkQueue] = None):
+        self.history = history
+        self.queue = queue or get_work_queue()
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+    def create(self, kind: str, params: Optional[Dict[str, Any]] = None,
+               key: Optional[Hashable] = None) -> Tuple[Job, bool]:
+        """
+        Register a new job. If key is given and an unfinished job with the same
+        key exists, that job is returned instead. Returns (job, created).
+        """
+        with self._lock:
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.finished:
+                        return job, False
+            job = Job(kind, params=params, key=key)
+            self._jobs[job.id] = job
+            self._prune()
+            return job, True
+
+    def start(self, job: Job, func: Callable[[], Any], priority: int = PRIORITY_SCHEDULED,
+              on_cancel: Optional[Callable[[], None]] = None) -> Job:
+        """Queue the job's body; raises QueueFull (and forgets the job) when the queue is full."""
+        def cancelled():
+            job.mark_cancelled()
+            if on_cancel is not None:
+                on_cancel()
+
+        job.priority = priority
+        try:
+            job.item = self.queue.submit(
+                lambda: job.run(func), priority=priority, name=f'{job.kind}:{job.id}', on_cancel=cancelled
+            )
+        except QueueFull:
+            with self._lock:
+                self._jobs.pop(job.id, None)
+            raise
+        return job
+
+    def submit(self, kind: str, func: Callable[[], Any], params: Optional[Dict[str, Any]] = None,
+               key: Optional[Hashable] = None, priority: int = PRIORITY_SCHEDULED,
+               on_cancel: Optional[Callable[[], None]] = None) -> Job:
+        """
+        Create a job and queue it, or join the unfinished job with the same key.
+        on_cancel runs if the job is cancelled before it starts.
+        """
+        job, created = self.create(kind, params=params, key=key)
+        return self.start(job, func, priority, on_cancel) if created else job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that is still queued. Returns False if it is unknown, running or finished."""
+        job = self.get(job_id)
+        if job is None or job.item is None:
+            return False
+        return self.queue.cancel(job.item)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The newest jobs first; limit is clamped to 1..history."""
+        limit = max(1, min(limit, self.history))
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+        return [job.to_dict() for job in reversed(jobs)]
+
+
+def sse_message(event_type: str, data: Any, event_id: Optional[int] = None) -> str:
+    """One Server-Sent Events message."""
+    message = f"id: {event_id}\n" if event_id is not None else ''
+    return message + f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def current_job() -> Optional[Job]:
+    """The job the calling code is running in, if any."""
+    return _current_job.get()
+
+
+def begin_stage(name: str):
+    job = current_job()
+    if job is not None:
+        job.begin_stage(name)
+
+
+def finish_stage(name: str, status: str = 'done'):
+    job = current_job()
+    if job is not None:
+        job.finish_stage(name, status)
+
+
+def report(event_type: str, **data):
+    """Add an event to the current job's log (no-op outside a job)."""
+    job = current_job()
+    if job is not None:
+        job.note(event_type, **data)
+
+
+@contextmanager
+def stage(name: str):
+    """Mark a pipeline stage as running for the duration of the block."""
+    begin_stage(name)
+    try:
+        yield
+    except Exception:
+        finish_stage(name, 'failed')
+        raise
+    finish_stage(name)
+
+
+def crew_task_finished(output: Any = None):
+    """
+    Crew task_callback: when a crew's research task finishes, that crew moves on
+    to writing. Keyed on the finished task, not the job's stage status, so jobs
+    running several crews at once (per-category generation) count each crew once.
+    """
+    job = current_job()
+    if job is not None and getattr(output, 'name', None) == RESEARCH_TASK:
+        job.finish_stage('research')
+        job.begin_stage('write')
+
+
+_registry: Optional[JobRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_job_registry() -> JobRegistry:
+    """Process-wide job registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = JobRegistry()
+        return _registry
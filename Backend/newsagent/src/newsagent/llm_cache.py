@@ -0,0 +1,245 @@
+"""
+Completion cache for the crew's LLM calls.
+
+Completions are keyed on (model, messages, temperature, tool schema) and kept
+in two tiers: an in-memory LRU for the current process and a SQLite table
+shared across processes and restarts (train/test/replay runs and repeated
+refreshes). Both tiers expire entries after a TTL; the SQLite tier is also
+trimmed least-recently-used first to a size budget. Every entry counts its hits.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join('.cache', 'llm_cache.sqlite3'))
+LLM_CACHE_TTL_HOURS = float(os.getenv('LLM_CACHE_TTL_HOURS', 6))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 512))
+LLM_CACHE_MAX_MB = float(os.getenv('LLM_CACHE_MAX_MB', 64))
+
+
+def completion_key(model: str, messages: Any, temperature: Optional[float] = None, tools: Any = None) -> str:
+    """Stable hash of everything that determines a completion."""
+    payload = json.dumps(
+        {'model': model, 'messages': messages, 'temperature': temperature, 'tools': tools},
+        sort_keys=True, default=str, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache(ABC):
+    """Interface for completion caches; subclasses store and look up responses by key."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for the key, or None on a miss."""
+
+    @abstractmethod
+    def put(self, key: str, response: str):
+        """Store a response under the key."""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryCompletionCache(CompletionCache):
+    """In-process LRU tier with TTL."""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_HOURS * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, created = entry
+            if time.time() - created > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def put(self, key: str, response: str, created: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (response, created or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+class SQLiteCompletionCache(CompletionCache):
+    """Persistent tier shared between processes, with TTL and size-based LRU trimming."""
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_HOURS * 3600,
+                 max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024)):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS completions ('
+                ' key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL,'
+                ' created REAL NOT NULL, last_hit REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS completions_last_hit ON completions (last_hit)')
+
+    def get_entry(self, key: str) -> Optional[Tuple[str, float]]:
+        """(response, created) for a live entry, counting the hit."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT response, created FROM completions WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+                return None
+            self._conn.execute(
+                'UPDATE completions SET hits = hits + 1, last_hit = ? WHERE key = ?', (now, key)
+            )
+            return row[0], row[1]
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.get_entry(key)
+        return entry[0] if entry else None
+
+    def put(self, key: str, response: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO completions (key, response, size, created, last_hit, hits)'
+                ' VALUES (?, ?, ?, ?, ?, 0)',
+                (key, response, len(response.encode('utf-8')), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._conn.execute('DELETE FROM completions WHERE created < ?', (now - self.ttl_seconds,))
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM completions').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            'SELECT key, size FROM completions ORDER BY last_hit ASC'
+        ).fetchall():
+            self._conn.execute('DELETE FROM completions WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def top_entries(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT key, hits, size, created, last_hit FROM completions ORDER BY hits DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [
+            {'key': key[:16], 'hits': hits, 'size': size, 'created': created, 'last_hit': last_hit}
+            for key, hits, size, created, last_hit in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total_bytes, total_hits = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0) FROM completions'
+            ).fetchone()
+        return {'entries': entries, 'bytes': total_bytes, 'entry_hits': total_hits, 'path': self.path}
+
+
+class TieredCompletionCache(CompletionCache):
+    """Memory LRU in front of the SQLite tier, with hit/miss counters."""
+
+    def __init__(self, memory: Optional[MemoryCompletionCache] = None,
+                 persistent: Optional[SQLiteCompletionCache] = None):
+        self.memory = memory or MemoryCompletionCache()
+        self.persistent = persistent
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> Optional[str]:
+        response = self.memory.get(key)
+        if response is None and self.persistent is not None:
+            entry = self.persistent.get_entry(key)
+            if entry is not None:
+                response = entry[0]
+                # Keep the original creation time so the TTL still applies
+                self.memory.put(key, response, created=entry[1])
+        self._count(response is not None)
+        return response
+
+    def put(self, key: str, response: str):
+        self.memory.put(key, response)
+        if self.persistent is not None:
+            self.persistent.put(key, response)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        stats = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            'memory': self.memory.stats(),
+        }
+        if self.persistent is not None:
+            stats['sqlite'] = self.persistent.stats()
+            stats['top_entries'] = self.persistent.top_entries()
+        return stats
+
+
+_cache: Optional[CompletionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_completion_cache() -> Optional[CompletionCache]:
+    """Process-wide completion cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                persistent = SQLiteCompletionCache()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM cache SQLite tier unavailable, using memory only: {e}")
+                persistent = None
+            _cache = TieredCompletionCache(persistent=persistent)
+        return _cache
+
+
+def set_completion_cache(cache: Optional[CompletionCache]):
+    """Plug in a different completion cache implementation (None disables caching)."""
+    global _cache, LLM_CACHE_ENABLED
+    with _cache_lock:
+        _cache = cache
+        LLM_CACHE_ENABLED = cache is not None
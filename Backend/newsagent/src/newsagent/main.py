@@ -1,18 +1,25 @@
 #!/usr/bin/env python
 import sys
 import warnings
-import schedule
 import time
-import threading
 import os
-from datetime import datetime
+from datetime import timedelta
+from functools import partial
 import logging
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from newsagent.crew import Newsagent
+from newsagent.change_detection import HeadlineTracker
+from newsagent.crew import Newsagent, crew_inputs
+from newsagent.crew_pool import get_crew_pool
+from newsagent.dedupe import get_story_deduper
+from newsagent.news_source import get_news_source
+from newsagent.scheduler import FreshnessScheduler, headlines_fingerprint
+from newsagent.schemas import articles_by_category, parse_newsletter
+from newsagent.tools.custom_tool import NewsScraper
+from newsagent.workers import GenerationPool
 
 # Set up logging
 logging.basicConfig(
@@ -25,6 +32,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Categories the scheduler keeps fresh
+SCHEDULED_CATEGORIES = [
+    "technology", "business", "science",
+    "general", "health"
+]
+
+# Regenerate a category once its newsletter is older than this
+CACHE_DURATION_HOURS = float(os.getenv('CACHE_DURATION_HOURS', 2))
+
+# Top headlines per category compared against the previous run
+HEADLINE_CHECK_SIZE = 10
+
+# Remembers which stories were already written, so unchanged ones skip the crew
+HEADLINE_TRACKER = HeadlineTracker()
+
+# Fetches every category's headlines concurrently before the single crew run
+HEADLINE_POOL = GenerationPool()
+
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
 def check_gemini_key():
@@ -40,9 +65,42 @@ def check_gemini_key():
         return False
     return True
 
-def run_newsletter_generation():
+def fetch_new_headlines(categories):
+    """
+    Fetch each category's headlines, drop near-duplicates and keep only stories not
+    written before. Returns {category: new headlines}, with None where the fetch failed.
+    """
+    scraper = NewsScraper()
+    # One concurrent sweep over all categories (failed fetches come back as None)
+    results = HEADLINE_POOL.run(
+        (category, partial(scraper.fetch, category, HEADLINE_CHECK_SIZE)) for category in categories
+    )
+    headlines_by_category = {}
+    for category, result in results.items():
+        if result is None:
+            logger.warning(f"Could not fetch headlines for {category}")
+            headlines_by_category[category] = None
+        else:
+            headlines_by_category[category] = [dict(article.model_dump(), category=category) for article in result.articles]
+    # The same story from several outlets or categories goes to the crew once
+    headlines_by_category = get_story_deduper().dedupe_by_category(headlines_by_category)
+
+    new_by_category = {}
+    for category, headlines in headlines_by_category.items():
+        if headlines is None:
+            new_by_category[category] = None
+            continue
+        new_headlines, _ = HEADLINE_TRACKER.diff(category, headlines)
+        if not new_headlines:
+            logger.info(f"Headlines unchanged for {category}; skipping it this run")
+        new_by_category[category] = new_headlines
+    return new_by_category
+
+def run_newsletter_generation(categories=None):
     """
     Run the newsletter generation crew.
+    Categories whose headlines have not changed since the last run are skipped;
+    returns None when nothing changed.
     """
     try:
         logger.info("Starting newsletter generation...")
@@ -52,19 +110,31 @@ def run_newsletter_generation():
             raise Exception("Google Gemini API key not configured. Please add GOOGLE_API_KEY to your .env file.")
         
         # Categories to focus on - can be customized
-        categories = [
-            "technology", "business", "science", 
-            "general", "health"
-        ]
+        categories = categories or SCHEDULED_CATEGORIES
+        
+        new_by_category = fetch_new_headlines(categories)
+        to_run = [c for c in categories if new_by_category[c] is None or new_by_category[c]]
+        if not to_run:
+            HEADLINE_TRACKER.count_avoided()
+            logger.info(f"No new stories; skipped the crew run. Change detection: {HEADLINE_TRACKER.stats()}")
+            return None
+        
+        # Categories whose fetch failed fall back to the crew's own research
+        headlines = [h for c in to_run for h in (new_by_category[c] or [])]
+        inputs = crew_inputs(', '.join(to_run), headlines or None)
         
-        inputs = {
-            'categories': ', '.join(categories),
-            'current_date': datetime.now().strftime('%Y-%m-%d'),
-            'current_time': datetime.now().strftime('%H:%M:%S')
-        }
+        result = get_crew_pool().kickoff(inputs)
+        HEADLINE_TRACKER.count_run(len(headlines), 0)
         
-        crew = Newsagent().crew()
-        result = crew.kickoff(inputs=inputs)
+        try:
+            written = articles_by_category(parse_newsletter(result), to_run, headlines)
+        except Exception as e:
+            logger.warning(f"Could not match written articles to headlines for change detection: {e}")
+            written = {category: [] for category in to_run}
+        # Every story sent is remembered (unwritten ones as seen), so it isn't sent again
+        for category in to_run:
+            if new_by_category[category]:
+                HEADLINE_TRACKER.record(category, new_by_category[category], written[category])
         
         logger.info("Newsletter generation completed successfully!")
         return result
@@ -79,21 +149,61 @@ def run():
     """
     return run_newsletter_generation()
 
+def run_category_generation(category):
+    """
+    Run the newsletter generation crew for a single category.
+    Returns True on success (used as the scheduler's refresh callback).
+    """
+    try:
+        run_newsletter_generation([category])
+        logger.info(f"Newsletter generation completed for {category}")
+        return True
+    except Exception as e:
+        logger.error(f"Newsletter generation failed for {category}: {e}")
+        return False
+
+def category_fingerprint(category):
+    """
+    Hash of the category's current top headlines, to detect upstream changes
+    (None when they can't be fetched). Shares the news source's short cache
+    with the headline fetch of the run it triggers.
+    """
+    try:
+        return headlines_fingerprint(get_news_source().top_headlines(category, HEADLINE_CHECK_SIZE))
+    except Exception as e:
+        logger.warning(f"Headline check failed for {category}: {e}")
+        return None
+
+def create_scheduler():
+    """
+    Build a scheduler that regenerates a category once it is stale or its
+    upstream headlines have changed.
+    """
+    return FreshnessScheduler(
+        SCHEDULED_CATEGORIES,
+        run_category_generation,
+        max_age=timedelta(hours=CACHE_DURATION_HOURS),
+        fingerprint=category_fingerprint if get_news_source().available else None,
+        check_interval=timedelta(minutes=float(os.getenv('HEADLINE_CHECK_MINUTES', 15))),
+        tick_seconds=float(os.getenv('SCHEDULER_TICK_SECONDS', 30)),
+        max_per_tick=int(os.getenv('SCHEDULER_MAX_PER_TICK', 1))
+    )
+
 def run_scheduler():
     """
-    Run the newsletter generation every minute using schedule.
+    Keep every category's newsletter fresh, regenerating stale ones.
     """
     logger.info("Starting newsletter scheduler...")
-    logger.info("Newsletter will be generated every minute")
+    logger.info(f"Categories are regenerated once older than {CACHE_DURATION_HOURS} hours, "
+                f"or when their headlines change")
     logger.info("Press Ctrl+C to stop the scheduler")
     
-    # Schedule the task to run every minute
-    schedule.every(1).minutes.do(run_newsletter_generation)
+    scheduler = create_scheduler()
     
     try:
         while True:
-            schedule.run_pending()
-            time.sleep(1)
+            scheduler.tick()
+            time.sleep(scheduler.tick_seconds)
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
     except Exception as e:
@@ -101,26 +211,15 @@ def run_scheduler():
 
 def run_scheduler_daemon():
     """
-    Run the newsletter generation in daemon mode (background).
+    Run the newsletter scheduler in daemon mode (background).
     This can be used when integrated with Flask API.
     """
     logger.info("Starting newsletter scheduler in daemon mode...")
-    logger.info("Newsletter will be generated every minute")
-    
-    # Schedule the task to run every minute
-    schedule.every(1).minutes.do(run_newsletter_generation)
-    
-    def scheduler_loop():
-        while True:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except Exception as e:
-                logger.error(f"Scheduler daemon error: {e}")
-                time.sleep(5)  # Wait before retrying
+    logger.info(f"Categories are regenerated once older than {CACHE_DURATION_HOURS} hours, "
+                f"or when their headlines change")
     
-    scheduler_thread = threading.Thread(target=scheduler_loop, daemon=True)
-    scheduler_thread.start()
+    scheduler = create_scheduler()
+    scheduler_thread = scheduler.start()
     logger.info("Newsletter scheduler daemon started in background")
     return scheduler_thread
 
@@ -129,10 +228,7 @@ def train():
     Train the crew for a given number of iterations.
     """
     categories = ["technology", "business", "science"]
-    inputs = {
-        "categories": ', '.join(categories),
-        'current_date': datetime.now().strftime('%Y-%m-%d')
-    }
+    inputs = crew_inputs(', '.join(categories))
     try:
         Newsagent().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
@@ -154,10 +250,7 @@ def test():
     Test the crew execution and returns the results.
     """
     categories = ["technology", "business", "science"]
-    inputs = {
-        "categories": ', '.join(categories),
-        "current_date": datetime.now().strftime('%Y-%m-%d')
-    }
+    inputs = crew_inputs(', '.join(categories))
     
     try:
         Newsagent().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
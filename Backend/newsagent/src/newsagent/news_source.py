@@ -0,0 +1,112 @@
+"""
+In-process NewsAPI client used by the newsagent tools.
+
+The tools used to reach NewsAPI by looping back over HTTP into the Flask app.
+They now call this client directly: requests go through the shared transport
+and the NewsAPI rate limiter, identical concurrent requests (same category and
+page size) are coalesced into one upstream call, and results are kept for a
+short TTL so agent tool calls in the same run don't spend quota twice.
+atop_headlines() is the non-blocking variant for the ASGI serving path.
+"""
+
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from . import async_transport, transport
+from .ratelimit import get_limiter
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+NEWSAPI_URL = os.getenv('NEWSAPI_URL', 'https://newsapi.org/v2/top-headlines')
+NEWSAPI_COUNTRY = os.getenv('NEWSAPI_COUNTRY', 'us')
+NEWS_CACHE_TTL_SECONDS = float(os.getenv('NEWS_CACHE_TTL_SECONDS', 60))
+MAX_PAGE_SIZE = 100
+
+CATEGORIES = ['general', 'business', 'entertainment', 'health', 'science', 'sports', 'technology']
+
+
+def _normalize(article: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a NewsAPI article into the field names the tools use."""
+    source = article.get('source') or {}
+    return {
+        'title': article.get('title') or '',
+        'url': article.get('url') or '',
+        'description': article.get('description') or '',
+        'published_at': article.get('publishedAt') or '',
+        'source': source.get('name') if isinstance(source, dict) else str(source),
+        'author': article.get('author') or '',
+        'image_url': article.get('urlToImage') or '',
+    }
+
+
+class NewsSource:
+    """Top-headlines client with request coalescing and a short result cache."""
+
+    def __init__(self, api_key: Optional[str] = None, ttl_seconds: float = NEWS_CACHE_TTL_SECONDS):
+        self.api_key = api_key or os.getenv('NEWSAPI_KEY') or os.getenv('NEWS_API_KEY')
+        self.flights = SingleFlight(ttl_seconds=ttl_seconds)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.api_key)
+
+    def _request_kwargs(self, category: str, page_size: int) -> Dict[str, Any]:
+        if not self.api_key:
+            raise ValueError("NewsAPI key not configured (set NEWSAPI_KEY)")
+        return {
+            'params': {'category': category, 'pageSize': page_size, 'country': NEWSAPI_COUNTRY},
+            'headers': {'X-Api-Key': self.api_key},
+            'limiter': get_limiter('newsapi'),
+        }
+
+    @staticmethod
+    def _parse(response) -> List[Dict[str, Any]]:
+        data = response.json()
+        if response.status_code != 200 or data.get('status') != 'ok':
+            raise ValueError(f"Error from NewsAPI: {data.get('message', response.status_code)}")
+        return [_normalize(article) for article in data.get('articles', [])]
+
+    def _load(self, category: str, page_size: int) -> List[Dict[str, Any]]:
+        return self._parse(transport.get(NEWSAPI_URL, **self._request_kwargs(category, page_size)))
+
+    async def _aload(self, category: str, page_size: int) -> List[Dict[str, Any]]:
+        return self._parse(await async_transport.aget(NEWSAPI_URL, **self._request_kwargs(category, page_size)))
+
+    @staticmethod
+    def _validate(category: str, page_size: int):
+        category = category.strip().lower()
+        if category not in CATEGORIES:
+            raise ValueError(f"Invalid category '{category}'. Available categories: {', '.join(CATEGORIES)}")
+        return category, max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    def top_headlines(self, category: str = 'general', page_size: int = 10) -> List[Dict[str, Any]]:
+        """Top headlines for a category (raises on network or API errors)."""
+        category, page_size = self._validate(category, page_size)
+        articles = self.flights.do((category, page_size), lambda: self._load(category, page_size))
+        # Callers get their own copies; the cached list is shared
+        return [dict(article) for article in articles]
+
+    async def atop_headlines(self, category: str = 'general', page_size: int = 10) -> List[Dict[str, Any]]:
+        """top_headlines() for asyncio callers."""
+        category, page_size = self._validate(category, page_size)
+        articles = await self.flights.ado((category, page_size), lambda: self._aload(category, page_size))
+        return [dict(article) for article in articles]
+
+    def stats(self) -> Dict[str, Any]:
+        return self.flights.stats()
+
+
+_source: Optional[NewsSource] = None
+_source_lock = threading.Lock()
+
+
+def get_news_source() -> NewsSource:
+    """Process-wide news source."""
+    global _source
+    with _source_lock:
+        if _source is None:
+            _source = NewsSource()
+        return _source
@@ -0,0 +1,235 @@
+"""
+Deterministic pre-ranking of stories before they reach the LLM.
+
+Stories headed for the crew (pre-fetched headlines or the News Scraper tool's
+output) are scored by recency, source weight and how many outlets carried the
+same story (its near-duplicate cluster size). Descriptions are trimmed, and
+only the top K that fit the token budget are passed on, as compact JSON. When
+several categories are ranked together, each category's best story is kept
+first so the writer can still cover all of them. Every run logs the prompt
+tokens saved, adds a 'ranking' event to the current job and updates the
+totals in ranking_stats().
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from .dedupe import StoryDeduper, get_story_deduper
+from .jobs import report
+
+logger = logging.getLogger(__name__)
+
+Story = Dict[str, Any]
+
+RANKING_TOP_K = int(os.getenv('RANKING_TOP_K', 15))
+# Prompt tokens allowed for the whole story list
+RANKING_TOKEN_BUDGET = int(os.getenv('RANKING_TOKEN_BUDGET', 1500))
+DESCRIPTION_TOKENS = int(os.getenv('RANKING_DESCRIPTION_TOKENS', 48))
+RECENCY_HALF_LIFE_HOURS = float(os.getenv('RANKING_HALF_LIFE_HOURS', 6))
+
+# Score weights (each signal is scaled to 0..1)
+RECENCY_WEIGHT = 0.5
+SOURCE_WEIGHT = 0.2
+CLUSTER_WEIGHT = 0.3
+
+# Wire services and major outlets first; unknown sources get DEFAULT_SOURCE_WEIGHT
+SOURCE_WEIGHTS = {
+    'reuters': 1.0,
+    'associated press': 1.0,
+    'ap news': 1.0,
+    'bloomberg': 0.9,
+    'bbc news': 0.9,
+    'the wall street journal': 0.9,
+    'financial times': 0.9,
+    'the new york times': 0.85,
+    'the washington post': 0.85,
+    'the guardian': 0.8,
+    'npr': 0.8,
+    'cnbc': 0.75,
+    'cnn': 0.7,
+    'the verge': 0.7,
+    'techcrunch': 0.7,
+    'ars technica': 0.7,
+}
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+# Rough size of an LLM token in characters (no tokenizer dependency)
+CHARS_PER_TOKEN = 4
+
+# Counts clusters for ranking only; the pipeline's own dedupe counters stay separate
+_clusterer = StoryDeduper()
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+def _source_name(story: Story) -> str:
+    source = story.get('source') or ''
+    return (source.get('name') or '') if isinstance(source, dict) else str(source)
+
+
+def _published_at(story: Story) -> Optional[datetime]:
+    value = story.get('published_at') or story.get('publishedAt')
+    if not value:
+        return None
+    try:
+        published = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+def trim_text(text: str, max_tokens: int) -> str:
+    """Cut text at a word boundary to about max_tokens tokens."""
+    text = ' '.join((text or '').split())
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(' ', 1)[0] + '…'
+
+
+def score_story(story: Story, now: Optional[datetime] = None) -> float:
+    """Weighted recency, source weight and cluster size, in 0..1."""
+    now = now or datetime.now(timezone.utc)
+    published = _published_at(story)
+    if published is None:
+        recency = 0.0
+    else:
+        age_hours = max(0.0, (now - published).total_seconds() / 3600)
+        recency = 0.5 ** (age_hours / RECENCY_HALF_LIFE_HOURS)
+    source = SOURCE_WEIGHTS.get(_source_name(story).strip().lower(), DEFAULT_SOURCE_WEIGHT)
+    cluster = 1.0 - 1.0 / max(1, story.get('cluster_size') or 1)
+    return RECENCY_WEIGHT * recency + SOURCE_WEIGHT * source + CLUSTER_WEIGHT * cluster
+
+
+def compact_story(story: Story) -> Story:
+    """The fields the crew needs, with the description trimmed."""
+    compact = {
+        'title': story.get('title') or '',
+        'source': _source_name(story),
+        'category': story.get('category'),
+        'published_at': story.get('published_at') or story.get('publishedAt'),
+        'url': story.get('url'),
+        'summary': trim_text(story.get('description') or '', DESCRIPTION_TOKENS),
+    }
+    if (story.get('cluster_size') or 1) > 1:
+        compact['outlets'] = story['cluster_size']
+    return {key: value for key, value in compact.items() if value}
+
+
+class RankedStories:
+    """The stories kept for the LLM and what they cost compared to the full list."""
+
+    def __init__(self, stories: List[Story], tokens_before: int, stories_in: int):
+        self.stories = stories
+        self.json = _compact_json(stories)
+        self.tokens_before = tokens_before
+        self.tokens_after = estimate_tokens(self.json)
+        self.stories_in = stories_in
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(0, self.tokens_before - self.tokens_after)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'stories_in': self.stories_in,
+            'stories_out': len(self.stories),
+            'tokens_before': self.tokens_before,
+            'tokens_after': self.tokens_after,
+            'tokens_saved': self.tokens_saved,
+        }
+
+
+class _RankingStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.last_run: Optional[Dict[str, int]] = None
+
+    def record(self, ranked: RankedStories):
+        with self._lock:
+            self.runs += 1
+            self.tokens_before += ranked.tokens_before
+            self.tokens_after += ranked.tokens_after
+            self.last_run = ranked.summary()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'runs': self.runs,
+                'top_k': RANKING_TOP_K,
+                'token_budget': RANKING_TOKEN_BUDGET,
+                'tokens_before': self.tokens_before,
+                'tokens_after': self.tokens_after,
+                'tokens_saved': max(0, self.tokens_before - self.tokens_after),
+                'last_run': self.last_run,
+            }
+
+
+_stats = _RankingStats()
+
+
+def rank_stories(stories: List[Story], top_k: int = RANKING_TOP_K,
+                 token_budget: int = RANKING_TOKEN_BUDGET) -> RankedStories:
+    """Top stories (at most top_k, within token_budget) as compact dicts, best first."""
+    tokens_before = estimate_tokens(json.dumps(stories, ensure_ascii=False, default=str))
+    # Collapse duplicates still in the list; the copies carry their cluster size,
+    # including duplicates the pipeline dropped before the crew saw them
+    index = _clusterer.index()
+    candidates = _clusterer.dedupe([dict(story) for story in stories], index)
+    pipeline = get_story_deduper()
+    for story in candidates:
+        story['cluster_size'] = max(index.cluster_size(story), pipeline.cluster_size(story))
+    now = datetime.now(timezone.utc)
+    scores = [score_story(story, now) for story in candidates]
+    ranked = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))
+
+    # Each category's best story goes first, then the rest by score
+    leaders, seen_categories = [], set()
+    for i in ranked:
+        category = candidates[i].get('category')
+        if category not in seen_categories:
+            seen_categories.add(category)
+            leaders.append(i)
+    leader_set = set(leaders)
+    order = leaders + [i for i in ranked if i not in leader_set]
+
+    selected, used = [], 2  # the list's brackets
+    for i in order:
+        if len(selected) >= top_k:
+            break
+        compact = compact_story(candidates[i])
+        cost = estimate_tokens(_compact_json(compact)) + 1
+        if selected and used + cost > token_budget:
+            continue
+        selected.append(i)
+        used += cost
+
+    position = {i: rank for rank, i in enumerate(ranked)}
+    selected.sort(key=position.get)
+    result = RankedStories([compact_story(candidates[i]) for i in selected], tokens_before, len(stories))
+    _stats.record(result)
+    logger.info(
+        f"Ranked {len(stories)} stories down to {len(result.stories)}: "
+        f"~{result.tokens_before} -> ~{result.tokens_after} prompt tokens ({result.tokens_saved} saved)"
+    )
+    report('ranking', **result.summary())
+    return result
+
+
+def ranking_stats() -> Dict[str, Any]:
+    """Totals and the last run's token savings."""
+    return _stats.snapshot()
@@ -0,0 +1,232 @@
+"""
+Process-wide rate limiting for outbound provider calls (Groq, NewsAPI, Stability).
+
+Each provider gets a ProviderLimiter with a token-bucket request rate (0 for
+no rate limit), a burst size and a cap on concurrent in-flight calls.
+Limiters back off when a provider answers 429 / Retry-After and keep metrics
+on time spent waiting vs. working.
+Threads and asyncio tasks share the same budgets (slot() / aslot()).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Optional
+
+# Default budgets per provider: (requests per second, burst size, max in-flight)
+DEFAULT_LIMITS = {
+    'groq': (0.5, 2, 2),
+    'newsapi': (2.0, 5, 4),
+    'stability': (0.5, 2, 2),
+}
+
+# Backoff used when a 429 carries no Retry-After header
+DEFAULT_BACKOFF_SECONDS = 5.0
+# Lowest fraction of the configured rate adaptive backoff may drop to
+MIN_RATE_FACTOR = 0.125
+# How often an asyncio task waiting for an in-flight slot re-checks
+ASYNC_SLOT_POLL_SECONDS = 0.05
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate` tokens/sec (0: unlimited)."""
+
+    def __init__(self, rate: float, burst: int):
+        if rate < 0:
+            raise ValueError(f"Token bucket rate must be >= 0 (0 means unlimited), got {rate}")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def block_for(self, seconds: float):
+        """Hand out no tokens for the next `seconds` and drain the bucket."""
+        with self._lock:
+            now = time.monotonic()
+            self._blocked_until = max(self._blocked_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._blocked_until
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Take `tokens` if available and return 0, else return how long to wait first."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            if self.rate <= 0:
+                return 0.0
+            self._refill(now)
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Block until `tokens` are available. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            time.sleep(delay)
+            waited += delay
+
+    async def aacquire(self, tokens: float = 1) -> float:
+        """Like acquire(), but sleeps without blocking the event loop."""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire(tokens)
+            if delay <= 0:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Parse a Retry-After header value given in seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderLimiter:
+    """Rate, burst and concurrency budget for one provider, with adaptive backoff."""
+
+    def __init__(self, name: str, rate: float, burst: int, max_in_flight: int):
+        if rate < 0:
+            raise ValueError(f"{name}: request rate must be >= 0 (0 means unlimited), got {rate}")
+        self.name = name
+        self.base_rate = rate
+        self.max_in_flight = max(1, max_in_flight)
+        self._bucket = TokenBucket(rate, burst)
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._calls = 0
+        self._throttled = 0
+        self._wait_seconds = 0.0
+        self._work_seconds = 0.0
+
+    def acquire(self) -> float:
+        """Wait for a request token (no concurrency slot). Returns the wait time."""
+        waited = self._bucket.acquire()
+        with self._lock:
+            self._calls += 1
+            self._wait_seconds += waited
+        return waited
+
+    def _begin_call(self, waiting_since: float) -> float:
+        started = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            self._in_flight += 1
+            self._wait_seconds += started - waiting_since
+        return started
+
+    def _end_call(self, started: float):
+        with self._lock:
+            self._in_flight -= 1
+            self._work_seconds += time.monotonic() - started
+
+    @contextmanager
+    def slot(self):
+        """Hold a token and an in-flight slot for the duration of one call."""
+        start = time.monotonic()
+        self._slots.acquire()
+        try:
+            self._bucket.acquire()
+            started = self._begin_call(start)
+            try:
+                yield self
+            finally:
+                self._end_call(started)
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def aslot(self):
+        """slot() for asyncio code: waits for the slot and token without blocking the loop."""
+        start = time.monotonic()
+        # The semaphore is shared with threads, so it can only be polled from the loop
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(ASYNC_SLOT_POLL_SECONDS)
+        try:
+            await self._bucket.aacquire()
+            started = self._begin_call(start)
+            try:
+                yield self
+            finally:
+                self._end_call(started)
+        finally:
+            self._slots.release()
+
+    def report_throttle(self, retry_after: Any = None):
+        """Record a 429: pause the provider and halve its request rate (if it has one)."""
+        delay = parse_retry_after(retry_after)
+        with self._lock:
+            self._throttled += 1
+            if self.base_rate > 0:
+                self._bucket.rate = max(self.base_rate * MIN_RATE_FACTOR, self._bucket.rate / 2)
+        self._bucket.block_for(DEFAULT_BACKOFF_SECONDS if delay is None else delay)
+
+    def report_success(self):
+        """Recover the request rate gradually after a throttle."""
+        with self._lock:
+            if self._bucket.rate < self.base_rate:
+                self._bucket.rate = min(self.base_rate, self._bucket.rate * 1.25)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'rate_per_sec': round(self._bucket.rate, 4),
+                'configured_rate_per_sec': self.base_rate,
+                'burst': self._bucket.burst,
+                'max_in_flight': self.max_in_flight,
+                'in_flight': self._in_flight,
+                'calls': self._calls,
+                'throttled': self._throttled,
+                'wait_seconds': round(self._wait_seconds, 3),
+                'work_seconds': round(self._work_seconds, 3),
+            }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limit_from_env(provider: str):
+    rate, burst, in_flight = DEFAULT_LIMITS.get(provider, (1.0, 1, 1))
+    prefix = provider.upper()
+    rate = float(os.getenv(f"{prefix}_RATE_PER_SEC", rate))
+    burst = int(os.getenv(f"{prefix}_BURST", burst))
+    in_flight = int(os.getenv(f"{prefix}_MAX_IN_FLIGHT", in_flight))
+    return rate, burst, in_flight
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Get the process-wide limiter for a provider (groq, newsapi, stability)."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = ProviderLimiter(provider, *_limit_from_env(provider))
+            _limiters[provider] = limiter
+        return limiter
+
+
+def rate_limit_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every provider limiter created so far."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {name: limiter.metrics() for name, limiter in limiters.items()}
@@ -0,0 +1,70 @@
+"""
+Pre-rendered JSON response bodies.
+
+A RenderedBody holds the encoded JSON once, a strong ETag derived from it and
+lazily built gzip / brotli variants, so hot read endpoints can answer from
+bytes instead of re-encoding on every request.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+
+def encode_json(payload: Any) -> bytes:
+    """Encode like Flask's jsonify (sorted keys, ASCII), but compact."""
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class RenderedBody:
+    """Encoded JSON body with its ETag and pre-compressed variants."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> 'RenderedBody':
+        return cls(encode_json(payload))
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return ()
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def variant(self, encoding: Optional[str]) -> bytes:
+        """Body for a content coding ('br', 'gzip' or None), compressed once."""
+        if not encoding:
+            return self.body
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    if encoding == 'br':
+                        data = brotli.compress(self.body)
+                    else:
+                        data = gzip.compress(self.body, compresslevel=6, mtime=0)
+                    self._variants[encoding] = data
+        return data
+
+    def variant_etag(self, encoding: Optional[str]) -> str:
+        # Each representation gets its own strong ETag
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def precompress(self):
+        for encoding in self.encodings:
+            self.variant(encoding)
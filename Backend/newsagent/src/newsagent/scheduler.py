@@ -0,0 +1,220 @@
+"""
+Freshness-driven scheduler for per-category newsletter refreshes.
+
+Instead of regenerating every category on a fixed timer, the scheduler tracks
+when each category was last refreshed and only runs the (expensive) refresh
+for categories whose content is older than max_age or whose upstream
+headlines have changed. Next-run times are jittered and at most
+max_per_tick refreshes run per tick, so they are spread out rather than
+bursting all at once. Categories that are cheaper to refresh together (one
+crew run covering several categories) can be handed over as one batch.
+"""
+
+import hashlib
+import logging
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def headlines_fingerprint(headlines: Iterable[Dict[str, Any]]) -> str:
+    """Order-independent hash of a set of headlines (URL + publication time)."""
+    parts = sorted(
+        f"{h.get('url') or ''}|{h.get('published_at') or h.get('publishedAt') or ''}"
+        for h in headlines
+    )
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+class CategoryState:
+    """Freshness bookkeeping for one category."""
+
+    def __init__(self, category: str):
+        self.category = category
+        self.last_run: Optional[datetime] = None
+        self.next_run: Optional[datetime] = None
+        self.last_checked: Optional[datetime] = None
+        self.fingerprint: Optional[str] = None
+        self.last_status: Optional[str] = None
+        self.runs = 0
+        self.skipped_checks = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'last_run': self.last_run.isoformat() if self.last_run else None,
+            'next_run': self.next_run.isoformat() if self.next_run else None,
+            'last_checked': self.last_checked.isoformat() if self.last_checked else None,
+            'last_status': self.last_status,
+            'runs': self.runs,
+            'unchanged_checks': self.skipped_checks,
+        }
+
+
+class FreshnessScheduler:
+    """
+    Refreshes categories when they go stale or their headlines change.
+
+    refresh(category) performs the refresh and returns True on success.
+    fingerprint(category), if given, returns a hash of the category's current
+    upstream headlines (or None if unavailable) and is polled every check_interval.
+    refresh_batch(categories), if given, refreshes the due categories listed in
+    batch together and returns {category: success}; a batch counts as one
+    refresh against max_per_tick.
+    """
+
+    def __init__(self, categories: Iterable[str], refresh: Callable[[str], bool],
+                 max_age: timedelta, fingerprint: Optional[Callable[[str], Optional[str]]] = None,
+                 check_interval: timedelta = timedelta(minutes=15),
+                 tick_seconds: float = 30, max_per_tick: int = 2, jitter: float = 0.1,
+                 can_run: Optional[Callable[[], bool]] = None,
+                 refresh_batch: Optional[Callable[[List[str]], Dict[str, bool]]] = None,
+                 batch: Iterable[str] = ()):
+        self.refresh = refresh
+        self.refresh_batch = refresh_batch
+        self.batch = set(batch) if refresh_batch is not None else set()
+        self.fingerprint = fingerprint
+        self.max_age = max_age
+        self.check_interval = check_interval
+        self.tick_seconds = tick_seconds
+        self.max_per_tick = max(1, max_per_tick)
+        self.jitter = jitter
+        self.can_run = can_run
+        self.states = {category: CategoryState(category) for category in categories}
+        self.last_tick: Optional[datetime] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _schedule_next(self, state: CategoryState, now: datetime):
+        spread = self.max_age.total_seconds() * self.jitter
+        state.next_run = now + self.max_age + timedelta(seconds=random.uniform(0, spread))
+
+    def mark_fresh(self, category: str, when: datetime):
+        """Record an externally produced refresh (e.g. content loaded from disk)."""
+        with self._lock:
+            state = self.states.get(category)
+            if state is not None:
+                state.last_run = when
+                self._schedule_next(state, when)
+
+    def _headlines_changed(self, state: CategoryState, now: datetime) -> bool:
+        if self.fingerprint is None or state.fingerprint is None:
+            return False
+        if state.last_checked and now - state.last_checked < self.check_interval:
+            return False
+        state.last_checked = now
+        try:
+            current = self.fingerprint(state.category)
+        except Exception as e:
+            logger.warning(f"Headline check failed for {state.category}: {e}")
+            return False
+        if current is None or current == state.fingerprint:
+            state.skipped_checks += 1
+            return False
+        return True
+
+    def due(self, now: Optional[datetime] = None) -> List[str]:
+        """Categories that need a refresh, most overdue first."""
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            for state in self.states.values():
+                if state.next_run is None or now >= state.next_run:
+                    due.append((state.next_run or datetime.min, state.category))
+                elif self._headlines_changed(state, now):
+                    due.append((now, state.category))
+        return [category for _, category in sorted(due)]
+
+    def _units(self, due: List[str]) -> List[List[str]]:
+        """Due categories grouped into refreshes: the batchable ones together, the rest alone."""
+        batched = [category for category in due if category in self.batch]
+        units = []
+        for category in due:
+            if category not in self.batch:
+                units.append([category])
+            elif category == batched[0]:
+                # The batch takes the place of its most overdue category
+                units.append(batched)
+        return units
+
+    def _run(self, unit: List[str]) -> Dict[str, bool]:
+        try:
+            if unit[0] in self.batch:
+                return self.refresh_batch(unit)
+            return {unit[0]: self.refresh(unit[0])}
+        except Exception as e:
+            logger.error(f"Scheduled refresh failed for {', '.join(unit)}: {e}")
+            return {}
+
+    def _record(self, category: str, ok: bool):
+        finished = datetime.now()
+        with self._lock:
+            state = self.states[category]
+            state.last_status = 'success' if ok else 'failed'
+            if ok:
+                state.runs += 1
+                state.last_run = finished
+                self._schedule_next(state, finished)
+            else:
+                # Retry failures after a short, jittered delay instead of every tick
+                state.next_run = finished + timedelta(seconds=self.tick_seconds * random.uniform(2, 4))
+        if ok and self.fingerprint is not None:
+            try:
+                fingerprint = self.fingerprint(category)
+            except Exception:
+                fingerprint = None
+            with self._lock:
+                state.fingerprint = fingerprint
+                state.last_checked = finished
+
+    def tick(self, now: Optional[datetime] = None) -> List[str]:
+        """Run up to max_per_tick refreshes of due categories. Returns the categories refreshed."""
+        now = now or datetime.now()
+        self.last_tick = now
+        if self.can_run is not None and not self.can_run():
+            return []
+        refreshed = []
+        for unit in self._units(self.due(now))[:self.max_per_tick]:
+            results = self._run(unit)
+            for category in unit:
+                ok = bool(results.get(category))
+                self._record(category, ok)
+                if ok:
+                    refreshed.append(category)
+        return refreshed
+
+    def start(self) -> threading.Thread:
+        """Run ticks in a daemon thread until stop() is called."""
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.tick()
+                except Exception as e:
+                    logger.error(f"Scheduler error: {e}")
+                self._stop.wait(self.tick_seconds)
+
+        self._thread = threading.Thread(target=loop, name='freshness-scheduler', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            categories = {category: state.to_dict() for category, state in self.states.items()}
+            next_runs = [state.next_run for state in self.states.values() if state.next_run]
+        return {
+            'running': self.running,
+            'max_age_hours': self.max_age.total_seconds() / 3600,
+            'last_tick': self.last_tick.isoformat() if self.last_tick else None,
+            'next_run': min(next_runs).isoformat() if next_runs else None,
+            'categories': categories,
+        }
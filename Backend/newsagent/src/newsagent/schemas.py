@@ -0,0 +1,107 @@
+"""
+Typed results passed between the newsagent tools, the crew and the API.
+
+Tools return these models serialised as JSON, the writer task produces a
+Newsletter via output_pydantic, and app.py consumes the objects directly.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class NewsArticle(BaseModel):
+    """A headline as fetched from NewsAPI."""
+    title: str = ''
+    url: str = ''
+    description: Optional[str] = ''
+    published_at: str = ''
+    source: str = ''
+    author: Optional[str] = ''
+    image_url: Optional[str] = ''
+
+
+class NewsScraperResult(BaseModel):
+    """Output of the NewsScraper tool."""
+    status: str = 'success'
+    source: str = 'newsapi'
+    category: str
+    count: int
+    articles: List[NewsArticle]
+
+
+class ImageResult(BaseModel):
+    """Output of the ImageGenerator tool."""
+    status: str
+    image_url: str
+    alt_text: str
+    caption: str
+    prompt_used: str
+    style: str
+    dimensions: str
+    article_title: str
+    generation_note: str
+    image_id: Optional[str] = None
+    filename: Optional[str] = None
+
+
+class NewsletterArticle(BaseModel):
+    """One article written by the writer agent."""
+    title: str = Field(..., description="Engaging article headline")
+    summary: str = Field(default='', description="One or two sentence summary")
+    content: str = Field(default='', description="Article body, 150-300 words")
+    category: str = Field(default='', description="News category the story belongs to")
+    source: str = Field(default='', description="Original source of the story")
+    url: str = Field(default='', description="Link to the original story")
+    published_at: str = Field(default='', description="Publication time of the original story")
+    image_prompt: str = Field(default='', description="Description of a fitting illustration")
+    ai_image: Optional[ImageResult] = None
+
+
+class Newsletter(BaseModel):
+    """Structured output of the writing task."""
+    edition_date: str = Field(default='', description="Date of this newsletter edition")
+    articles: List[NewsletterArticle] = Field(default_factory=list)
+    summary: str = Field(default='', description="Key takeaways across all articles")
+
+
+def parse_newsletter(output: Any) -> Newsletter:
+    """
+    Get the Newsletter from a crew kickoff result.
+    Uses the task's pydantic output when present, otherwise validates the raw
+    JSON strictly against the schema (raises pydantic.ValidationError).
+    """
+    if isinstance(output, Newsletter):
+        return output
+    structured = getattr(output, 'pydantic', None)
+    if isinstance(structured, Newsletter):
+        return structured
+    raw = getattr(output, 'raw', output)
+    return Newsletter.model_validate_json(raw)
+
+
+def articles_by_category(newsletter: Newsletter, categories: Iterable[str],
+                         headlines: Optional[Iterable[Dict[str, Any]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split a multi-category Newsletter back into per-category article dicts.
+    Articles are matched on their category field, falling back to the category
+    of the headline with the same URL; articles matching neither are dropped
+    (unless there is only one category, which then gets every article).
+    """
+    grouped: Dict[str, List[Dict[str, Any]]] = {category: [] for category in categories}
+    if len(grouped) == 1:
+        category = next(iter(grouped))
+        grouped[category] = [dict(a.model_dump(), category=category) for a in newsletter.articles]
+        return grouped
+    by_name = {category.strip().lower(): category for category in grouped}
+    by_url = {
+        (h.get('url') or '').strip().rstrip('/').lower(): h.get('category')
+        for h in headlines or [] if h.get('url')
+    }
+    for article in newsletter.articles:
+        category = by_name.get(article.category.strip().lower())
+        if category is None:
+            category = by_url.get(article.url.strip().rstrip('/').lower())
+        if category in grouped:
+            grouped[category].append(dict(article.model_dump(), category=category))
+    return grouped
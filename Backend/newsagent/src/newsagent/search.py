@@ -0,0 +1,228 @@
+"""
+In-process full-text search over published articles.
+
+An inverted index (term -> {document: term frequency}) over each article's
+title, description, summary and generated body, ranked with BM25 (title terms
+count double). The index subscribes to the ArticleStore and is updated
+incrementally on every publish: only new or changed articles are (re)indexed,
+and articles that drop out of the live snapshot stay searchable, up to
+SEARCH_MAX_DOCUMENTS (oldest evicted first).
+
+Queries score rare terms first and skip documents that can no longer reach
+the requested page (MaxScore pruning).
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .article_store import Article, Snapshot, article_key
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MAX_DOCUMENTS = int(os.getenv('SEARCH_MAX_DOCUMENTS', 100000))
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+TITLE_BOOST = 2
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be but by for from has have he her his in is it its of on or she that the their '
+    'they this to was were will with'.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in _TOKEN.findall((text or '').lower()) if token not in STOPWORDS]
+
+
+class _Document:
+    __slots__ = ('key', 'article', 'category', 'length', 'terms', 'fingerprint')
+
+    def __init__(self, key: str, article: Article, terms: Counter, fingerprint: str):
+        self.key = key
+        self.article = article
+        self.category = (article.get('category') or '').lower()
+        self.length = sum(terms.values())
+        self.terms = terms
+        self.fingerprint = fingerprint
+
+
+class SearchIndex:
+    """BM25 inverted index with incremental updates; safe to query while publishing."""
+
+    def __init__(self, max_documents: int = SEARCH_MAX_DOCUMENTS):
+        self.max_documents = max_documents
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._documents: Dict[int, _Document] = {}
+        self._ids: 'OrderedDict[str, int]' = OrderedDict()
+        # Per-document lengths for the scoring loop and document ids per category
+        self._lengths: Dict[int, int] = {}
+        self._by_category: Dict[str, set] = {}
+        self._next_id = 0
+        self._total_length = 0
+        self._lock = threading.Lock()
+        self.indexed = 0
+        self.skipped = 0
+        self.queries = 0
+
+    @staticmethod
+    def _terms(article: Article) -> Tuple[Counter, str]:
+        title = article.get('title') or ''
+        body = ' '.join(article.get(field) or '' for field in ('description', 'summary', 'content'))
+        terms = Counter(tokenize(body))
+        for token in tokenize(title):
+            terms[token] += TITLE_BOOST
+        fingerprint = hashlib.sha1(
+            f"{article.get('category') or ''}\0{title}\0{body}".encode('utf-8')
+        ).hexdigest()
+        return terms, fingerprint
+
+    def _remove(self, doc_id: int):
+        document = self._documents.pop(doc_id)
+        for term in document.terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= document.length
+        del self._ids[document.key]
+        del self._lengths[doc_id]
+        self._by_category[document.category].discard(doc_id)
+
+    def add(self, article: Article) -> bool:
+        """Index (or re-index) one article. Returns False if it was already indexed unchanged."""
+        key = article_key(article)
+        terms, fingerprint = self._terms(article)
+        with self._lock:
+            doc_id = self._ids.get(key)
+            if doc_id is not None:
+                document = self._documents[doc_id]
+                if document.fingerprint == fingerprint:
+                    # Same text; keep the latest copy (e.g. a new image) for results
+                    document.article = dict(article)
+                    self.skipped += 1
+                    return False
+                self._remove(doc_id)
+
+            doc_id = self._next_id
+            self._next_id += 1
+            document = _Document(key, dict(article), terms, fingerprint)
+            self._documents[doc_id] = document
+            self._ids[key] = doc_id
+            self._lengths[doc_id] = document.length
+            self._by_category.setdefault(document.category, set()).add(doc_id)
+            self._total_length += document.length
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            while len(self._ids) > self.max_documents:
+                self._remove(next(iter(self._ids.values())))
+            self.indexed += 1
+            return True
+
+    def index_snapshot(self, snapshot: Snapshot):
+        """ArticleStore listener: index the new or changed articles of a published snapshot."""
+        started = time.perf_counter()
+        added = sum(1 for article in snapshot.articles if self.add(article))
+        if added:
+            logger.info(f"Search index: {added} article(s) indexed in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 20,
+               offset: int = 0) -> Tuple[int, List[Tuple[float, Article]]]:
+        """BM25-ranked matches for any query term: (total matches, [(score, article)] for the page)."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        category = category.lower() if category else None
+        with self._lock:
+            self.queries += 1
+            count = len(self._documents)
+            in_category = self._by_category.get(category, set()) if category else None
+            # Rare (high-idf) terms first, so common terms can mostly be pruned
+            lists = [self._postings[term] for term in terms if term in self._postings]
+            if not lists or not count:
+                return 0, []
+            lists.sort(key=len)
+            weights = [math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)) * (K1 + 1)
+                       for postings in lists]
+            # BM25 length normalisation: K1 * (1 - B + B * length / average_length)
+            norm_base = K1 * (1 - B)
+            norm_scale = K1 * B * count / self._total_length
+            lengths = self._lengths
+            wanted = offset + limit
+
+            if len(lists) == 1 and in_category is None:
+                # One term, no filter: nothing to accumulate, rank the posting list directly
+                (postings,), (weight,) = lists, weights
+                top = heapq.nlargest(wanted, (
+                    (weight * frequency / (frequency + norm_base + norm_scale * lengths[doc_id]), doc_id)
+                    for doc_id, frequency in postings.items()
+                ))[offset:]
+                return len(postings), [(round(score, 4), self._documents[doc_id].article) for score, doc_id in top]
+
+            scores: Dict[int, float] = {}
+            get = scores.get
+            pruned = False
+
+            for position, (postings, weight) in enumerate(zip(lists, weights)):
+                # A term adds less than its weight to any document. Once the page's
+                # lowest score beats what this and the remaining terms could add,
+                # documents not seen yet can't make the page: only rescore candidates.
+                if len(scores) >= wanted:
+                    threshold = heapq.nlargest(wanted, scores.values())[-1]
+                    if threshold > sum(weights[position:]):
+                        pruned = True
+                        for doc_id in scores:
+                            frequency = postings.get(doc_id)
+                            if frequency:
+                                scores[doc_id] += weight * frequency / (
+                                    frequency + norm_base + norm_scale * lengths[doc_id])
+                        continue
+                if in_category is not None and len(in_category) < len(postings):
+                    matches = ((doc_id, postings[doc_id]) for doc_id in in_category if doc_id in postings)
+                elif in_category is not None:
+                    matches = ((doc_id, frequency) for doc_id, frequency in postings.items() if doc_id in in_category)
+                else:
+                    matches = postings.items()
+                for doc_id, frequency in matches:
+                    scores[doc_id] = get(doc_id, 0.0) + weight * frequency / (
+                        frequency + norm_base + norm_scale * lengths[doc_id])
+
+            if pruned:
+                matched = set().union(*lists)
+                total = len(matched & in_category if in_category is not None else matched)
+            else:
+                total = len(scores)
+            # Ties go to the most recently indexed article
+            top = heapq.nlargest(wanted, scores.items(), key=lambda item: (item[1], item[0]))[offset:]
+            return total, [(round(score, 4), self._documents[doc_id].article) for doc_id, score in top]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'documents': len(self._documents),
+                'terms': len(self._postings),
+                'indexed': self.indexed,
+                'unchanged_skipped': self.skipped,
+                'queries': self.queries,
+            }
+
+
+_index: Optional[SearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Process-wide search index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SearchIndex()
+        return _index
@@ -0,0 +1,136 @@
+"""
+Request coalescing (single-flight) with a short-lived result cache.
+
+Concurrent calls for the same key share one execution of the loader: the
+first caller runs it, the others wait for its result (or exception). Results
+are then kept for ttl_seconds so calls arriving just afterwards are served
+without running the loader again. ado() does the same for coroutines; it
+shares the result cache with do() but coalesces only with other async callers.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Call:
+    """One in-flight loader execution that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces concurrent loads per key and caches successful results for ttl_seconds."""
+
+    def __init__(self, ttl_seconds: float = 0.0):
+        self.ttl_seconds = ttl_seconds
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, 'asyncio.Future[Any]'] = {}
+        self._results: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+
+    def _cached(self, key: Hashable, now: float):
+        entry = self._results.get(key)
+        if entry is not None and now - entry[1] < self.ttl_seconds:
+            return entry
+        return None
+
+    def do(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return loader()'s result for key, sharing it with concurrent and recent callers."""
+        with self._lock:
+            entry = self._cached(key, time.monotonic())
+            if entry is not None:
+                self.cache_hits += 1
+                return entry[0]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.loads += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = loader()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None:
+                    self._remember(key, call.result)
+            call.done.set()
+        return call.result
+
+    async def ado(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Async do(): awaits loader() once for all concurrent async callers of key."""
+        with self._lock:
+            entry = self._cached(key, time.monotonic())
+            if entry is not None:
+                self.cache_hits += 1
+                return entry[0]
+            future = self._async_calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+                self.loads += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            with self._lock:
+                self._remember(key, result)
+        finally:
+            with self._lock:
+                del self._async_calls[key]
+        return result
+
+    def _remember(self, key: Hashable, result: Any):
+        # Callers hold self._lock
+        if self.ttl_seconds > 0:
+            now = time.monotonic()
+            self._results = {k: v for k, v in self._results.items() if now - v[1] < self.ttl_seconds}
+            self._results[key] = (result, now)
+
+    def forget(self, key: Hashable):
+        """Drop a cached result so the next call reloads it."""
+        with self._lock:
+            self._results.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'loads': self.loads,
+                'coalesced': self.coalesced,
+                'cache_hits': self.cache_hits,
+                'in_flight': len(self._calls) + len(self._async_calls),
+                'cached': len(self._results),
+            }
@@ -0,0 +1,324 @@
+"""
+Batched, cached LLM service behind the /summarize and /explain endpoints.
+
+Texts are split into chunks of about SUMMARY_CHUNK_CHARS (at paragraph, then
+sentence boundaries), and each chunk is one request keyed by a hash of its
+content and the task:
+
+- cached: results live in a memory LRU in front of the completion cache's
+  SQLite tier, so the same article summarized by many readers (or after a
+  restart) costs one LLM call;
+- coalesced: a request for a key that is already queued or running waits for
+  that result instead of being sent again;
+- micro-batched: requests arriving within SUMMARY_BATCH_WINDOW_MS are sent
+  together as one numbered prompt (up to SUMMARY_BATCH_MAX_ITEMS texts and
+  SUMMARY_BATCH_MAX_CHARS characters) that asks for a JSON list of results.
+  Items missing from a malformed reply are retried one by one.
+
+Chunk results are returned in order as they complete, so long inputs can be
+streamed to the client chunk by chunk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .llm_cache import CompletionCache, MemoryCompletionCache, TieredCompletionCache, get_completion_cache
+from .ratelimit import get_limiter
+from .workers import GenerationPool
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_BATCH_WINDOW_MS = float(os.getenv('SUMMARY_BATCH_WINDOW_MS', 30))
+SUMMARY_BATCH_MAX_ITEMS = int(os.getenv('SUMMARY_BATCH_MAX_ITEMS', 8))
+SUMMARY_BATCH_MAX_CHARS = int(os.getenv('SUMMARY_BATCH_MAX_CHARS', 16000))
+SUMMARY_CHUNK_CHARS = int(os.getenv('SUMMARY_CHUNK_CHARS', 4000))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', 2048))
+SUMMARY_TIMEOUT_SECONDS = float(os.getenv('SUMMARY_TIMEOUT_SECONDS', 120))
+
+# Bump when the instructions change so old cached results are not reused
+PROMPT_VERSION = 1
+
+INSTRUCTIONS = {
+    'summarize': 'Summarize the text in 2-3 clear sentences for a newsletter reader.',
+    'explain': (
+        'Explain the text in plain language for a general reader in one short paragraph, '
+        'defining any jargon, names or background the reader may not know.'
+    ),
+}
+
+_PARAGRAPH = re.compile(r'\n\s*\n')
+_SENTENCE = re.compile(r'(?<=[.!?])\s+')
+
+
+def chunk_text(text: str, max_chars: int = SUMMARY_CHUNK_CHARS) -> List[str]:
+    """Split text into chunks of at most max_chars, at paragraph, then sentence, then word boundaries."""
+    pieces = []
+    for paragraph in _PARAGRAPH.split(text.strip()):
+        paragraph = ' '.join(paragraph.split())
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in _SENTENCE.split(paragraph):
+            while len(sentence) > max_chars:
+                cut = sentence.rfind(' ', 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            pieces.append(sentence)
+
+    chunks: List[str] = []
+    for piece in filter(None, pieces):
+        if chunks and len(chunks[-1]) + 2 + len(piece) <= max_chars:
+            chunks[-1] += '\n\n' + piece
+        else:
+            chunks.append(piece)
+    return chunks
+
+
+def content_key(task: str, text: str) -> str:
+    """Cache key for one chunk: the task, prompt version and whitespace-normalised text."""
+    normalised = ' '.join(text.split())
+    return hashlib.sha256(f'text:{PROMPT_VERSION}\0{task}\0{normalised}'.encode('utf-8')).hexdigest()
+
+
+def single_prompt(task: str, text: str) -> str:
+    return f"{INSTRUCTIONS[task]}\nRespond with only the result.\n\nText:\n{text}"
+
+
+def batch_prompt(task: str, texts: List[str]) -> str:
+    numbered = '\n\n'.join(f'[{number}]\n{text}' for number, text in enumerate(texts, 1))
+    return (
+        f"{INSTRUCTIONS[task]}\n"
+        f"Do this separately for each of the {len(texts)} numbered texts below. "
+        'Respond with only a JSON object of the form {"results": [{"id": 1, "output": "..."}]}, '
+        'one entry per text.\n\n'
+        f"{numbered}"
+    )
+
+
+def parse_batch(response: str, count: int) -> List[Optional[str]]:
+    """Outputs by position from a batch reply; None for items the reply is missing."""
+    outputs: List[Optional[str]] = [None] * count
+    start, end = response.find('{'), response.rfind('}')
+    if start < 0 or end < start:
+        return outputs
+    try:
+        results = json.loads(response[start:end + 1]).get('results') or []
+    except (ValueError, AttributeError):
+        return outputs
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        number, output = result.get('id'), result.get('output')
+        if isinstance(number, int) and 1 <= number <= count and isinstance(output, str) and output.strip():
+            outputs[number - 1] = output.strip()
+    return outputs
+
+
+def _groq_complete(prompt: str) -> str:
+    # Imported here: the crew module imports the tools, which import this module
+    from .crew import get_groq_llm
+    return get_groq_llm().call([{'role': 'user', 'content': prompt}])
+
+
+class _Request:
+    __slots__ = ('key', 'task', 'text', 'future')
+
+    def __init__(self, key: str, task: str, text: str):
+        self.key = key
+        self.task = task
+        self.text = text
+        self.future: Future = Future()
+
+
+class TextService:
+    """Micro-batching, caching front end for summarize/explain LLM calls."""
+
+    def __init__(self, complete: Optional[Callable[[str], str]] = None, cache: Optional[CompletionCache] = None,
+                 window_ms: float = SUMMARY_BATCH_WINDOW_MS, max_items: int = SUMMARY_BATCH_MAX_ITEMS,
+                 max_chars: int = SUMMARY_BATCH_MAX_CHARS, chunk_chars: int = SUMMARY_CHUNK_CHARS,
+                 workers: Optional[int] = None):
+        self.complete = complete or _groq_complete
+        self.cache = cache
+        self.window_seconds = window_ms / 1000
+        self.max_items = max(1, max_items)
+        self.max_chars = max_chars
+        self.chunk_chars = chunk_chars
+        # Batches run concurrently up to the provider's in-flight limit
+        self._pool = GenerationPool(max_workers=workers or get_limiter('groq').max_in_flight)
+        self._queue: List[_Request] = []
+        self._pending: Dict[str, _Request] = {}
+        self._changed = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self.requests = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.batched_items = 0
+        self.llm_calls = 0
+        self.fallbacks = 0
+        self.timeouts = 0
+
+    def submit(self, task: str, text: str) -> Future:
+        """Future for one chunk's result (served from cache or a pending request when possible)."""
+        if task not in INSTRUCTIONS:
+            raise ValueError(f'Unknown text task: {task}')
+        key = content_key(task, text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        with self._changed:
+            self.requests += 1
+            if cached is not None:
+                self.cache_hits += 1
+                future: Future = Future()
+                future.set_result(cached)
+                return future
+            pending = self._pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                return pending.future
+            request = self._pending[key] = _Request(key, task, text)
+            self._queue.append(request)
+            self._ensure_dispatcher()
+            self._changed.notify()
+        return request.future
+
+    def stream(self, task: str, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(chunk index, chunk count, result) for each chunk of text, in order as they complete."""
+        chunks = chunk_text(text, self.chunk_chars)
+        futures = [self.submit(task, chunk) for chunk in chunks]
+        for index, future in enumerate(futures):
+            try:
+                result = future.result(timeout=SUMMARY_TIMEOUT_SECONDS)
+            except FutureTimeout:
+                self._abandon([(content_key(task, chunk), f) for chunk, f in zip(chunks[index:], futures[index:])])
+                raise
+            yield index, len(futures), result
+
+    def run(self, task: str, text: str) -> str:
+        """The whole result: chunk results joined by blank lines."""
+        return '\n\n'.join(result for _, _, result in self.stream(task, text))
+
+    def _abandon(self, waiting: List[Tuple[str, Future]]):
+        # A stuck request must not capture later callers of the same key
+        with self._changed:
+            self.timeouts += 1
+            for key, future in waiting:
+                pending = self._pending.get(key)
+                if pending is not None and pending.future is future and not future.done():
+                    del self._pending[key]
+
+    # Dispatcher: collects a window of requests, then hands batches to the pool
+
+    def _ensure_dispatcher(self):
+        # Callers hold self._changed; started lazily so importing the module doesn't spawn threads
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(target=self._dispatch, name='text-batcher', daemon=True)
+            self._dispatcher.start()
+
+    def _dispatch(self):
+        while True:
+            with self._changed:
+                while not self._queue:
+                    self._changed.wait()
+                deadline = time.monotonic() + self.window_seconds
+                while len(self._queue) < self.max_items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._changed.wait(remaining)
+                queued, self._queue = self._queue, []
+            for batch in self._batches(queued):
+                self._pool.submit(lambda batch=batch: self._run_batch(batch))
+
+    def _batches(self, requests: List[_Request]) -> List[List[_Request]]:
+        by_task: Dict[str, List[List[_Request]]] = {}
+        for request in requests:
+            batches = by_task.setdefault(request.task, [[]])
+            batch = batches[-1]
+            if batch and (len(batch) >= self.max_items
+                          or sum(len(r.text) for r in batch) + len(request.text) > self.max_chars):
+                batch = []
+                batches.append(batch)
+            batch.append(request)
+        return [batch for batches in by_task.values() for batch in batches]
+
+    def _call(self, prompt: str) -> str:
+        with self._changed:
+            self.llm_calls += 1
+        return (self.complete(prompt) or '').strip()
+
+    def _run_batch(self, batch: List[_Request]):
+        task = batch[0].task
+        error: Optional[Exception] = None
+        try:
+            if len(batch) == 1:
+                outputs = [self._call(single_prompt(task, batch[0].text))]
+            else:
+                outputs = parse_batch(self._call(batch_prompt(task, [r.text for r in batch])), len(batch))
+                for position, output in enumerate(outputs):
+                    if output is None:
+                        with self._changed:
+                            self.fallbacks += 1
+                        outputs[position] = self._call(single_prompt(task, batch[position].text))
+            for request, output in zip(batch, outputs):
+                if self.cache is not None and output:
+                    try:
+                        self.cache.put(request.key, output)
+                    except Exception as e:
+                        logger.warning(f"Caching text {task} result failed: {e}")
+                request.future.set_result(output)
+        except Exception as e:
+            logger.error(f"Text {task} batch of {len(batch)} failed: {e}")
+            error = e
+        finally:
+            self._finish(batch, error)
+
+    def _finish(self, batch: List[_Request], error: Optional[Exception] = None):
+        with self._changed:
+            self.batches += 1
+            self.batched_items += len(batch)
+            for request in batch:
+                if self._pending.get(request.key) is request:
+                    del self._pending[request.key]
+        # Every future is resolved, whatever stopped the batch part way
+        for request in batch:
+            if not request.future.done():
+                request.future.set_exception(error or RuntimeError(f'Text {request.task} batch did not complete'))
+
+    def stats(self) -> Dict[str, object]:
+        with self._changed:
+            return {
+                'requests': self.requests,
+                'cache_hits': self.cache_hits,
+                'coalesced': self.coalesced,
+                'batches': self.batches,
+                'avg_batch_size': round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                'llm_calls': self.llm_calls,
+                'fallbacks': self.fallbacks,
+                'timeouts': self.timeouts,
+                'queued': len(self._queue),
+            }
+
+
+_service: Optional[TextService] = None
+_service_lock = threading.Lock()
+
+
+def get_text_service() -> TextService:
+    """Process-wide text service, caching in memory and in the completion cache's SQLite tier."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            shared = get_completion_cache()
+            _service = TextService(cache=TieredCompletionCache(
+                memory=MemoryCompletionCache(max_entries=SUMMARY_CACHE_MAX_ENTRIES),
+                persistent=getattr(shared, 'persistent', None)
+            ))
+        return _service
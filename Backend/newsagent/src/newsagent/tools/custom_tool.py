@@ -1,18 +1,31 @@
 from crewai.tools import BaseTool
-from typing import Type, List, Dict, Any
+from typing import Type, List, Dict, Any, ClassVar, Iterator, Optional, Tuple
 from pydantic import BaseModel, Field
 import requests
+import asyncio
 import logging
 import os
 import base64
-from datetime import datetime
 from dotenv import load_dotenv
 
+from .. import async_transport, transport
+from ..image_cache import get_image_cache, image_key, image_url
+from ..news_source import CATEGORIES as NEWS_CATEGORIES, get_news_source
+from ..ranking import rank_stories
+from ..ratelimit import get_limiter
+from ..schemas import ImageResult, NewsArticle, NewsScraperResult
+from ..summarizer import get_text_service
+
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Read timeout for SDXL generation requests (seconds)
+STABILITY_TIMEOUT = float(os.getenv('STABILITY_TIMEOUT', 120))
+STABILITY_MODEL = "stable-diffusion-xl-1024-v1-0"
+IMAGE_DIMENSIONS = "1344x768"
+
 class NewsScraperInput(BaseModel):
     """Input schema for NewsScraper."""
     category: str = Field(default="general", description="News category for NewsAPI (general, business, entertainment, health, science, sports, technology)")
@@ -26,49 +39,31 @@ class NewsScraper(BaseTool):
     )
     args_schema: Type[BaseModel] = NewsScraperInput
 
+    def fetch(self, category: str = "general", limit: int = 10) -> NewsScraperResult:
+        """Fetch headlines for a category (raises on network or API errors)"""
+        # In-process client: concurrent identical requests share one NewsAPI call
+        return self._result(category, get_news_source().top_headlines(category, limit))
+
+    @staticmethod
+    def _result(category: str, articles: List[Dict[str, Any]]) -> NewsScraperResult:
+        formatted_articles = [NewsArticle(**article) for article in articles]
+        
+        return NewsScraperResult(
+            category=category,
+            count=len(formatted_articles),
+            articles=formatted_articles
+        )
+
     def _run(self, category: str = "general", limit: int = 10) -> str:
         try:
-            base_url = "http://localhost:5000/api"
-            url = f"{base_url}/newsapi"
-            params = {"category": category, "limit": limit}
-            
-            response = requests.get(url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get('status') == 'success':
-                articles = data.get('data', [])
-                
-                # Format the response for the agent
-                formatted_articles = []
-                for article in articles:
-                    formatted_article = {
-                        'title': article.get('title', ''),
-                        'url': article.get('url', ''),
-                        'description': article.get('description', ''),
-                        'published_at': article.get('published_at', ''),
-                        'source': article.get('source', ''),
-                        'author': article.get('author', ''),
-                        'image_url': article.get('image_url', '')
-                    }
-                    formatted_articles.append(formatted_article)
-                
-                result = {
-                    'status': 'success',
-                    'source': 'newsapi',
-                    'category': category,
-                    'count': len(formatted_articles),
-                    'articles': formatted_articles
-                }
-                
-                return str(result)
-            else:
-                return f"Error from API: {data.get('message', 'Unknown error')}"
-                
+            # The agent gets the top-ranked stories as compact JSON, not everything fetched
+            result = self.fetch(category, limit)
+            return rank_stories([dict(article.model_dump(), category=category) for article in result.articles]).json
         except requests.exceptions.RequestException as e:
             logger.error(f"Network error fetching news: {e}")
-            return f"Network error: Make sure the Flask API is running on localhost:5000. Error: {str(e)}"
+            return f"Network error reaching NewsAPI: {str(e)}"
+        except ValueError as e:
+            return str(e)
         except Exception as e:
             logger.error(f"Error in news scraper: {e}")
             return f"Error fetching news: {str(e)}"
@@ -86,20 +81,8 @@ class CategoryFetcher(BaseTool):
     args_schema: Type[BaseModel] = CategoryFetcherInput
 
     def _run(self) -> str:
-        try:
-            url = "http://localhost:5000/api/categories"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data.get('status') == 'success':
-                categories = data.get('data', [])
-                return f"Available categories: {', '.join(categories)}"
-            else:
-                return f"Error: {data.get('message', 'Unknown error')}"
-                
-        except Exception as e:
-            return f"Error fetching categories: {str(e)}"
+        # NewsAPI's category list is fixed, so there is nothing to fetch
+        return f"Available categories: {', '.join(NEWS_CATEGORIES)}"
 
 class ImageGeneratorInput(BaseModel):
     """Input schema for ImageGenerator."""
@@ -115,93 +98,208 @@ class ImageGenerator(BaseTool):
     )
     args_schema: Type[BaseModel] = ImageGeneratorInput
 
+    @staticmethod
+    def _generated_result(image_id: str, prompt: str, article_title: str, style: str,
+                          enhanced_prompt: str, generation_note: str) -> ImageResult:
+        safe_title = "".join(c for c in article_title if c.isalnum() or c in (' ', '-', '_')).rstrip()[:30]
+        filename = f"ai_image_{safe_title}_{image_id[:12]}.png"
+        
+        # The PNG lives in the image store; payloads only carry its URL
+        return ImageResult(
+            status='generated',
+            image_id=image_id,
+            image_url=image_url(image_id),
+            alt_text=f"AI-generated professional illustration for: {prompt}",
+            caption=f"AI-generated visual representation of {article_title}",
+            prompt_used=enhanced_prompt,
+            style=style,
+            dimensions=IMAGE_DIMENSIONS,
+            article_title=article_title,
+            generation_note=generation_note,
+            filename=filename
+        )
+
+    @staticmethod
+    def _enhanced_prompt(prompt: str, article_title: str, style: str) -> str:
+        # Enhanced prompt for news-appropriate imagery
+        return f"Professional {style} news illustration for article: '{article_title}'. {prompt}. High quality, editorial style, suitable for newsletter publication, clean and modern design, photorealistic"
+
+    @staticmethod
+    def _stability_request(enhanced_prompt: str, stability_key: str) -> Dict[str, Any]:
+        """URL and arguments for a Stability AI text-to-image call"""
+        return {
+            'url': f"https://api.stability.ai/v1/generation/{STABILITY_MODEL}/text-to-image",
+            'headers': {
+                "Authorization": f"Bearer {stability_key}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            },
+            'json': {
+                "text_prompts": [
+                    {
+                        "text": enhanced_prompt,
+                        "weight": 1
+                    }
+                ],
+                "cfg_scale": 7,
+                "height": 768,
+                "width": 1344,
+                "steps": 30,
+                "samples": 1
+            },
+            'timeout': (transport.CONNECT_TIMEOUT, STABILITY_TIMEOUT),
+            'limiter': get_limiter('stability')
+        }
+
+    @staticmethod
+    def _image_bytes(response):
+        """Decoded PNG from a Stability AI response, or None if the call failed"""
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("artifacts") and len(data["artifacts"]) > 0:
+                # Get the base64 image data
+                return base64.b64decode(data["artifacts"][0]["base64"])
+        
+        # If API call failed, log the error and fall back to placeholder
+        logger.warning(f"Stability AI API call failed: {response.status_code} - {response.text}")
+        return None
+
+    @staticmethod
+    def _stability_key():
+        stability_key = os.getenv('STABILITY_API_KEY')
+        return stability_key if stability_key and stability_key.startswith('sk-') else None
+
+    @staticmethod
+    def _placeholder_result(prompt: str, article_title: str, style: str, enhanced_prompt: str) -> ImageResult:
+        # Fallback to placeholder image
+        safe_title = article_title.replace(' ', '+').replace(',', '').replace('.', '')[:50]
+        placeholder_url = f"https://via.placeholder.com/1344x768/1e40af/ffffff?text={safe_title}"
+        
+        return ImageResult(
+            status='placeholder',
+            image_url=placeholder_url,
+            alt_text=f"Professional illustration for: {prompt}",
+            caption=f"Visual representation of {article_title}",
+            prompt_used=enhanced_prompt,
+            style=style,
+            dimensions=IMAGE_DIMENSIONS,
+            article_title=article_title,
+            generation_note="Placeholder image - Stability AI integration ready"
+        )
+
+    def _cached_image(self, prompt: str, article_title: str, style: str) -> Tuple[str, str, Optional[ImageResult]]:
+        """(enhanced prompt, cache key, cached result or None) for an image request"""
+        enhanced_prompt = self._enhanced_prompt(prompt, article_title, style)
+        
+        # Serve repeat requests for the same image from the on-disk cache
+        cache_key = image_key(enhanced_prompt, style, IMAGE_DIMENSIONS, STABILITY_MODEL)
+        if get_image_cache().contains(cache_key):
+            logger.info(f"Image cache hit for article: {article_title}")
+            return enhanced_prompt, cache_key, self._generated_result(
+                cache_key, prompt, article_title, style,
+                enhanced_prompt, "Served from image cache (Stability AI SDXL)"
+            )
+        return enhanced_prompt, cache_key, None
+
+    def _stored_image_result(self, cache_key: str, prompt: str, article_title: str, style: str,
+                             enhanced_prompt: str) -> ImageResult:
+        """Result for an image just generated and stored under cache_key"""
+        logger.info(f"Successfully generated image for article: {article_title}")
+        return self._generated_result(
+            cache_key, prompt, article_title, style,
+            enhanced_prompt, "Generated using Stability AI SDXL"
+        )
+
+    def generate_image(self, prompt: str, article_title: str, style: str = "professional") -> ImageResult:
+        """Generate (or fetch from cache) an image for an article"""
+        enhanced_prompt, cache_key, cached = self._cached_image(prompt, article_title, style)
+        if cached is not None:
+            return cached
+        
+        # Check if Stability AI key is available
+        stability_key = self._stability_key()
+        
+        if stability_key:
+            try:
+                # Use Stability AI API
+                response = transport.post(**self._stability_request(enhanced_prompt, stability_key))
+                image_bytes = self._image_bytes(response)
+                if image_bytes is not None:
+                    get_image_cache().put(cache_key, image_bytes)
+                    return self._stored_image_result(cache_key, prompt, article_title, style, enhanced_prompt)
+            except Exception as api_error:
+                logger.error(f"Error calling Stability AI API: {api_error}")
+        
+        return self._placeholder_result(prompt, article_title, style, enhanced_prompt)
+
+    async def agenerate_image(self, prompt: str, article_title: str, style: str = "professional") -> ImageResult:
+        """generate_image() for asyncio callers: the Stability call doesn't hold a thread"""
+        enhanced_prompt, cache_key, cached = self._cached_image(prompt, article_title, style)
+        if cached is not None:
+            return cached
+        
+        stability_key = self._stability_key()
+        
+        if stability_key:
+            try:
+                request = self._stability_request(enhanced_prompt, stability_key)
+                response = await async_transport.apost(request.pop('url'), **request)
+                image_bytes = self._image_bytes(response)
+                if image_bytes is not None:
+                    await asyncio.to_thread(get_image_cache().put, cache_key, image_bytes)
+                    return self._stored_image_result(cache_key, prompt, article_title, style, enhanced_prompt)
+            except Exception as api_error:
+                logger.error(f"Error calling Stability AI API: {api_error}")
+        
+        return self._placeholder_result(prompt, article_title, style, enhanced_prompt)
+
     def _run(self, prompt: str, article_title: str, style: str = "professional") -> str:
         try:
-            # Enhanced prompt for news-appropriate imagery
-            enhanced_prompt = f"Professional {style} news illustration for article: '{article_title}'. {prompt}. High quality, editorial style, suitable for newsletter publication, clean and modern design, photorealistic"
-            
-            # Check if Stability AI key is available
-            stability_key = os.getenv('STABILITY_API_KEY')
-            
-            if stability_key and stability_key.startswith('sk-'):
-                try:
-                    # Use Stability AI API
-                    response = requests.post(
-                        "https://api.stability.ai/v1/generation/stable-diffusion-xl-1024-v1-0/text-to-image",
-                        headers={
-                            "Authorization": f"Bearer {stability_key}",
-                            "Content-Type": "application/json",
-                            "Accept": "application/json"
-                        },
-                        json={
-                            "text_prompts": [
-                                {
-                                    "text": enhanced_prompt,
-                                    "weight": 1
-                                }
-                            ],
-                            "cfg_scale": 7,
-                            "height": 768,
-                            "width": 1344,
-                            "steps": 30,
-                            "samples": 1
-                        }
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        if data.get("artifacts") and len(data["artifacts"]) > 0:
-                            # Get the base64 image data
-                            image_base64 = data["artifacts"][0]["base64"]
-                            
-                            # Save the image (optional - you could save to a local directory or cloud storage)
-                            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            safe_title = "".join(c for c in article_title if c.isalnum() or c in (' ', '-', '_')).rstrip()[:30]
-                            filename = f"ai_image_{safe_title}_{timestamp}.png"
-                            
-                            # For demo, we'll return the base64 data URL
-                            image_url = f"data:image/png;base64,{image_base64}"
-                            
-                            image_result = {
-                                'status': 'generated',
-                                'image_url': image_url,
-                                'alt_text': f"AI-generated professional illustration for: {prompt}",
-                                'caption': f"AI-generated visual representation of {article_title}",
-                                'prompt_used': enhanced_prompt,
-                                'style': style,
-                                'dimensions': "1344x768",
-                                'article_title': article_title,
-                                'generation_note': "Generated using Stability AI SDXL",
-                                'filename': filename
-                            }
-                            
-                            logger.info(f"Successfully generated image for article: {article_title}")
-                            return str(image_result)
-                    
-                    # If API call failed, log the error and fall back to placeholder
-                    logger.warning(f"Stability AI API call failed: {response.status_code} - {response.text}")
-                    
-                except Exception as api_error:
-                    logger.error(f"Error calling Stability AI API: {api_error}")
-            
-            # Fallback to placeholder image
-            safe_title = article_title.replace(' ', '+').replace(',', '').replace('.', '')[:50]
-            placeholder_url = f"https://via.placeholder.com/1344x768/1e40af/ffffff?text={safe_title}"
-            
-            image_result = {
-                'status': 'placeholder',
-                'image_url': placeholder_url,
-                'alt_text': f"Professional illustration for: {prompt}",
-                'caption': f"Visual representation of {article_title}",
-                'prompt_used': enhanced_prompt,
-                'style': style,
-                'dimensions': "1344x768",
-                'article_title': article_title,
-                'generation_note': "Placeholder image - Stability AI integration ready"
-            }
-            
-            return str(image_result)
-            
+            return self.generate_image(prompt, article_title, style).model_dump_json()
         except Exception as e:
             logger.error(f"Error in image generator: {e}")
             return f"Error generating image: {str(e)}"
+
+class TextInput(BaseModel):
+    """Input schema for TextSummarizer and TextExplainer."""
+    text: str = Field(..., description="Article or passage to work on")
+
+class _TextServiceTool(BaseTool):
+    """Tool backed by the shared batched, cached text service"""
+    task: ClassVar[str]
+    args_schema: Type[BaseModel] = TextInput
+
+    def stream(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """(chunk index, chunk count, result) for each chunk of a long text, in order"""
+        return get_text_service().stream(self.task, text)
+
+    def _run(self, text: str) -> str:
+        try:
+            return get_text_service().run(self.task, text)
+        except Exception as e:
+            logger.error(f"Error in {self.name.lower()}: {e}")
+            return f"Error running {self.name}: {str(e)}"
+
+class TextSummarizer(_TextServiceTool):
+    name: str = "Text Summarizer"
+    description: str = (
+        "Summarizes an article or passage in 2-3 sentences. "
+        "Long texts are summarized section by section."
+    )
+    task: ClassVar[str] = 'summarize'
+
+    def summarize(self, text: str) -> str:
+        """Summary of text (raises on LLM errors)"""
+        return get_text_service().run(self.task, text)
+
+class TextExplainer(_TextServiceTool):
+    name: str = "Text Explainer"
+    description: str = (
+        "Explains an article or passage in plain language, defining jargon and background. "
+        "Long texts are explained section by section."
+    )
+    task: ClassVar[str] = 'explain'
+
+    def explain(self, text: str) -> str:
+        """Plain-language explanation of text (raises on LLM errors)"""
+        return get_text_service().run(self.task, text)
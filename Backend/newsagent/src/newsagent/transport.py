@@ -0,0 +1,131 @@
+"""
+Shared HTTP transport for the newsagent tools.
+
+One pooled, keep-alive requests.Session per process, with configurable pool
+sizes and timeouts, and retries with jittered exponential backoff. Calls can
+be routed through a ProviderLimiter so 429s feed the adaptive rate limiter.
+
+Idempotent requests are retried on connection errors, timeouts and retryable
+statuses. A POST may already have run (and been billed) when it times out or
+gets a 5xx, so it is only resent when the connection was never made or the
+server answered 429.
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from .ratelimit import ProviderLimiter, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 10))
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 20))
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 3))
+BACKOFF_BASE = float(os.getenv('HTTP_BACKOFF_BASE', 0.5))
+BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 8))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Safe to send twice; other methods are only resent when the server can't have run them
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE'})
+
+Timeout = Union[float, Tuple[float, float]]
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Get the process-wide pooled session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            # Retries are handled in request() so they can honour Retry-After
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+        return _session
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given retry attempt."""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def retryable_status(method: str, status: int) -> bool:
+    """Whether a response status may be retried for this method."""
+    if method.upper() in IDEMPOTENT_METHODS:
+        return status in RETRY_STATUSES
+    return status == 429
+
+
+def _not_sent(error: requests.exceptions.RequestException) -> bool:
+    """True if the request failed before a connection was made."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def request(method: str, url: str, timeout: Optional[Timeout] = None,
+            retries: Optional[int] = None, limiter: Optional[ProviderLimiter] = None,
+            **kwargs) -> requests.Response:
+    """
+    Send a request over the shared session.
+    Connection errors, timeouts and retryable statuses are retried with jittered
+    backoff (non-idempotent methods only when nothing was sent, or on 429); the
+    last response (or exception) is returned (or raised).
+    """
+    session = get_session()
+    timeout = timeout if timeout is not None else (CONNECT_TIMEOUT, READ_TIMEOUT)
+    retries = MAX_RETRIES if retries is None else retries
+
+    for attempt in range(retries + 1):
+        try:
+            if limiter is not None:
+                with limiter.slot():
+                    response = session.request(method, url, timeout=timeout, **kwargs)
+            else:
+                response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries or (method.upper() not in IDEMPOTENT_METHODS and not _not_sent(e)):
+                raise
+            delay = backoff_delay(attempt)
+            logger.warning(f"{method} {url} failed ({e}); retrying in {delay:.2f}s")
+            time.sleep(delay)
+            continue
+
+        if response.status_code == 429 and limiter is not None:
+            limiter.report_throttle(response.headers.get('Retry-After'))
+        if retryable_status(method, response.status_code) and attempt < retries:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            # With a limiter the throttle above already pauses the next slot
+            delay = 0.0 if limiter is not None and response.status_code == 429 else (
+                retry_after if retry_after is not None else backoff_delay(attempt)
+            )
+            logger.warning(f"{method} {url} returned {response.status_code}; retrying in {delay:.2f}s")
+            response.close()
+            time.sleep(delay)
+            continue
+        if limiter is not None and response.ok:
+            limiter.report_success()
+        return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request('GET', url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request('POST', url, **kwargs)
@@ -0,0 +1,203 @@
+"""
+Bounded priority work queue for background generation.
+
+A fixed number of worker threads take items in priority order (on-demand
+newsletters before scheduled refreshes before premium batches, FIFO within a
+priority). The queue holds at most max_depth waiting items; submitting beyond
+that raises QueueFull with a Retry-After estimate so callers can push back
+(HTTP 429). Waiting items can be cancelled, and on shutdown the queue stops
+accepting work and drains what it already has.
+"""
+
+import atexit
+import heapq
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORK_QUEUE_WORKERS = int(os.getenv('WORK_QUEUE_WORKERS', 2))
+WORK_QUEUE_MAX_DEPTH = int(os.getenv('WORK_QUEUE_MAX_DEPTH', 20))
+WORK_QUEUE_DRAIN_SECONDS = float(os.getenv('WORK_QUEUE_DRAIN_SECONDS', 30))
+
+# Lower runs first
+PRIORITY_ON_DEMAND = 0
+PRIORITY_SCHEDULED = 1
+PRIORITY_BATCH = 2
+
+# Assumed run time before any item has finished (used for Retry-After)
+DEFAULT_RUN_SECONDS = 30.0
+
+
+class QueueFull(Exception):
+    """The queue is at max_depth (or draining); retry_after is a suggested wait in seconds."""
+
+    def __init__(self, retry_after: int, message: str = 'Work queue is full'):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class WorkItem:
+    """A queued call; cancel() succeeds only while it is still waiting."""
+
+    def __init__(self, func: Callable[[], Any], priority: int, name: str,
+                 on_cancel: Optional[Callable[[], None]] = None):
+        self.func = func
+        self.priority = priority
+        self.name = name
+        self.on_cancel = on_cancel
+        self.state = 'queued'
+        self.enqueued_at = time.monotonic()
+
+
+class WorkQueue:
+    """Fixed pool of workers consuming a bounded priority queue."""
+
+    def __init__(self, workers: int = WORK_QUEUE_WORKERS, max_depth: int = WORK_QUEUE_MAX_DEPTH):
+        self.workers = max(1, workers)
+        self.max_depth = max(1, max_depth)
+        self._heap: List[Tuple[int, int, WorkItem]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._accepting = True
+        self._running = 0
+        self._threads: List[threading.Thread] = []
+        self._avg_run_seconds: Optional[float] = None
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+
+    def _ensure_workers(self):
+        # Started lazily so importing the module doesn't spawn threads
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f'work-queue-{len(self._threads)}', daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    @property
+    def depth(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to free up."""
+        with self._cond:
+            average = self._avg_run_seconds or DEFAULT_RUN_SECONDS
+            return max(1, math.ceil(average * (len(self._heap) + 1) / self.workers))
+
+    def submit(self, func: Callable[[], Any], priority: int = PRIORITY_SCHEDULED, name: str = 'work',
+               on_cancel: Optional[Callable[[], None]] = None) -> WorkItem:
+        """Queue func; raises QueueFull when max_depth items are already waiting."""
+        with self._cond:
+            if not self._accepting:
+                self.rejected += 1
+                raise QueueFull(1, 'Work queue is shutting down')
+            if len(self._heap) >= self.max_depth:
+                self.rejected += 1
+                raise QueueFull(self.retry_after())
+            item = WorkItem(func, priority, name, on_cancel)
+            heapq.heappush(self._heap, (priority, next(self._order), item))
+            self._ensure_workers()
+            self._cond.notify()
+            return item
+
+    def cancel(self, item: WorkItem) -> bool:
+        """Remove a waiting item. Returns False if it already started or finished."""
+        with self._cond:
+            if item.state != 'queued':
+                return False
+            item.state = 'cancelled'
+            self._heap = [entry for entry in self._heap if entry[2] is not item]
+            heapq.heapify(self._heap)
+            self.cancelled += 1
+            self._cond.notify_all()
+        if item.on_cancel is not None:
+            item.on_cancel()
+        return True
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    if not self._accepting:
+                        return
+                    self._cond.wait()
+                _, _, item = heapq.heappop(self._heap)
+                item.state = 'running'
+                self._running += 1
+            started = time.monotonic()
+            try:
+                item.func()
+            except Exception as e:
+                logger.error(f"Work item {item.name} failed: {e}")
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    item.state = 'done'
+                    self._running -= 1
+                    self.completed += 1
+                    # Exponential moving average of run time, for Retry-After
+                    if self._avg_run_seconds is None:
+                        self._avg_run_seconds = elapsed
+                    else:
+                        self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * elapsed
+                    self._cond.notify_all()
+
+    def drain(self, timeout: float = WORK_QUEUE_DRAIN_SECONDS) -> bool:
+        """
+        Stop accepting work and wait for queued and running items to finish.
+        Items still waiting after timeout are cancelled. Returns True if fully drained.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._accepting = False
+            self._cond.notify_all()
+            while self._heap or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            leftover = [item for _, _, item in self._heap]
+            drained = not leftover and not self._running
+        for item in leftover:
+            self.cancel(item)
+        if not drained:
+            logger.warning(f"Work queue drain timed out; cancelled {len(leftover)} queued item(s)")
+        return drained
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            by_priority: Dict[int, int] = {}
+            for priority, _, _ in self._heap:
+                by_priority[priority] = by_priority.get(priority, 0) + 1
+            return {
+                'workers': self.workers,
+                'max_depth': self.max_depth,
+                'depth': len(self._heap),
+                'queued_by_priority': by_priority,
+                'running': self._running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'cancelled': self.cancelled,
+                'accepting': self._accepting,
+                'avg_run_seconds': round(self._avg_run_seconds, 3) if self._avg_run_seconds else None,
+            }
+
+
+_queue: Optional[WorkQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_work_queue() -> WorkQueue:
+    """Process-wide work queue; drained at interpreter exit."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WorkQueue()
+            atexit.register(_queue.drain)
+        return _queue
@@ -0,0 +1,47 @@
+"""
+Bounded worker pool for fanning out independent generation tasks.
+"""
+
+import contextvars
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = int(os.getenv('GENERATION_WORKERS', 4))
+
+
+class GenerationPool:
+    """Runs (key, func) pairs concurrently on a fixed-size thread pool."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or DEFAULT_WORKERS
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='generation'
+        )
+
+    def submit(self, func: Callable[[], Any]) -> Future:
+        """Start one task (in a copy of the caller's context) without waiting for it."""
+        return self._executor.submit(contextvars.copy_context().run, func)
+
+    def run(self, tasks: Iterable[Tuple[str, Callable[[], Any]]]) -> Dict[str, Any]:
+        """
+        Run every task and wait for all of them.
+        Returns {key: result} in submission order; failed tasks map to None.
+        """
+        # Each task runs in a copy of the caller's context (e.g. the current job)
+        futures = [(key, self.submit(func)) for key, func in tasks]
+        results = {}
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                logger.error(f"Generation task failed for {key}: {e}")
+                results[key] = None
+        return results
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,102 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+from newsagent.archive import ArticleArchive
+from newsagent.article_store import Snapshot
+from newsagent.image_cache import ImageCache
+
+KEY = 'ab' * 32
+
+
+def article(i, category='business', **extra):
+    return dict({'title': f'Story {i}', 'description': f'About {i}', 'category': category,
+                 'url': f'https://news.example/{i}'}, **extra)
+
+
+def make_images(tmp_path, **kwargs):
+    return ImageCache(str(tmp_path / 'images'), pinned_directory=str(tmp_path / 'pinned'), **kwargs)
+
+
+def test_archived_images_survive_cache_eviction(tmp_path):
+    images = make_images(tmp_path, max_age_seconds=60)
+    images.put(KEY, b'png')
+    archive = ArticleArchive(str(tmp_path / 'archive'), images=images)
+    archive.archive_snapshot(Snapshot((article(1, ai_image={'status': 'generated', 'image_id': KEY}),),
+                                      datetime(2026, 3, 1, 8), 1))
+
+    old = time.time() - 3600
+    os.utime(images.path(KEY), (old, old))
+    images.evict()
+    assert not os.path.exists(images.path(KEY))
+    assert images.get(KEY) == b'png'
+
+
+def test_pin_without_cached_image_is_a_no_op(tmp_path):
+    images = make_images(tmp_path)
+    assert images.pin(KEY) is False
+    assert images.lookup(KEY) is None
+
+
+def test_pinned_images_follow_archive_retention(tmp_path):
+    images = make_images(tmp_path)
+    images.put(KEY, b'png')
+    archive = ArticleArchive(str(tmp_path / 'archive'), retention_days=2, images=images)
+    archive.archive_snapshot(Snapshot((article(1, ai_image={'image_id': KEY}),), datetime(2026, 3, 1, 8), 1))
+    pinned_at = datetime(2026, 3, 1, 9).timestamp()
+    os.utime(images.pinned_path(KEY), (pinned_at, pinned_at))
+    os.remove(images.path(KEY))
+
+    archive.archive_snapshot(Snapshot((article(2),), datetime(2026, 3, 2, 8), 2))
+    assert images.lookup(KEY) is not None
+    archive.archive_snapshot(Snapshot((article(3),), datetime(2026, 3, 3, 8), 3))
+    assert images.lookup(KEY) is None
+    assert archive.stats()['oldest_day'] == '2026-03-02'
+
+
+def fill(archive, days, per_day, categories=('business', 'sports')):
+    for day in range(days):
+        articles = tuple(article(f'{day}-{i}', categories[i % len(categories)]) for i in range(per_day))
+        archive.archive_snapshot(Snapshot(articles, datetime(2026, 3, 1 + day, 8), day))
+
+
+def test_cursor_pages_walk_every_article_once_across_days(tmp_path):
+    archive = ArticleArchive(str(tmp_path), max_open=2)
+    fill(archive, days=4, per_day=5)
+    seen, cursor = [], None
+    while True:
+        page, cursor = archive.articles(cursor=cursor, limit=3)
+        seen.extend(a['title'] for a in page)
+        if cursor is None:
+            break
+    assert len(seen) == 20 and len(set(seen)) == 20
+    # Newest first
+    assert seen[0] == 'Story 3-4' and seen[-1] == 'Story 0-0'
+
+
+def test_filters_by_category_and_day(tmp_path):
+    archive = ArticleArchive(str(tmp_path))
+    fill(archive, days=3, per_day=4)
+    page, cursor = archive.articles(category='SPORTS', limit=10)
+    assert cursor is None and len(page) == 6 and {a['category'] for a in page} == {'sports'}
+    page, _ = archive.articles(since='2026-03-02', until='2026-03-02', limit=10)
+    assert [a['title'] for a in page] == ['Story 1-3', 'Story 1-2', 'Story 1-1', 'Story 1-0']
+    assert page[0]['archive_id'].startswith('2026-03-02:')
+
+
+def test_unchanged_articles_are_not_archived_twice(tmp_path):
+    archive = ArticleArchive(str(tmp_path))
+    snapshot = Snapshot((article(1), article(2)), datetime(2026, 3, 1, 8), 1)
+    archive.archive_snapshot(snapshot)
+    archive.archive_snapshot(Snapshot(snapshot.articles, datetime(2026, 3, 1, 9), 2))
+    archive.archive_snapshot(Snapshot((article(1, description='Updated'), article(2)), datetime(2026, 3, 1, 10), 3))
+    assert archive.stats()['articles_archived'] == 3
+
+
+def test_malformed_cursor_is_rejected(tmp_path):
+    archive = ArticleArchive(str(tmp_path))
+    for cursor in ('nope', '2026-13-01:5', '2026-03-01:x'):
+        with pytest.raises(ValueError):
+            archive.articles(cursor=cursor)
@@ -0,0 +1,81 @@
+import json
+
+from newsagent.article_store import ArticleStore
+
+
+def articles():
+    return [
+        {'title': 'Rates held', 'url': 'https://news.example/1', 'category': 'business'},
+        {'title': 'Chip launch', 'url': 'https://news.example/2', 'category': 'technology'},
+        {'title': 'Rates held again', 'url': 'https://NEWS.example/1', 'category': 'business'},
+        {'title': 'Cup final', 'url': 'https://news.example/3', 'category': 'sports'},
+    ]
+
+
+def test_publish_drops_duplicates_and_indexes_categories():
+    store = ArticleStore()
+    snapshot = store.publish(articles())
+    assert [a['title'] for a in snapshot.articles] == ['Rates held', 'Chip launch', 'Cup final']
+    assert [a['title'] for a in store.articles('Business')] == ['Rates held']
+    assert store.get('https://news.example/2')['title'] == 'Chip launch'
+
+
+def test_publish_category_keeps_other_categories():
+    store = ArticleStore()
+    store.publish(articles())
+    store.publish_category('sports', [{'title': 'Late winner', 'url': 'https://news.example/4', 'category': 'sports'}])
+    titles = {a['title'] for a in store.articles()}
+    assert titles == {'Late winner', 'Rates held', 'Chip launch'}
+
+
+def test_publish_categories_replaces_several_in_one_snapshot():
+    store = ArticleStore()
+    version = store.publish(articles()).version
+    snapshot = store.publish_categories({
+        'Business': [{'title': 'Rates cut', 'url': 'https://news.example/5', 'category': 'business'}],
+        'sports': [],
+    })
+    assert snapshot.version == version + 1
+    assert {a['title'] for a in snapshot.articles} == {'Rates cut', 'Chip launch'}
+
+
+def test_views_are_cached_per_snapshot():
+    snapshot = ArticleStore().publish(articles())
+    assert snapshot.view('business') is snapshot.view('BUSINESS')
+    # Limits past the end share the unlimited view
+    assert snapshot.view(limit=50) is snapshot.view()
+    assert json.loads(snapshot.view(limit=1).body) == [snapshot.articles[0]]
+
+
+def test_unknown_categories_share_one_empty_view():
+    snapshot = ArticleStore().publish(articles())
+    cached = len(snapshot._views)
+    for i in range(100):
+        assert json.loads(snapshot.view(f'random-{i}', limit=i).body) == []
+    assert snapshot.view('nope') is snapshot.view('other')
+    assert len(snapshot._views) == cached
+
+
+def test_snapshot_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / 'articles.jsonl')
+    ArticleStore(snapshot_path=path).publish(articles())
+    restored = ArticleStore(snapshot_path=path)
+    assert restored.load()
+    assert [a['title'] for a in restored.articles()] == ['Rates held', 'Chip launch', 'Cup final']
+
+
+def test_truncated_snapshot_is_ignored(tmp_path):
+    path = tmp_path / 'articles.jsonl'
+    ArticleStore(snapshot_path=str(path)).publish(articles())
+    path.write_text(''.join(path.read_text().splitlines(keepends=True)[:-1]))
+    assert not ArticleStore(snapshot_path=str(path)).load()
+
+
+def test_listeners_see_every_publish_in_order():
+    store = ArticleStore()
+    versions = []
+    store.subscribe(lambda snapshot: versions.append(snapshot.version))
+    store.subscribe(lambda snapshot: 1 / 0)  # a failing listener doesn't stop publishing
+    store.publish(articles())
+    store.publish_category('sports', [])
+    assert versions == [1, 2]
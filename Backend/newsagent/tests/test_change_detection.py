@@ -0,0 +1,54 @@
+from newsagent.change_detection import HeadlineTracker
+
+
+def headlines(count, prefix='story'):
+    return [
+        {'title': f'{prefix} {i}', 'url': f'https://news.example/{prefix}/{i}', 'published_at': '2026-10-16T08:00:00Z'}
+        for i in range(count)
+    ]
+
+
+def test_refetch_after_partial_write_has_no_new_stories():
+    tracker = HeadlineTracker()
+    sent = headlines(10)
+    # The writer turned 10 headlines into 3 articles
+    articles = [{'title': f'Article {i}', 'url': sent[i]['url']} for i in (0, 4, 7)]
+    tracker.record('business', sent, articles)
+
+    new, reused = tracker.diff('business', headlines(10))
+    assert new == []
+    assert [a['title'] for a in reused] == ['Article 0', 'Article 4', 'Article 7']
+
+
+def test_only_unseen_stories_are_new():
+    tracker = HeadlineTracker()
+    tracker.record('business', headlines(5), [])
+    new, reused = tracker.diff('business', headlines(5) + headlines(2, prefix='fresh'))
+    assert [h['title'] for h in new] == ['fresh 0', 'fresh 1']
+    assert reused == []
+
+
+def test_seen_again_keeps_earlier_article():
+    tracker = HeadlineTracker()
+    sent = headlines(2)
+    tracker.record('general', sent, [{'title': 'Written', 'url': sent[0]['url']}])
+    tracker.record('general', sent, [])
+    _, reused = tracker.diff('general', sent)
+    assert [a['title'] for a in reused] == ['Written']
+    assert tracker.latest('general')['title'] == 'Written'
+
+
+def test_memory_is_bounded_per_category():
+    tracker = HeadlineTracker(max_stories_per_category=3)
+    tracker.record('sports', headlines(5), [])
+    new, _ = tracker.diff('sports', headlines(5))
+    assert [h['title'] for h in new] == ['story 0', 'story 1']
+
+
+def test_avoided_runs_count_once_per_kickoff():
+    tracker = HeadlineTracker()
+    tracker.count_avoided(6)
+    stats = tracker.stats()
+    assert stats['crew_runs_avoided'] == 1
+    assert stats['llm_calls_avoided'] == 2
+    assert stats['stories_reused'] == 6
@@ -0,0 +1,65 @@
+import json
+import os
+
+os.environ.setdefault('CREWAI_DISABLE_TELEMETRY', 'true')
+os.environ.setdefault('OTEL_SDK_DISABLED', 'true')
+
+import pytest
+
+crewai = pytest.importorskip('crewai')
+from crewai.llms.base_llm import BaseLLM
+
+from newsagent import crew as crew_module
+from newsagent.crew_pool import CrewPool
+from newsagent.tools import custom_tool
+
+NEWSLETTER = json.dumps({
+    'edition_date': '2026-10-17',
+    'articles': [{'title': 'Markets rally', 'summary': 'Stocks rose.', 'content': 'Stocks rose.', 'category': 'business'}],
+    'summary': 'Markets rallied.',
+})
+
+
+class ScriptedLLM(BaseLLM):
+    """Researcher calls the News Scraper once, then answers; the writer answers at once."""
+
+    def __init__(self):
+        super().__init__(model='scripted')
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        text = messages if isinstance(messages, str) else '\n'.join(str(m.get('content')) for m in messages)
+        if 'News Writer' in text:
+            return f'Thought: I can write it now\nFinal Answer: {NEWSLETTER}'
+        last = messages if isinstance(messages, str) else str(messages[-1].get('content'))
+        if 'Observation:' in last:
+            return 'Thought: I have the headlines\nFinal Answer: Markets rallied today.'
+        return ('Thought: I need headlines\nAction: News Scraper\n'
+                'Action Input: {"category": "business", "limit": 2}')
+
+    def supports_function_calling(self):
+        return False
+
+
+class CountingSource:
+    def __init__(self):
+        self.calls = 0
+
+    def top_headlines(self, category, limit):
+        self.calls += 1
+        return [{'title': f'Markets rally {self.calls}', 'url': f'https://news.example/{self.calls}',
+                 'description': 'Stocks rose.', 'source': 'Wire', 'category': category}]
+
+
+def test_reused_crew_calls_tools_again(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(crew_module, 'get_groq_llm', ScriptedLLM)
+    source = CountingSource()
+    monkeypatch.setattr(custom_tool, 'get_news_source', lambda: source)
+    pool = CrewPool(factory=lambda: crew_module.Newsagent().crew(), max_size=1)
+
+    for _ in range(2):
+        pool.kickoff(crew_module.crew_inputs('business'))
+
+    assert pool.stats()['built'] == 1
+    # The second run must not be answered from the first run's tool cache
+    assert source.calls == 2
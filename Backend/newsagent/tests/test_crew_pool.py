@@ -0,0 +1,50 @@
+import threading
+
+from newsagent.crew_pool import CrewPool
+
+
+def test_prewarm_builds_up_to_max_size():
+    pool = CrewPool(factory=object, max_size=4)
+    pool.prewarm()
+    assert pool.stats() == {'built': 4, 'leases': 0, 'idle': 4, 'max_size': 4}
+
+
+def test_prewarm_count_and_repeat_do_not_overbuild():
+    pool = CrewPool(factory=object, max_size=4)
+    pool.prewarm(2)
+    pool.prewarm(2)
+    assert pool.stats()['built'] == 2
+    pool.prewarm(10)
+    assert pool.stats()['built'] == 4
+
+
+def test_leases_reuse_crews_and_never_share_one():
+    pool = CrewPool(factory=object, max_size=2)
+    pool.prewarm()
+    with pool.lease() as first, pool.lease() as second:
+        assert first is not second
+    with pool.lease() as again:
+        assert again in (first, second)
+    assert pool.stats()['built'] == 2
+
+
+def test_extra_crews_built_under_load_are_dropped():
+    pool = CrewPool(factory=object, max_size=1)
+    release = threading.Event()
+    leased = []
+
+    def hold():
+        with pool.lease() as crew:
+            leased.append(crew)
+            release.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while len(leased) < 3:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert pool.stats()['built'] == 3
+    assert pool.stats()['idle'] == 1
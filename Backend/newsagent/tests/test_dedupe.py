@@ -0,0 +1,67 @@
+import copy
+
+from newsagent.dedupe import StoryDeduper, story_text
+from newsagent.ranking import rank_stories
+
+
+def story(title, url, source='Reuters', **extra):
+    return dict({'title': title, 'url': url, 'source': {'name': source}, 'description': ''}, **extra)
+
+
+FED = [
+    story('Federal Reserve raises interest rates by a quarter point - Reuters', 'https://reuters.example/fed'),
+    story('Federal Reserve raises interest rates by quarter point', 'https://ap.example/fed', source='AP'),
+    story('Federal Reserve raises interest rates by a quarter point', 'https://reuters.example/fed?utm=x'),
+]
+STORM = story('Tropical storm makes landfall along the Gulf coast overnight', 'https://bbc.example/storm', source='BBC')
+
+
+def test_story_text_drops_outlet_suffix():
+    assert story_text(FED[0]) == 'federal reserve raises interest rates by a quarter point'
+
+
+def test_dedupe_keeps_first_of_each_cluster():
+    kept = StoryDeduper(enabled=True).dedupe(FED + [STORM])
+    assert [s['url'] for s in kept] == ['https://reuters.example/fed', 'https://bbc.example/storm']
+
+
+def test_dedupe_does_not_modify_stories():
+    stories = FED + [STORM]
+    before = copy.deepcopy(stories)
+    deduper = StoryDeduper(enabled=True)
+    index = deduper.index()
+    deduper.dedupe(stories, index)
+    assert stories == before
+    assert index.cluster_size(stories[0]) == 3
+    assert index.cluster_size(STORM) == 1
+    assert deduper.cluster_size(story('anything', 'https://reuters.example/fed/')) == 3
+
+
+def test_cluster_size_is_per_refresh_not_cumulative():
+    deduper = StoryDeduper(enabled=True)
+    deduper.dedupe(FED)
+    deduper.dedupe(FED[:1])
+    assert deduper.cluster_size(FED[0]) == 1
+
+
+def test_dedupe_by_category_keeps_every_category_non_empty():
+    deduper = StoryDeduper(enabled=True)
+    result = deduper.dedupe_by_category({'business': FED[:1], 'general': FED[1:], 'sports': None})
+    assert result['business'] == FED[:1]
+    assert result['general'] == FED[1:2]
+    assert result['sports'] is None
+    assert deduper.stats()['duplicates_dropped'] == 1
+
+
+def test_disabled_deduper_keeps_everything():
+    deduper = StoryDeduper(enabled=False)
+    assert deduper.dedupe(FED) == FED
+    assert deduper.stats()['stories_seen'] == 0
+
+
+def test_ranking_sees_clusters_the_pipeline_dropped():
+    from newsagent import dedupe
+    dedupe.get_story_deduper().dedupe(FED + [STORM])
+    ranked = rank_stories([dict(FED[0], category='business'), dict(STORM, category='business')])
+    outlets = {s['url']: s.get('outlets') for s in ranked.stories}
+    assert outlets == {'https://reuters.example/fed': 3, 'https://bbc.example/storm': None}
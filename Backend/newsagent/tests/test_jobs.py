@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from newsagent.jobs import SUCCEEDED, Job, JobRegistry, begin_stage, crew_task_finished, finish_stage
+from newsagent.work_queue import WorkQueue
+
+
+def task_output(name):
+    return SimpleNamespace(name=name)
+
+
+def stage_status(job):
+    return {name: stage['status'] for name, stage in job.stages.items()}
+
+
+def test_research_hands_over_to_write_per_crew():
+    job = Job('standard')
+    seen = []
+
+    def two_crews():
+        # Two per-category crews running in the same job
+        begin_stage('research')
+        begin_stage('research')
+        crew_task_finished(task_output('research_task'))
+        seen.append(stage_status(job))
+        # The first crew's writing task must not end the second crew's research
+        crew_task_finished(task_output('writing_task'))
+        finish_stage('write')
+        seen.append(stage_status(job))
+        crew_task_finished(task_output('research_task'))
+        seen.append(stage_status(job))
+        crew_task_finished(task_output('writing_task'))
+        finish_stage('write')
+        seen.append(stage_status(job))
+
+    job.run(two_crews)
+    assert job.status == SUCCEEDED
+    assert [(s['research'], s['write']) for s in seen] == [
+        ('running', 'running'),
+        ('running', 'done'),
+        ('done', 'running'),
+        ('done', 'done'),
+    ]
+
+
+def test_crew_callback_is_a_no_op_outside_a_job():
+    crew_task_finished(task_output('research_task'))
+
+
+def test_recent_clamps_the_limit():
+    registry = JobRegistry(history=3, queue=WorkQueue(workers=1))
+    jobs = [registry.create('quick')[0] for _ in range(5)]
+    newest = [job.id for job in reversed(jobs)]
+    assert [j['job_id'] for j in registry.recent(2)] == newest[:2]
+    assert [j['job_id'] for j in registry.recent(0)] == newest[:1]
+    assert [j['job_id'] for j in registry.recent(-2)] == newest[:1]
+    assert [j['job_id'] for j in registry.recent(100)] == newest[:3]
@@ -0,0 +1,112 @@
+import pytest
+
+from newsagent import llm_cache
+from newsagent.llm_cache import (
+    CompletionCache, MemoryCompletionCache, SQLiteCompletionCache, TieredCompletionCache, completion_key
+)
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_cache.time, 'time', clock)
+    return clock
+
+
+def test_base_cache_is_abstract():
+    with pytest.raises(TypeError):
+        CompletionCache()
+
+
+def test_key_covers_model_messages_temperature_and_tools():
+    messages = [{'role': 'user', 'content': 'hi'}]
+    key = completion_key('m', messages, 0.2)
+    assert key == completion_key('m', [{'content': 'hi', 'role': 'user'}], 0.2)
+    assert key != completion_key('other', messages, 0.2)
+    assert key != completion_key('m', messages, 0.7)
+    assert key != completion_key('m', messages, 0.2, tools=[{'name': 'search'}])
+
+
+def test_memory_entries_expire_after_ttl(clock):
+    cache = MemoryCompletionCache(ttl_seconds=60)
+    cache.put('k', 'v')
+    clock.now += 59
+    assert cache.get('k') == 'v'
+    clock.now += 2
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_memory_evicts_least_recently_used():
+    cache = MemoryCompletionCache(max_entries=2)
+    cache.put('a', '1')
+    cache.put('b', '2')
+    cache.get('a')
+    cache.put('c', '3')
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == ('1', '3')
+
+
+def test_sqlite_entries_expire_after_ttl(tmp_path, clock):
+    cache = SQLiteCompletionCache(str(tmp_path / 'cache.sqlite3'), ttl_seconds=60)
+    cache.put('k', 'v')
+    clock.now += 30
+    assert cache.get('k') == 'v'
+    clock.now += 31
+    assert cache.get('k') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_sqlite_trims_to_size_least_recently_hit_first(tmp_path, clock):
+    cache = SQLiteCompletionCache(str(tmp_path / 'cache.sqlite3'), max_bytes=30)
+    for key in 'abc':
+        cache.put(key, key * 10)
+        clock.now += 1
+    # 'a' is hit, so 'b' is now the least recently used
+    assert cache.get('a') == 'a' * 10
+    clock.now += 1
+    cache.put('d', 'd' * 10)
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in 'acd'] == ['a' * 10, 'c' * 10, 'd' * 10]
+    assert cache.stats()['bytes'] <= 30
+
+
+def test_sqlite_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    SQLiteCompletionCache(path).put('k', 'v')
+    reopened = SQLiteCompletionCache(path)
+    assert reopened.get('k') == 'v'
+    assert reopened.top_entries()[0]['hits'] == 1
+
+
+def test_tiered_promotes_sqlite_hits_to_memory_with_their_age(tmp_path, clock):
+    persistent = SQLiteCompletionCache(str(tmp_path / 'cache.sqlite3'), ttl_seconds=60)
+    persistent.put('k', 'v')
+    clock.now += 50
+    cache = TieredCompletionCache(memory=MemoryCompletionCache(ttl_seconds=60), persistent=persistent)
+    assert cache.memory.get('k') is None
+    assert cache.get('k') == 'v'
+    assert cache.memory.get('k') == 'v'
+    # The promoted copy keeps the original creation time, so it still expires on schedule
+    clock.now += 11
+    assert cache.memory.get('k') is None
+
+
+def test_tiered_counts_hits_and_misses(tmp_path):
+    cache = TieredCompletionCache(persistent=SQLiteCompletionCache(str(tmp_path / 'cache.sqlite3')))
+    assert cache.get('k') is None
+    cache.put('k', 'v')
+    assert cache.get('k') == 'v'
+    assert cache.get('k') == 'v'
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (2, 1, 0.6667)
+    assert stats['memory']['entries'] == 1
+    assert stats['sqlite']['entries'] == 1
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from newsagent import ratelimit
+from newsagent.ratelimit import ProviderLimiter, TokenBucket, parse_retry_after
+
+
+def test_bucket_allows_a_burst_then_reports_the_wait():
+    bucket = TokenBucket(rate=10, burst=3)
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert 0 < bucket.try_acquire() <= 0.1
+
+
+def test_zero_rate_means_unlimited():
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.try_acquire() == 0.0 for _ in range(100))
+    limiter = ProviderLimiter('test', rate=0, burst=1, max_in_flight=2)
+    limiter.report_throttle(retry_after='0')
+    with limiter.slot():
+        pass
+    assert limiter.metrics()['rate_per_sec'] == 0
+
+
+def test_negative_rate_is_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=-1, burst=1)
+    monkeypatch.setenv('BADPROVIDER_RATE_PER_SEC', '-2')
+    with pytest.raises(ValueError, match='badprovider'):
+        ratelimit.get_limiter('badprovider')
+
+
+def test_block_for_pauses_the_bucket():
+    bucket = TokenBucket(rate=1000, burst=5)
+    bucket.block_for(0.2)
+    assert 0.1 < bucket.try_acquire() <= 0.2
+
+
+def test_throttle_halves_the_rate_and_success_recovers_it():
+    limiter = ProviderLimiter('test', rate=8, burst=1, max_in_flight=1)
+    limiter.report_throttle(retry_after=0)
+    assert limiter.metrics()['rate_per_sec'] == 4
+    for _ in range(3):
+        limiter.report_throttle(retry_after=0)
+    assert limiter.metrics()['rate_per_sec'] == 1  # MIN_RATE_FACTOR of 8
+    for _ in range(20):
+        limiter.report_success()
+    assert limiter.metrics()['rate_per_sec'] == 8
+
+
+def test_in_flight_cap_is_shared_by_threads_and_tasks():
+    limiter = ProviderLimiter('test', rate=0, burst=1, max_in_flight=2)
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal peak
+        with limiter.slot():
+            with lock:
+                peak = max(peak, limiter.metrics()['in_flight'])
+            time.sleep(0.05)
+
+    async def awork():
+        async with limiter.aslot():
+            await asyncio.sleep(0.05)
+
+    async def tasks():
+        await asyncio.wait_for(asyncio.gather(*(awork() for _ in range(3))), 5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(tasks())
+    for thread in threads:
+        thread.join()
+    assert peak <= 2
+    metrics = limiter.metrics()
+    assert metrics['calls'] == 7 and metrics['in_flight'] == 0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after(-1) == 0.0
+    assert parse_retry_after('Wed, 21 Oct 2026 07:28:00 GMT') is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+from newsagent.scheduler import FreshnessScheduler, headlines_fingerprint
+
+
+class Upstream:
+    def __init__(self):
+        self.headlines = {'business': [{'url': 'https://news.example/1', 'published_at': '08:00'}]}
+        self.checks = 0
+
+    def fingerprint(self, category):
+        self.checks += 1
+        return headlines_fingerprint(self.headlines.get(category, []))
+
+
+def make_scheduler(upstream=None, **kwargs):
+    refreshed = []
+
+    def refresh(category):
+        refreshed.append(category)
+        return True
+
+    scheduler = FreshnessScheduler(
+        ['business', 'sports'], refresh, max_age=timedelta(hours=2),
+        fingerprint=upstream.fingerprint if upstream else None,
+        check_interval=timedelta(minutes=15), **kwargs
+    )
+    return scheduler, refreshed
+
+
+def test_headlines_fingerprint_ignores_order():
+    a = {'url': 'https://news.example/1', 'published_at': '1'}
+    b = {'url': 'https://news.example/2', 'publishedAt': '2'}
+    assert headlines_fingerprint([a, b]) == headlines_fingerprint([b, a])
+    assert headlines_fingerprint([a]) != headlines_fingerprint([a, b])
+
+
+def test_cold_start_refreshes_everything_then_waits_for_max_age():
+    scheduler, refreshed = make_scheduler()
+    now = datetime.now()
+    assert scheduler.tick(now) == ['business', 'sports']
+    assert scheduler.tick(now + timedelta(hours=1)) == []
+    # Most overdue first; next_run is jittered so the order varies
+    assert sorted(scheduler.tick(now + timedelta(hours=3))) == ['business', 'sports']
+    assert len(refreshed) == 4
+
+
+def test_max_per_tick_spreads_refreshes():
+    scheduler, _ = make_scheduler(max_per_tick=1)
+    now = datetime.now()
+    assert scheduler.tick(now) == ['business']
+    assert scheduler.tick(now) == ['sports']
+
+
+def test_changed_headlines_trigger_an_early_refresh():
+    upstream = Upstream()
+    scheduler, refreshed = make_scheduler(upstream)
+    now = datetime.now()
+    scheduler.tick(now)
+    refreshed.clear()
+
+    # Unchanged headlines: nothing to do before max_age
+    assert scheduler.tick(now + timedelta(minutes=20)) == []
+    upstream.headlines['business'].append({'url': 'https://news.example/2', 'published_at': '09:00'})
+    # Checks are rate limited to check_interval
+    assert scheduler.tick(now + timedelta(minutes=25)) == []
+    assert scheduler.tick(now + timedelta(minutes=40)) == ['business']
+    assert refreshed == ['business']
+
+
+def test_failed_refresh_is_retried_later_not_every_tick():
+    scheduler = FreshnessScheduler(['business'], lambda category: False, max_age=timedelta(hours=2), tick_seconds=30)
+    now = datetime.now()
+    assert scheduler.tick(now) == []
+    assert scheduler.due(now + timedelta(seconds=30)) == []
+    assert scheduler.due(now + timedelta(minutes=5)) == ['business']
+
+
+def test_can_run_pauses_ticks():
+    scheduler, refreshed = make_scheduler(can_run=lambda: False)
+    assert scheduler.tick() == []
+    assert refreshed == []
+
+
+def test_batchable_categories_refresh_together():
+    batches = []
+
+    def refresh_batch(categories):
+        batches.append(list(categories))
+        return {category: category != 'general' for category in categories}
+
+    scheduler = FreshnessScheduler(
+        ['business', 'sports', 'technology', 'general'], lambda category: True, max_age=timedelta(hours=2),
+        max_per_tick=2, refresh_batch=refresh_batch, batch=['business', 'technology', 'general']
+    )
+    now = datetime.now()
+    # The batch counts as a single refresh, so sports still fits in the tick
+    assert sorted(scheduler.tick(now)) == ['business', 'sports', 'technology']
+    assert [sorted(batch) for batch in batches] == [['business', 'general', 'technology']]
+    assert scheduler.status()['categories']['general']['last_status'] == 'failed'
+    # Only the failed category is due again, and it is retried as a batch of one
+    assert scheduler.due(now + timedelta(minutes=5)) == ['general']
+    scheduler.tick(now + timedelta(minutes=5))
+    assert batches[-1] == ['general']
@@ -0,0 +1,91 @@
+import math
+import random
+from collections import Counter
+
+from newsagent.article_store import Snapshot
+from newsagent.search import B, K1, TITLE_BOOST, SearchIndex, tokenize
+
+WORDS = ('market rates inflation storm election court vaccine league film budget merger '
+         'satellite drought tariff strike').split()
+
+
+def article(i, title, body='', category='business'):
+    return {'title': title, 'description': body, 'category': category, 'url': f'https://news.example/{i}'}
+
+
+def reference_scores(articles, query):
+    """Exhaustive BM25 over every document, for checking the pruned search."""
+    docs = []
+    for a in articles:
+        terms = Counter(tokenize(a['description']))
+        for token in tokenize(a['title']):
+            terms[token] += TITLE_BOOST
+        docs.append(terms)
+    count = len(docs)
+    average = sum(sum(d.values()) for d in docs) / count
+    scores = {}
+    for term in dict.fromkeys(tokenize(query)):
+        matching = sum(1 for d in docs if term in d)
+        if not matching:
+            continue
+        idf = math.log(1 + (count - matching + 0.5) / (matching + 0.5))
+        for i, d in enumerate(docs):
+            tf = d.get(term)
+            if tf:
+                norm = K1 * (1 - B + B * sum(d.values()) / average)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+    return scores
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Fed's rate-hike is ON") == ['fed', 's', 'rate', 'hike']
+
+
+def test_title_matches_rank_above_body_matches():
+    index = SearchIndex()
+    index.add(article(1, 'Budget talks stall', 'Lawmakers mention a storm in passing.'))
+    index.add(article(2, 'Storm hits the coast', 'Heavy rain expected.'))
+    total, results = index.search('storm')
+    assert total == 2
+    assert [a['url'] for _, a in results] == ['https://news.example/2', 'https://news.example/1']
+
+
+def test_pruned_search_matches_exhaustive_bm25():
+    rng = random.Random(3)
+    articles = [article(i, ' '.join(rng.choices(WORDS, k=5)), ' '.join(rng.choices(WORDS, k=rng.randint(5, 40))))
+                for i in range(300)]
+    index = SearchIndex()
+    for a in articles:
+        index.add(a)
+    for query in ('storm', 'storm tariff', 'market rates inflation election', 'drought satellite film'):
+        expected = reference_scores(articles, query)
+        total, results = index.search(query, limit=10)
+        assert total == len(expected)
+        best = sorted(expected.values(), reverse=True)[:10]
+        assert [score for score, _ in results] == [round(score, 4) for score in best]
+
+
+def test_pagination_and_category_filter():
+    index = SearchIndex()
+    for i in range(30):
+        index.add(article(i, f'Storm update {i}', category='science' if i % 3 == 0 else 'general'))
+    total, first = index.search('storm update', limit=5)
+    _, second = index.search('storm update', limit=5, offset=5)
+    assert total == 30
+    assert not {a['url'] for _, a in first} & {a['url'] for _, a in second}
+    total, science = index.search('storm', category='Science', limit=50)
+    assert total == 10 and all(a['category'] == 'science' for _, a in science)
+    assert index.search('nothing matches') == (0, [])
+
+
+def test_incremental_updates_and_eviction():
+    index = SearchIndex(max_documents=2)
+    index.index_snapshot(Snapshot((article(1, 'Storm warning'), article(2, 'Court ruling')), None, 1))
+    # Unchanged text is skipped, changed text is re-indexed
+    index.index_snapshot(Snapshot((article(1, 'Storm warning'), article(2, 'Court ruling appealed')), None, 2))
+    assert index.stats()['unchanged_skipped'] == 1
+    assert index.search('appealed')[0] == 1
+    index.add(article(3, 'Merger approved'))
+    # Oldest document evicted
+    assert index.search('storm') == (0, [])
+    assert index.stats()['documents'] == 2
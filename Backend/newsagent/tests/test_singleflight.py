@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from newsagent.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_load():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do('key', loader)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do('key', loader))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+    assert results == ['result'] * 5
+    assert len(calls) == 1
+    assert flights.stats()['coalesced'] == 4
+
+
+def test_errors_reach_waiters_and_are_not_cached():
+    flights = SingleFlight(ttl_seconds=60)
+
+    def fail():
+        raise RuntimeError('upstream down')
+
+    with pytest.raises(RuntimeError):
+        flights.do('key', fail)
+    assert flights.do('key', lambda: 'ok') == 'ok'
+    assert flights.stats()['loads'] == 2
+
+
+def test_results_are_cached_for_ttl():
+    flights = SingleFlight(ttl_seconds=0.1)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return len(calls)
+
+    assert flights.do('key', loader) == 1
+    assert flights.do('key', loader) == 1
+    assert flights.do('other', loader) == 2
+    time.sleep(0.15)
+    assert flights.do('key', loader) == 3
+    flights.forget('key')
+    assert flights.do('key', loader) == 4
+    assert flights.stats()['cache_hits'] == 1
+
+
+def test_without_ttl_nothing_is_cached():
+    flights = SingleFlight()
+    assert flights.do('key', lambda: 1) == 1
+    assert flights.do('key', lambda: 2) == 2
+    assert flights.stats() == {'loads': 2, 'coalesced': 0, 'cache_hits': 0, 'in_flight': 0, 'cached': 0}
+
+
+def test_async_callers_share_one_load_and_the_cache():
+    flights = SingleFlight(ttl_seconds=60)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'result'
+
+    async def run():
+        return await asyncio.gather(*(flights.ado('key', loader) for _ in range(5)))
+
+    assert asyncio.run(run()) == ['result'] * 5
+    assert len(calls) == 1
+    # The sync path sees the async result
+    assert flights.do('key', lambda: 'reloaded') == 'result'
+
+
+def test_cancelled_async_leader_does_not_wedge_the_key():
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def fast():
+        return 'ok'
+
+    async def run():
+        task = asyncio.ensure_future(flights.ado('key', slow))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await flights.ado('key', fast)
+
+    assert asyncio.run(run()) == 'ok'
+    assert flights.stats()['in_flight'] == 0
@@ -0,0 +1,114 @@
+import json
+import re
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from newsagent import summarizer
+from newsagent.llm_cache import MemoryCompletionCache
+from newsagent.summarizer import TextService, chunk_text, parse_batch
+
+
+class FakeLLM:
+    def __init__(self, reply=None):
+        self.prompts = []
+        self.reply = reply
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        if self.reply is not None:
+            return self.reply(prompt)
+        ids = re.findall(r'^\[(\d+)\]$', prompt, re.M)
+        if ids:
+            return json.dumps({'results': [{'id': int(i), 'output': f'summary {i}'} for i in ids]})
+        return 'single summary'
+
+
+def service(llm, **kwargs):
+    return TextService(complete=llm, cache=kwargs.pop('cache', MemoryCompletionCache()), workers=2,
+                       window_ms=kwargs.pop('window_ms', 50), **kwargs)
+
+
+def test_chunk_text_splits_at_paragraphs_and_sentences():
+    text = 'First paragraph.\n\nSecond one. It has two sentences.'
+    assert chunk_text(text, max_chars=100) == ['First paragraph.\n\nSecond one. It has two sentences.']
+    assert chunk_text(text, max_chars=25) == ['First paragraph.', 'Second one.', 'It has two sentences.']
+    assert all(len(chunk) <= 10 for chunk in chunk_text('word ' * 40, max_chars=10))
+
+
+def test_parse_batch_tolerates_missing_and_bad_items():
+    reply = 'Sure! {"results": [{"id": 2, "output": " b "}, {"id": 9, "output": "x"}, {"id": 1, "output": ""}]}'
+    assert parse_batch(reply, 3) == [None, 'b', None]
+    assert parse_batch('not json', 2) == [None, None]
+
+
+def test_requests_in_one_window_share_a_batch_and_the_cache():
+    llm = FakeLLM()
+    svc = service(llm)
+    futures = [svc.submit('summarize', f'Article number {i}.') for i in range(3)]
+    assert sorted(f.result(timeout=5) for f in futures) == ['summary 1', 'summary 2', 'summary 3']
+    assert len(llm.prompts) == 1
+    assert svc.run('summarize', 'Article number 0.') == futures[0].result()
+    assert len(llm.prompts) == 1
+    assert svc.stats()['cache_hits'] == 1
+
+
+def test_identical_pending_requests_are_coalesced():
+    llm = FakeLLM()
+    svc = service(llm)
+    first, second = svc.submit('explain', 'Same text.'), svc.submit('explain', 'Same text.')
+    assert first is second
+    assert first.result(timeout=5) == 'single summary'
+    assert svc.stats()['coalesced'] == 1
+
+
+def test_malformed_batch_reply_falls_back_to_single_calls():
+    llm = FakeLLM(reply=lambda prompt: 'garbled' if 'numbered texts' in prompt else 'one')
+    svc = service(llm)
+    futures = [svc.submit('summarize', f'Text {i}.') for i in range(2)]
+    assert [f.result(timeout=5) for f in futures] == ['one', 'one']
+    assert svc.stats()['fallbacks'] == 2
+
+
+def test_llm_failure_fails_every_future_and_clears_pending():
+    def fail(prompt):
+        raise RuntimeError('provider down')
+    svc = service(FakeLLM(reply=fail))
+    futures = [svc.submit('summarize', f'Text {i}.') for i in range(2)]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='provider down'):
+            future.result(timeout=5)
+    assert svc._pending == {}
+
+
+def test_cache_failure_still_resolves_every_future():
+    class BrokenCache(MemoryCompletionCache):
+        def put(self, key, value):
+            raise OSError('disk full')
+    svc = service(FakeLLM(), cache=BrokenCache())
+    futures = [svc.submit('summarize', f'Text {i}.') for i in range(2)]
+    assert sorted(f.result(timeout=5) for f in futures) == ['summary 1', 'summary 2']
+    assert svc._pending == {}
+
+
+def test_timed_out_request_is_not_reused(monkeypatch):
+    release = threading.Event()
+    calls = []
+
+    def slow(prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            release.wait(5)
+        return f'result {len(calls)}'
+
+    monkeypatch.setattr(summarizer, 'SUMMARY_TIMEOUT_SECONDS', 0.2)
+    svc = service(FakeLLM(reply=slow), window_ms=0)
+    with pytest.raises(FutureTimeout):
+        svc.run('summarize', 'Slow text.')
+    assert svc.stats()['timeouts'] == 1
+    # A later caller sends a new request instead of waiting on the stuck one
+    assert svc.run('summarize', 'Slow text.') == 'result 2'
+    release.set()
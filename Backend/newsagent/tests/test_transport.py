@@ -0,0 +1,136 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from newsagent import transport
+
+
+class StubServer:
+    """Local HTTP server answering each request with the next planned (status, delay)."""
+
+    def __init__(self, plan):
+        self.plan = list(plan)
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                self.rfile.read(length)
+                status, delay = stub.plan[min(stub.hits, len(stub.plan) - 1)]
+                stub.hits += 1
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(transport, 'backoff_delay', lambda attempt: 0.0)
+
+
+def test_get_retries_5xx():
+    server = StubServer([(503, 0), (503, 0), (200, 0)])
+    try:
+        assert transport.get(server.url, retries=3).status_code == 200
+        assert server.hits == 3
+    finally:
+        server.close()
+
+
+def test_post_is_not_resent_after_5xx():
+    server = StubServer([(502, 0), (200, 0)])
+    try:
+        assert transport.post(server.url, json={}, retries=3).status_code == 502
+        assert server.hits == 1
+    finally:
+        server.close()
+
+
+def test_post_is_resent_after_429():
+    server = StubServer([(429, 0), (200, 0)])
+    try:
+        assert transport.post(server.url, json={}, retries=3).status_code == 200
+        assert server.hits == 2
+    finally:
+        server.close()
+
+
+def test_post_is_not_resent_after_read_timeout():
+    server = StubServer([(200, 0.5)])
+    try:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            transport.post(server.url, json={}, retries=3, timeout=(1, 0.1))
+        time.sleep(0.6)
+        assert server.hits == 1
+    finally:
+        server.close()
+
+
+def test_get_is_resent_after_read_timeout():
+    server = StubServer([(200, 0.5), (200, 0)])
+    try:
+        assert transport.get(server.url, retries=3, timeout=(1, 0.1)).status_code == 200
+        assert server.hits == 2
+    finally:
+        server.close()
+
+
+def test_post_is_resent_when_the_connection_was_refused():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    attempts = []
+    original = transport.backoff_delay
+    transport.backoff_delay = lambda attempt: attempts.append(attempt) or 0.0
+    try:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transport.post(f'http://127.0.0.1:{port}/', json={}, retries=2)
+    finally:
+        transport.backoff_delay = original
+    assert attempts == [0, 1]
+
+
+def test_retryable_status_by_method():
+    assert transport.retryable_status('GET', 503)
+    assert not transport.retryable_status('POST', 503)
+    assert transport.retryable_status('post', 429)
+    assert not transport.retryable_status('GET', 404)
+
+
+def test_async_post_is_not_resent_after_5xx():
+    pytest.importorskip('httpx')
+    import asyncio
+    from newsagent import async_transport
+
+    async def post():
+        try:
+            return await async_transport.apost(server.url, json={}, retries=3)
+        finally:
+            await async_transport.aclose()
+
+    server = StubServer([(503, 0), (200, 0)])
+    try:
+        assert asyncio.run(post()).status_code == 503
+        assert server.hits == 1
+    finally:
+        server.close()
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+
+from newsagent.work_queue import (
+    PRIORITY_BATCH, PRIORITY_ON_DEMAND, PRIORITY_SCHEDULED, QueueFull, WorkQueue
+)
+
+
+def blocked_queue(**kwargs):
+    """A one-worker queue whose worker is held until the returned event is set."""
+    queue = WorkQueue(workers=1, **kwargs)
+    release, started = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    queue.submit(block, name='blocker')
+    assert started.wait(5)
+    return queue, release
+
+
+def test_runs_by_priority_then_fifo():
+    queue, release = blocked_queue()
+    order = []
+    for name, priority in [('batch', PRIORITY_BATCH), ('scheduled-1', PRIORITY_SCHEDULED),
+                           ('on-demand', PRIORITY_ON_DEMAND), ('scheduled-2', PRIORITY_SCHEDULED)]:
+        queue.submit(lambda name=name: order.append(name), priority=priority, name=name)
+    release.set()
+    assert queue.drain(5)
+    assert order == ['on-demand', 'scheduled-1', 'scheduled-2', 'batch']
+
+
+def test_full_queue_rejects_with_retry_after():
+    queue, release = blocked_queue(max_depth=2)
+    queue.submit(lambda: None)
+    queue.submit(lambda: None)
+    with pytest.raises(QueueFull) as excinfo:
+        queue.submit(lambda: None)
+    # Nothing has finished yet, so the estimate uses the default run time
+    assert excinfo.value.retry_after >= 1
+    assert queue.stats()['rejected'] == 1
+    release.set()
+    assert queue.drain(5)
+
+
+def test_cancel_only_while_queued():
+    queue, release = blocked_queue()
+    ran, cancelled = [], []
+    item = queue.submit(lambda: ran.append('cancelled item'), on_cancel=lambda: cancelled.append(True))
+    kept = queue.submit(lambda: ran.append('kept item'))
+    assert queue.cancel(item)
+    assert not queue.cancel(item)
+    assert cancelled == [True]
+    release.set()
+    assert queue.drain(5)
+    assert ran == ['kept item']
+    assert not queue.cancel(kept)
+    assert queue.stats()['cancelled'] == 1
+
+
+def test_drain_finishes_queued_work_and_stops_accepting():
+    queue, release = blocked_queue()
+    ran = []
+    for i in range(3):
+        queue.submit(lambda i=i: ran.append(i))
+    release.set()
+    assert queue.drain(5)
+    assert ran == [0, 1, 2]
+    with pytest.raises(QueueFull):
+        queue.submit(lambda: None)
+
+
+def test_drain_timeout_cancels_what_is_still_waiting():
+    queue, release = blocked_queue()
+    cancelled = []
+    queue.submit(lambda: None, on_cancel=lambda: cancelled.append(True))
+    assert not queue.drain(0.05)
+    assert cancelled == [True]
+    release.set()